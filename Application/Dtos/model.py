@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field, ConfigDict
+from datetime import datetime
+from typing import Optional
+
+class ModelInfoDto(BaseModel):
+    """DTO describing the model currently resident in the prediction service"""
+    Loaded: bool = Field(..., json_schema_extra={"example": True})
+    ModelVersion: Optional[str] = Field(None, json_schema_extra={"example": "reg_model_2025-05-27_18-54-53.pkl"})
+    LoadedAt: Optional[datetime] = Field(None, json_schema_extra={"example": "2024-06-10T12:34:56Z"})
+    LoadDurationSeconds: Optional[float] = Field(None, json_schema_extra={"example": 0.42})
+    Engine: Optional[str] = Field(None, json_schema_extra={"example": "flat"})
+    ModelFormat: Optional[str] = Field(None, json_schema_extra={"example": "forest"})
+    PreviousModelVersion: Optional[str] = Field(None, json_schema_extra={"example": "reg_model_2025-05-20_09-00-00.pkl"})
+    FallbackReason: Optional[str] = Field(None, json_schema_extra={"example": "no_model_found"})
+
+    model_config = ConfigDict(populate_by_name=True)
@@ -11,6 +11,8 @@ class PredictionRequestDto(BaseModel):
     timestamp: datetime = Field(..., json_schema_extra={"example": "2024-06-10T12:34:56Z"})
     plantGrowthStage: str = Field(..., json_schema_extra={"example": "Seedling"})
     timeSinceLastWateringInHours: float = Field(..., json_schema_extra={"example": 12.5})
+    # Identifies the plant bed so the service can keep its recent readings (optional)
+    bedId: Optional[str] = Field(None, json_schema_extra={"example": "bed-7"})
     mlSensorReadings: List[SensorReadingDto] = Field(
         ...,
         json_schema_extra={
@@ -30,6 +32,7 @@ class PredictionResultDto(BaseModel):
     PredictionTime: datetime
     HoursUntilNextWatering: float
     modelVersion: Optional[str] = Field(None, exclude=True)  
+    fallbackReason: Optional[str] = Field(None, exclude=True)
     
     model_config = ConfigDict(populate_by_name=True)  
 
@@ -38,4 +41,18 @@ class PredictionResponseDto(BaseModel):
     PredictionTime: datetime = Field(..., json_schema_extra={"example": "2024-06-10T12:34:56Z"})
     HoursUntilNextWatering: float = Field(..., json_schema_extra={"example": 24.5})
     
-    model_config = ConfigDict(populate_by_name=True) 
\ No newline at end of file
+    model_config = ConfigDict(populate_by_name=True)
+
+class BatchPredictionItemDto(BaseModel):
+    """DTO for one prediction in a batch response, in the same position as its request"""
+    PredictionTime: datetime = Field(..., json_schema_extra={"example": "2024-06-10T12:34:56Z"})
+    HoursUntilNextWatering: float = Field(..., json_schema_extra={"example": 24.5})
+    FallbackReason: Optional[str] = Field(None, json_schema_extra={"example": None})
+
+    model_config = ConfigDict(populate_by_name=True)
+
+class BatchPredictionResponseDto(BaseModel):
+    """DTO for batch prediction responses"""
+    Predictions: List[BatchPredictionItemDto]
+
+    model_config = ConfigDict(populate_by_name=True)
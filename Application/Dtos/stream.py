@@ -0,0 +1,38 @@
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+from datetime import datetime
+from typing import Any, List, Optional
+from Application.Dtos.predict import SensorReadingDto
+
+class StreamSchemaDto(BaseModel):
+    """DTO declaring the sensor order of the values sent by later messages on a stream"""
+    sensors: List[str] = Field(
+        ...,
+        min_length=1,
+        json_schema_extra={"example": ["Temperature", "Soil Humidity", "Air Humidity", "Light"]}
+    )
+
+class StreamReadingDto(BaseModel):
+    """DTO for one reading on a prediction stream: values in the declared sensor order, or full mlSensorReadings"""
+    id: Any = Field(None, json_schema_extra={"example": 42})
+    timestamp: datetime = Field(..., json_schema_extra={"example": "2024-06-10T12:34:56Z"})
+    plantGrowthStage: str = Field(..., json_schema_extra={"example": "Seedling"})
+    timeSinceLastWateringInHours: float = Field(..., json_schema_extra={"example": 12.5})
+    bedId: Optional[str] = Field(None, json_schema_extra={"example": "bed-7"})
+    values: Optional[List[float]] = Field(None, json_schema_extra={"example": [22.5, 41.0, 55.0, 300.0]})
+    mlSensorReadings: Optional[List[SensorReadingDto]] = None
+
+    @model_validator(mode="after")
+    def check_readings(self):
+        if (self.values is None) == (self.mlSensorReadings is None):
+            raise ValueError("exactly one of values and mlSensorReadings is required")
+        return self
+
+class StreamPredictionDto(BaseModel):
+    """DTO for one message streamed back: a prediction, or the error for a message that could not be used"""
+    Id: Any = Field(None, json_schema_extra={"example": 42})
+    PredictionTime: Optional[datetime] = Field(None, json_schema_extra={"example": "2024-06-10T12:34:56Z"})
+    HoursUntilNextWatering: Optional[float] = Field(None, json_schema_extra={"example": 24.5})
+    FallbackReason: Optional[str] = Field(None, json_schema_extra={"example": None})
+    Error: Optional[str] = Field(None, json_schema_extra={"example": None})
+
+    model_config = ConfigDict(populate_by_name=True)
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field, ConfigDict
+from datetime import datetime
+from typing import Optional
+
+class TrainingJobRequestDto(BaseModel):
+    """DTO for starting a training job"""
+    Incremental: bool = Field(False, json_schema_extra={"example": False})
+    PruneTolerance: Optional[float] = Field(None, ge=0, json_schema_extra={"example": 0.02})
+    Temporal: bool = Field(False, json_schema_extra={"example": False})
+
+    model_config = ConfigDict(populate_by_name=True)
+
+class TrainingJobDto(BaseModel):
+    """DTO describing a training job and the model it produced"""
+    JobId: str = Field(..., json_schema_extra={"example": "9f1c2e7a4b3d4c6e8a0b1c2d3e4f5a6b"})
+    Status: str = Field(..., json_schema_extra={"example": "running"})
+    Phase: Optional[str] = Field(None, json_schema_extra={"example": "fit"})
+    Progress: float = Field(0.0, json_schema_extra={"example": 0.33})
+    Incremental: bool = Field(False, json_schema_extra={"example": False})
+    Temporal: bool = Field(False, json_schema_extra={"example": False})
+    SubmittedAt: datetime = Field(..., json_schema_extra={"example": "2024-06-10T12:34:56Z"})
+    StartedAt: Optional[datetime] = Field(None, json_schema_extra={"example": "2024-06-10T12:34:57Z"})
+    FinishedAt: Optional[datetime] = Field(None, json_schema_extra={"example": "2024-06-10T12:35:12Z"})
+    ModelVersion: Optional[str] = Field(None, json_schema_extra={"example": "reg_model_2025-05-27_18-54-53.pkl"})
+    Registered: bool = Field(False, json_schema_extra={"example": True})
+    Mae: Optional[float] = Field(None, json_schema_extra={"example": 2.691})
+    R2: Optional[float] = Field(None, json_schema_extra={"example": 0.962})
+    Error: Optional[str] = Field(None, json_schema_extra={"example": None})
+
+    model_config = ConfigDict(populate_by_name=True)
@@ -1,15 +1,40 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request, Response, WebSocket
+from starlette.concurrency import run_in_threadpool
+from starlette.websockets import WebSocketState
+import os
+import time
 import logging
+from contextlib import aclosing
 from datetime import datetime
-from Application.Dtos.predict import PredictionRequestDto, PredictionResponseDto
-from Application.services.ml_model_services import analyze_prediction
+from typing import List
+from Application.Dtos.predict import (
+    PredictionRequestDto, PredictionResponseDto, BatchPredictionItemDto, BatchPredictionResponseDto
+)
+from Application.Dtos.model import ModelInfoDto
+from Application.Dtos.training import TrainingJobRequestDto, TrainingJobDto
+from Application.services.ml_model_services import analyze_prediction, analyze_batch_prediction, analyze_compact_batch
+from Application.services.model_registry import model_registry
+from Application.services.inference_executor import InferenceOverloadedError, inference_executor
+from Application.services.micro_batcher import micro_batcher
+from Application.services.prediction_cache import prediction_cache
+from Application.services.structured_logging import logging_stats
+from Application.services.metrics import PREDICT_STAGE_SECONDS, record_result
+from Application.services.training_jobs import TrainingJob, TrainingQueueFullError, training_jobs
+from Application.services.bed_state import bed_state_store
+from Application.services.serving_mode import serving_mode
+from Application.services.compact_format import CompactFormatError, PACKED_MEDIA_TYPE, decode_packed, decode_rows
+from Application.services.prediction_stream import (
+    PredictionStream, DuplexStreamingResponse, ndjson_lines, websocket_messages, stream_stats
+)
 
-# Set up proper logging
 logger = logging.getLogger(__name__)
 
 # Initialize FastAPI router with versioning
 router = APIRouter(prefix="/api/ml", tags=["ML"])
 
+# Upper bound on the number of items accepted by the batch endpoint
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "1000"))
+
 @router.post("/predict", response_model=PredictionResponseDto)
 async def predict(payload: PredictionRequestDto, request: Request):
     """
@@ -23,29 +48,395 @@ async def predict(payload: PredictionRequestDto, request: Request):
         PredictionResponseDto: An object containing prediction time and hours until next watering.
 
     Raises:
-        HTTPException: If the prediction fails or an error occurs during processing.
+        HTTPException: 503 if the inference queue is full, 500 if the prediction fails.
     """
+    # Time since RequestTimingMiddleware saw the request is body parsing and validation
+    received_at = getattr(request.state, "received_at", None)
+    if received_at is not None:
+        PREDICT_STAGE_SECONDS.observe("parse", value=time.perf_counter() - received_at)
+
     try:
-        # Log the incoming request
-        client_ip = request.client.host if request.client else "unknown"
-        logger.info(f"Received prediction request from {client_ip} for plant stage: {payload.plantGrowthStage}")
+        # Log the incoming request; arguments are only formatted if DEBUG is enabled
+        if logger.isEnabledFor(logging.DEBUG):
+            client_ip = request.client.host if request.client else "unknown"
+            logger.debug("Received prediction request from %s for plant stage: %s", client_ip, payload.plantGrowthStage)
 
-        # Process the prediction
+        # Process the prediction (successful predictions are logged, sampled, by the service)
         result = await analyze_prediction(payload)
+        record_result(result.modelVersion, result.fallbackReason)
 
-        # Check if the prediction was successful and log model version for diagnostics
-        logger.info(f"Successful prediction: {result.HoursUntilNextWatering:.2f} hours using model {getattr(result, 'modelVersion', 'unknown')}")
-        
+        # Response serialization from here on is timed by RequestTimingMiddleware
+        request.state.handler_done_at = time.perf_counter()
         # Return response with proper field names matching C# conventions
         return PredictionResponseDto(
             PredictionTime=result.PredictionTime,
             HoursUntilNextWatering=result.HoursUntilNextWatering
         )
 
+    except InferenceOverloadedError as e:
+        logger.warning("Rejecting prediction request: %s", e, extra={"event": "overloaded"})
+        raise overloaded_exception()
     except Exception as e:
         # Log the error properly
-        logger.error(f"Error processing prediction: {str(e)}", exc_info=True)
+        logger.error("Error processing prediction: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail="An error occurred while processing the prediction"
-        )
\ No newline at end of file
+        )
+
+@router.post("/predict/batch", response_model=BatchPredictionResponseDto)
+async def predict_batch(payloads: List[PredictionRequestDto], request: Request):
+    """
+    Endpoint to predict hours until the next watering for many plant beds in one request.
+
+    Args:
+        payloads (List[PredictionRequestDto]): One request body per plant bed.
+        request (Request): The HTTP request object, used to extract client information.
+
+    Returns:
+        BatchPredictionResponseDto: One prediction per payload, in request order. FallbackReason is set
+        for items that were answered by the rule-based fallback instead of the model.
+
+    Raises:
+        HTTPException: 413 if the batch exceeds MAX_BATCH_SIZE, 503 if the inference queue is full,
+        500 if processing fails.
+    """
+    if len(payloads) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(payloads)} items exceeds the maximum of {MAX_BATCH_SIZE}"
+        )
+
+    try:
+        if logger.isEnabledFor(logging.DEBUG):
+            client_ip = request.client.host if request.client else "unknown"
+            logger.debug("Received batch prediction request from %s with %d items", client_ip, len(payloads))
+
+        results = await analyze_batch_prediction(payloads)
+        for result in results:
+            record_result(result.modelVersion, result.fallbackReason)
+
+        return BatchPredictionResponseDto(Predictions=[
+            BatchPredictionItemDto(
+                PredictionTime=result.PredictionTime,
+                HoursUntilNextWatering=result.HoursUntilNextWatering,
+                FallbackReason=result.fallbackReason
+            )
+            for result in results
+        ])
+
+    except InferenceOverloadedError as e:
+        logger.warning("Rejecting batch prediction request: %s", e, extra={"event": "overloaded"})
+        raise overloaded_exception()
+    except Exception as e:
+        logger.error("Error processing batch prediction: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="An error occurred while processing the batch prediction"
+        )
+
+@router.post("/predict/compact", response_model=BatchPredictionResponseDto)
+async def predict_compact(request: Request):
+    """
+    Batch prediction endpoint taking readings in the compact format (see compact_format.py).
+
+    The body is either packed binary records (Content-Type application/x-greenhouse-readings or
+    application/octet-stream) or JSON rows {"schema": 1, "rows": [[...], ...]}, both with a fixed
+    field order instead of named sensor readings. Readings are decoded column-wise straight into
+    the feature matrix, skipping per-reading DTO validation.
+
+    Args:
+        request (Request): The HTTP request whose raw body is decoded.
+
+    Returns:
+        BatchPredictionResponseDto: One prediction per reading, in request order, as for /predict/batch.
+
+    Raises:
+        HTTPException: 400 if the body cannot be decoded, 413 if it holds more than MAX_BATCH_SIZE readings,
+        415 for other content types, 503 if the inference queue is full, 500 if processing fails.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in (PACKED_MEDIA_TYPE, "application/octet-stream"):
+        decode = decode_packed
+    elif content_type == "application/json":
+        decode = decode_rows
+    else:
+        raise HTTPException(status_code=415, detail=f"Unsupported content type {content_type or 'none'}")
+
+    try:
+        readings = decode(await request.body())
+    except CompactFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(readings) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(readings)} items exceeds the maximum of {MAX_BATCH_SIZE}"
+        )
+
+    try:
+        results = await analyze_compact_batch(readings)
+        for result in results:
+            record_result(result.modelVersion, result.fallbackReason)
+
+        return BatchPredictionResponseDto(Predictions=[
+            BatchPredictionItemDto(
+                PredictionTime=result.PredictionTime,
+                HoursUntilNextWatering=result.HoursUntilNextWatering,
+                FallbackReason=result.fallbackReason
+            )
+            for result in results
+        ])
+
+    except InferenceOverloadedError as e:
+        logger.warning("Rejecting compact prediction request: %s", e, extra={"event": "overloaded"})
+        raise overloaded_exception()
+    except Exception as e:
+        logger.error("Error processing compact prediction: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="An error occurred while processing the batch prediction"
+        )
+
+@router.websocket("/predict/stream")
+async def predict_stream(websocket: WebSocket):
+    """
+    WebSocket endpoint for gateways pushing readings continuously over one connection.
+
+    Each message is one JSON reading with the /predict fields plus an optional "id", or a
+    {"sensors": [...]} message after which readings may send "values" in that order instead
+    of mlSensorReadings. Readings are predicted in batches as they arrive and each result
+    (a StreamPredictionDto echoing the id) is sent back as one message, in order. Invalid
+    messages get a message with Error set and the stream goes on.
+
+    Args:
+        websocket (WebSocket): The client connection.
+    """
+    await websocket.accept()
+    stream = PredictionStream()
+    async with aclosing(stream.predictions(websocket_messages(websocket))) as responses:
+        async for response in responses:
+            try:
+                await websocket.send_text(response)
+            except Exception:
+                # The client went away; what is raised depends on the server's WebSocket library
+                logger.debug("Prediction stream closed by the client")
+                return
+    if websocket.client_state == WebSocketState.CONNECTED:
+        await websocket.close()
+
+@router.post("/predict/stream")
+async def predict_stream_ndjson(request: Request):
+    """
+    Streaming endpoint taking a chunked NDJSON body, one message per line.
+
+    Lines follow the WebSocket message format of /predict/stream. Predictions are written
+    back as NDJSON while the body is still arriving, so a gateway can keep one request open
+    for a continuous feed.
+
+    Args:
+        request (Request): The HTTP request whose body is read as it arrives.
+
+    Returns:
+        DuplexStreamingResponse: application/x-ndjson, one StreamPredictionDto per reading, in order.
+    """
+    stream = PredictionStream()
+
+    async def lines():
+        async with aclosing(stream.predictions(ndjson_lines(request.stream()))) as responses:
+            async for response in responses:
+                yield response + "\n"
+
+    return DuplexStreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.get("/model", response_model=ModelInfoDto)
+async def model_info():
+    """
+    Endpoint describing the model that is currently loaded in memory.
+
+    Returns:
+        ModelInfoDto: The loaded model version and load time, or the fallback reason if no model is loaded.
+    """
+    return build_model_info()
+
+@router.post("/admin/reload", response_model=ModelInfoDto)
+async def reload_model(response: Response):
+    """
+    Admin endpoint forcing the service to load the newest model file from disk.
+
+    The model is loaded and validated on a worker thread and swapped in atomically;
+    requests already in flight finish with the previous model. When served by several
+    workers, the launcher loads the model and replaces every worker, so the request is
+    only accepted (202) and the model still active is returned.
+
+    Returns:
+        ModelInfoDto: The model that is active after the reload.
+
+    Raises:
+        HTTPException: 409 if the newest model file could not be loaded or validated.
+    """
+    if serving_mode.multi_worker:
+        serving_mode.request_reload()
+        response.status_code = 202
+        return build_model_info()
+    failure = await run_in_threadpool(model_registry.reload, True)
+    if failure is not None:
+        logger.error("Model reload failed: %s", failure.reason)
+        raise HTTPException(status_code=409, detail=f"Model reload failed: {failure.reason}")
+    return build_model_info()
+
+@router.post("/admin/rollback", response_model=ModelInfoDto)
+async def rollback_model(response: Response):
+    """
+    Admin endpoint swapping the previously active model back in.
+
+    When served by several workers the launcher rolls back and replaces every worker,
+    so the request is only accepted (202) and the model still active is returned.
+
+    Returns:
+        ModelInfoDto: The model that is active after the rollback.
+
+    Raises:
+        HTTPException: 409 if there is no previous model to roll back to.
+    """
+    if serving_mode.multi_worker:
+        serving_mode.request_rollback()
+        response.status_code = 202
+        return build_model_info()
+    if await run_in_threadpool(model_registry.rollback) is None:
+        raise HTTPException(status_code=409, detail="No previous model available for rollback")
+    return build_model_info()
+
+@router.post("/train", response_model=TrainingJobDto, status_code=202)
+async def start_training(payload: TrainingJobRequestDto = TrainingJobRequestDto()):
+    """
+    Endpoint starting a training run in the background.
+
+    Training runs in a separate worker process; poll GET /api/ml/train/{job_id} for progress.
+    When it finishes the new model is validated and swapped in without a restart.
+
+    Args:
+        payload (TrainingJobRequestDto): Whether to warm-start from the last model, an optional
+        pruning tolerance, and whether to add the rolling per-bed features.
+
+    Returns:
+        TrainingJobDto: The queued job.
+
+    Raises:
+        HTTPException: 409 if the service runs several workers, 429 if too many training jobs
+        are already queued or running.
+    """
+    require_single_worker()
+    try:
+        job = training_jobs.submit(incremental=payload.Incremental, prune_tolerance=payload.PruneTolerance,
+                                   temporal=payload.Temporal)
+    except TrainingQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "60"})
+    return build_training_job(job)
+
+@router.get("/train", response_model=List[TrainingJobDto])
+async def list_training_jobs():
+    """
+    Endpoint listing recent training jobs.
+
+    Returns:
+        List[TrainingJobDto]: Known jobs, newest first.
+
+    Raises:
+        HTTPException: 409 if the service runs several workers.
+    """
+    require_single_worker()
+    return [build_training_job(job) for job in training_jobs.jobs()]
+
+@router.get("/train/{job_id}", response_model=TrainingJobDto)
+async def training_job_status(job_id: str):
+    """
+    Endpoint reporting the status and progress of a training job.
+
+    Returns:
+        TrainingJobDto: The job's status, current phase, progress and resulting model.
+
+    Raises:
+        HTTPException: 409 if the service runs several workers, 404 if the job is unknown.
+    """
+    require_single_worker()
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Training job {job_id} not found")
+    return build_training_job(job)
+
+@router.get("/admin/stats")
+async def serving_stats():
+    """
+    Admin endpoint reporting inference pool, micro-batching, prediction cache, logging, training,
+    bed state and streaming statistics of the worker process that answers.
+
+    Returns:
+        dict: Executor concurrency/queue state, micro-batch size and queue-wait metrics,
+        cache hit/miss/eviction counters, log queue depth, drops and sampling counts,
+        training jobs by status, the number of beds with rolling state, open streams
+        with their reading, error and batch counts, and the worker's process ids.
+    """
+    return {
+        "inference": inference_executor.stats(),
+        "micro_batching": micro_batcher.stats(),
+        "prediction_cache": prediction_cache.stats(),
+        "logging": logging_stats(),
+        "training": training_jobs.stats(),
+        "bed_state": bed_state_store.stats(),
+        "streaming": stream_stats.snapshot(),
+        "worker": {"pid": os.getpid(), "parent_pid": os.getppid()}
+    }
+
+def overloaded_exception() -> HTTPException:
+    """503 response telling clients to back off while the inference queue is full."""
+    return HTTPException(
+        status_code=503,
+        detail="Prediction service is overloaded, please retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
+def require_single_worker():
+    """Reject training requests when each worker would keep its own job table."""
+    if serving_mode.multi_worker:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Training jobs are not available with {serving_mode.workers} workers; "
+                   "serve with SERVE_WORKERS=1 or run Application.training.training_models.train_randomForest"
+        )
+
+def build_model_info() -> ModelInfoDto:
+    """Describe the registry's active model as a DTO."""
+    active = model_registry.get()
+    if active is None:
+        failure = model_registry.failure
+        return ModelInfoDto(Loaded=False, FallbackReason=failure.reason if failure else None)
+
+    previous = model_registry.previous
+    return ModelInfoDto(
+        Loaded=True,
+        ModelVersion=active.version,
+        LoadedAt=active.loaded_at,
+        LoadDurationSeconds=round(active.load_seconds, 4),
+        Engine=active.engine,
+        ModelFormat=active.model_format,
+        PreviousModelVersion=previous.version if previous else None
+    )
+
+def build_training_job(job: TrainingJob) -> TrainingJobDto:
+    """Describe a training job as a DTO."""
+    return TrainingJobDto(
+        JobId=job.job_id,
+        Status=job.status,
+        Phase=job.phase,
+        Progress=job.progress,
+        Incremental=job.options["incremental"],
+        Temporal=job.options["temporal"],
+        SubmittedAt=job.submitted_at,
+        StartedAt=job.started_at,
+        FinishedAt=job.finished_at,
+        ModelVersion=job.model_version,
+        Registered=job.registered,
+        Mae=job.metrics.get("mae"),
+        R2=job.metrics.get("r2"),
+        Error=job.error
+    )
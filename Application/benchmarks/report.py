@@ -0,0 +1,85 @@
+import json
+import numpy as np
+
+# Metrics whose name ends with one of these are better when higher; all others (latencies,
+# durations, memory) are better when lower
+HIGHER_IS_BETTER_SUFFIXES = ("rps",)
+
+DEFAULT_TOLERANCE = 0.2
+
+
+def summarize_latencies(seconds) -> dict:
+    """Latency percentiles in milliseconds for a list of per-request durations in seconds."""
+    ms = np.asarray(seconds, dtype=float) * 1000.0
+    if ms.size == 0:
+        return {}
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p90_ms": round(float(np.percentile(ms, 90)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    """Flatten nested numeric results into dotted keys (e.g. inprocess.throughput.c16.rps)."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def compare_reports(current: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """
+    Compare the results of two benchmark reports metric by metric.
+
+    Args:
+        current: Report produced by this run
+        baseline: Stored report to compare against
+        tolerance: Relative change allowed before a metric counts as a regression (0.2 = 20 %)
+
+    Returns:
+        list: One dict per metric present in both reports with name, baseline, current,
+        relative change and whether it regressed
+    """
+    current_flat = flatten(current.get("results", {}))
+    baseline_flat = flatten(baseline.get("results", {}))
+
+    rows = []
+    for name in sorted(set(current_flat) & set(baseline_flat)):
+        before, after = baseline_flat[name], current_flat[name]
+        change = (after - before) / before if before else 0.0
+        higher_is_better = name.endswith(HIGHER_IS_BETTER_SUFFIXES)
+        regressed = change < -tolerance if higher_is_better else change > tolerance
+        rows.append({
+            "metric": name,
+            "baseline": before,
+            "current": after,
+            "change": round(change, 4),
+            "regressed": regressed,
+        })
+    return rows
+
+
+def format_comparison(rows: list) -> str:
+    lines = [f"{'metric':<60} {'baseline':>12} {'current':>12} {'change':>9}"]
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        lines.append(f"{row['metric']:<60} {row['baseline']:>12.3f} {row['current']:>12.3f} "
+                     f"{row['change']:>+8.1%}{flag}")
+    return "\n".join(lines)
+
+
+def load_report(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_report(report: dict, path: str):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,423 @@
+"""
+Benchmark the prediction service against the trained model in MODEL_DIR.
+
+Drives the FastAPI app in-process (ASGI transport, no network) and/or over a local
+uvicorn server, then writes a JSON report that can be compared with a stored baseline.
+
+    python -m Application.benchmarks.run_benchmarks --output bench.json
+    python -m Application.benchmarks.run_benchmarks --baseline baseline.json --tolerance 0.2
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import logging
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timezone
+from typing import List
+
+import numpy as np
+import httpx
+from pydantic import TypeAdapter
+
+from Application.benchmarks.report import (
+    summarize_latencies, compare_reports, format_comparison, load_report, save_report, DEFAULT_TOLERANCE
+)
+
+# Serving settings applied to both modes unless already set in the environment; the
+# prediction cache is off so repeated payloads measure the model, not the cache
+BENCHMARK_ENV_DEFAULTS = {
+    "PREDICTION_CACHE_ENABLED": "false",
+    "MODEL_POLL_INTERVAL_SECONDS": "0",
+    "LOG_SUCCESS_SAMPLE_RATE": "0",
+}
+
+GROWTH_STAGES = ["Seedling Stage", "Vegetative Stage", "Flowering Stage"]
+
+
+def make_payloads(count: int, seed: int = 0) -> list:
+    """Deterministic request bodies with sensor values spread over realistic ranges."""
+    rng = np.random.default_rng(seed)
+    payloads = []
+    for _ in range(count):
+        readings = {
+            "Temperature": ("°C", rng.uniform(15, 40)),
+            "Soil Humidity": ("%", rng.uniform(5, 60)),
+            "Air Humidity": ("%", rng.uniform(20, 90)),
+            "Light": ("lux", rng.uniform(0, 1000)),
+            "CO2": ("ppm", rng.uniform(350, 1200)),
+        }
+        payloads.append({
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "plantGrowthStage": GROWTH_STAGES[int(rng.integers(len(GROWTH_STAGES)))],
+            "timeSinceLastWateringInHours": round(float(rng.uniform(0, 96)), 2),
+            "mlSensorReadings": [
+                {"SensorName": name, "Unit": unit, "Value": round(float(value), 2)}
+                for name, (unit, value) in readings.items()
+            ],
+        })
+    return payloads
+
+
+async def measure_latency(client: httpx.AsyncClient, payloads: list, requests: int) -> dict:
+    """Sequential single requests: one in flight at a time."""
+    durations = []
+    for i in range(requests):
+        start = time.perf_counter()
+        response = await client.post("/api/ml/predict", json=payloads[i % len(payloads)])
+        durations.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return summarize_latencies(durations)
+
+
+async def measure_throughput(client: httpx.AsyncClient, payloads: list, requests: int, concurrency: int) -> dict:
+    """requests predictions issued by concurrency workers; 503 responses are counted, not retried."""
+    durations, rejected = [], 0
+    next_index = iter(range(requests))
+
+    async def worker():
+        nonlocal rejected
+        for i in next_index:
+            start = time.perf_counter()
+            response = await client.post("/api/ml/predict", json=payloads[i % len(payloads)])
+            durations.append(time.perf_counter() - start)
+            if response.status_code == 503:
+                rejected += 1
+            else:
+                response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {"rps": round(requests / elapsed, 2), "rejected": rejected, **summarize_latencies(durations)}
+
+
+async def measure_batch_scaling(client: httpx.AsyncClient, payloads: list, batch_sizes: list, repeats: int,
+                                compact: bool = False) -> dict:
+    """Latency of /predict/batch (or /predict/compact with packed readings) per call and per item for each batch size."""
+    # Imported here, like the app itself, so the service modules see BENCHMARK_ENV_DEFAULTS
+    from Application.services.compact_format import PACKED_MEDIA_TYPE, encode_packed
+
+    results = {}
+    for size in batch_sizes:
+        batch = [payloads[i % len(payloads)] for i in range(size)]
+        if compact:
+            request = {"url": "/api/ml/predict/compact", "content": encode_packed([compact_row(p) for p in batch]),
+                       "headers": {"Content-Type": PACKED_MEDIA_TYPE}}
+        else:
+            request = {"url": "/api/ml/predict/batch", "json": batch}
+        durations = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            response = await client.post(**request)
+            durations.append(time.perf_counter() - start)
+            response.raise_for_status()
+        summary = summarize_latencies(durations)
+        summary["per_item_us"] = round(summary["p50_ms"] * 1000.0 / size, 3)
+        summary["items_rps"] = round(size / float(np.median(durations)), 2)
+        results[f"b{size}"] = summary
+    return results
+
+
+def compact_row(payload: dict) -> list:
+    """A request body from make_payloads as one row of the compact format (COMPACT_FIELDS order)."""
+    from Application.services.feature_pipeline import GROWTH_STAGE_MAP, RAW_INPUT_NAMES
+
+    sensors = {reading["SensorName"]: reading["Value"] for reading in payload["mlSensorReadings"]}
+    return (
+        [datetime.fromisoformat(payload["timestamp"]).timestamp(), 0]
+        + [sensors.get(name) for name in RAW_INPUT_NAMES[:7]]
+        + [payload["timeSinceLastWateringInHours"], GROWTH_STAGE_MAP[payload["plantGrowthStage"]]]
+    )
+
+
+def measure_decoding(payloads: list, size: int, repeats: int) -> dict:
+    """
+    Microseconds per reading to turn a request body of size readings into the feature matrix.
+
+    Compares the JSON body validated into PredictionRequestDto objects (the /predict/batch
+    path) with the compact JSON rows and packed forms (the /predict/compact path), without HTTP.
+    """
+    from Application.Dtos.predict import PredictionRequestDto
+    from Application.services.compact_format import COMPACT_SCHEMA_ID, decode_packed, decode_rows, encode_packed
+    from Application.services.feature_pipeline import FEATURE_PIPELINE
+    from Application.services.ml_model_services import extract_feature_matrix
+
+    batch = [payloads[i % len(payloads)] for i in range(size)]
+    rows = [compact_row(payload) for payload in batch]
+    adapter = TypeAdapter(List[PredictionRequestDto])
+    paths = {
+        "dto_json": (json.dumps(batch).encode(),
+                     lambda body: extract_feature_matrix(adapter.validate_json(body))),
+        "compact_rows": (json.dumps({"schema": COMPACT_SCHEMA_ID, "rows": rows}).encode(),
+                         lambda body: FEATURE_PIPELINE.transform(decode_rows(body).raw_inputs())),
+        "compact_packed": (encode_packed(rows),
+                           lambda body: FEATURE_PIPELINE.transform(decode_packed(body).raw_inputs())),
+    }
+    results = {"size": size}
+    for name, (body, decode) in paths.items():
+        decode(body)
+        durations = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            decode(body)
+            durations.append(time.perf_counter() - start)
+        results[f"{name}_us"] = round(float(np.median(durations)) * 1e6 / size, 3)
+        results[f"{name}_bytes"] = round(len(body) / size, 1)
+    return results
+
+
+async def run_suite(client: httpx.AsyncClient, args) -> dict:
+    payloads = make_payloads(args.payloads, args.seed)
+    for payload in payloads[:args.warmup]:
+        (await client.post("/api/ml/predict", json=payload)).raise_for_status()
+
+    model = (await client.get("/api/ml/model")).json()
+    if not model.get("Loaded") and not args.allow_fallback:
+        raise RuntimeError(f"No model loaded ({model.get('FallbackReason')}); "
+                           f"pass --allow-fallback to benchmark the fallback rules")
+
+    return {
+        "model": model,
+        "latency": await measure_latency(client, payloads, args.requests),
+        "throughput": {
+            f"c{c}": await measure_throughput(client, payloads, args.requests, c) for c in args.concurrency
+        },
+        "batch": await measure_batch_scaling(client, payloads, args.batch_sizes, args.batch_repeats),
+        "compact": await measure_batch_scaling(client, payloads, args.batch_sizes, args.batch_repeats, compact=True),
+    }
+
+
+async def run_inprocess(args) -> dict:
+    """Benchmark the app through httpx's ASGI transport, with the app's own lifespan."""
+    start = time.perf_counter()
+    from Application.main import app
+    import_seconds = time.perf_counter() - start
+
+    async with app.router.lifespan_context(app):
+        startup_seconds = time.perf_counter() - start
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            results = await run_suite(client, args)
+
+    results["decoding"] = measure_decoding(make_payloads(args.payloads, args.seed), max(args.batch_sizes),
+                                           args.batch_repeats)
+    model = results.pop("model")
+    results["cold_start"] = {
+        "import_seconds": round(import_seconds, 4),
+        "startup_seconds": round(startup_seconds, 4),
+        "model_load_seconds": model.get("LoadDurationSeconds") or 0.0,
+    }
+    results["rss_mb"] = {"process": rss_mb(os.getpid())}
+    return {"model": model, "results": results}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_mb(pid: int):
+    """Resident set size of a process from /proc, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024.0, 2)
+    except OSError:
+        return None
+    return None
+
+
+def child_pids(pid: int) -> list:
+    """All descendants of a process (uvicorn's worker processes), read from /proc."""
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        return []
+    return children + [grandchild for child in children for grandchild in child_pids(child)]
+
+
+async def wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float) -> float:
+    start = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.05)
+    raise TimeoutError(f"Server did not become ready within {timeout}s")
+
+
+async def run_uvicorn(args) -> dict:
+    """Benchmark a local server (plain uvicorn or the pre-fork launcher) started in a subprocess, with its cold start."""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    if args.server == "prefork":
+        # The model is loaded once in the launcher and shared by the forked workers
+        command = [sys.executable, "-m", "Application.serve", "--host", "127.0.0.1", "--port", str(port),
+                   "--workers", str(args.workers)]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "Application.main:app", "--host", "127.0.0.1",
+                   "--port", str(port), "--workers", str(args.workers), "--log-level", "warning"]
+
+    spawned_at = time.perf_counter()
+    process = subprocess.Popen(command, env=os.environ.copy(), stdout=subprocess.DEVNULL)
+    try:
+        ready_seconds = await wait_until_ready(base_url, process, args.startup_timeout)
+        limits = httpx.Limits(max_connections=max(args.concurrency))
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+            (await client.post("/api/ml/predict", json=make_payloads(1, args.seed)[0])).raise_for_status()
+            first_prediction_seconds = time.perf_counter() - spawned_at
+            rss_idle = process_tree_rss(process.pid)
+            results = await run_suite(client, args)
+        rss_loaded = process_tree_rss(process.pid)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    model = results.pop("model")
+    results["cold_start"] = {
+        "ready_seconds": round(ready_seconds, 4),
+        "first_prediction_seconds": round(first_prediction_seconds, 4),
+    }
+    results["rss_mb"] = {"idle": rss_idle, "loaded": rss_loaded}
+    return {"model": model, "results": results}
+
+
+def process_tree_rss(pid: int) -> dict:
+    """
+    Memory of the server process and its workers, in MB.
+
+    RSS counts pages shared between processes once per process, so for forked workers
+    the PSS (shared pages split between their users) and USS (pages private to the
+    worker) show what each additional worker really costs.
+    """
+    workers = [memory for memory in (process_memory_mb(child) for child in child_pids(pid)) if memory]
+    summary = {"master": rss_mb(pid)}
+    if workers:
+        summary["per_worker_mean"] = round(sum(memory["rss"] for memory in workers) / len(workers), 2)
+        summary["workers_total"] = round(sum(memory["rss"] for memory in workers), 2)
+        if all("pss" in memory for memory in workers):
+            summary["per_worker_pss_mean"] = round(sum(memory["pss"] for memory in workers) / len(workers), 2)
+            summary["per_worker_uss_mean"] = round(sum(memory["uss"] for memory in workers) / len(workers), 2)
+    master = process_memory_mb(pid)
+    if "pss" in master:
+        summary["total_pss"] = round(master["pss"] + sum(memory.get("pss", 0.0) for memory in workers), 2)
+    return {key: value for key, value in summary.items() if value is not None}
+
+
+def process_memory_mb(pid: int) -> dict:
+    """RSS, plus PSS and USS where /proc/<pid>/smaps_rollup exists (Linux 4.14+); {} if the process is gone."""
+    rss = rss_mb(pid)
+    if rss is None:
+        return {}
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in ("Pss", "Private_Clean", "Private_Dirty"):
+                    fields[name] = int(value.split()[0]) / 1024.0
+    except OSError:
+        return {"rss": rss}
+    if "Pss" not in fields:
+        return {"rss": rss}
+    return {"rss": rss, "pss": round(fields["Pss"], 2),
+            "uss": round(fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0), 2)}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def int_list(value: str) -> list:
+    return [int(item) for item in value.split(",") if item]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Greenhouse ML serving path")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn", "both"], default="both")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per latency/throughput measurement")
+    parser.add_argument("--concurrency", type=int_list, default=[1, 4, 16, 64], help="Comma-separated levels")
+    parser.add_argument("--batch-sizes", type=int_list, default=[1, 10, 100, 1000], help="Comma-separated sizes")
+    parser.add_argument("--batch-repeats", type=int, default=20)
+    parser.add_argument("--payloads", type=int, default=256, help="Distinct request bodies to cycle through")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="Server worker processes")
+    parser.add_argument("--server", choices=["uvicorn", "prefork"], default="uvicorn",
+                        help="uvicorn's own workers (each loads the model) or the pre-fork launcher (Application.serve)")
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--allow-fallback", action="store_true",
+                        help="Benchmark even if no model could be loaded (fallback rules only)")
+    parser.add_argument("--output", default="benchmark_report.json")
+    parser.add_argument("--baseline", default=None, help="Report to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Relative change that counts as a regression (default 0.2)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    for name, value in BENCHMARK_ENV_DEFAULTS.items():
+        os.environ.setdefault(name, value)
+    # One INFO line per benchmark request would dominate the output
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "settings": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+            "environment": {name: os.environ[name] for name in BENCHMARK_ENV_DEFAULTS},
+        },
+        "results": {},
+    }
+    # uvicorn first, so its cold start is not helped by this process's page cache warm-up
+    if args.mode in ("uvicorn", "both"):
+        run = asyncio.run(run_uvicorn(args))
+        report["meta"]["model"] = run["model"]
+        report["results"]["uvicorn"] = run["results"]
+    if args.mode in ("inprocess", "both"):
+        run = asyncio.run(run_inprocess(args))
+        report["meta"]["model"] = run["model"]
+        report["results"]["inprocess"] = run["results"]
+
+    save_report(report, args.output)
+    print(f"Benchmark report saved to: {args.output}")
+
+    if args.baseline:
+        rows = compare_reports(report, load_report(args.baseline), args.tolerance)
+        print(format_comparison(rows))
+        regressions = [row["metric"] for row in rows if row["regressed"]]
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
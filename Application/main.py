@@ -1,18 +1,39 @@
-import os
-import glob
-from fastapi import FastAPI
+import logging
+from fastapi import FastAPI, Response
 from contextlib import asynccontextmanager
 from Application.api.ml_controller import router as ml_router
+from Application.services.model_registry import model_registry, model_watcher
+from Application.services.inference_executor import inference_executor
+from Application.services.micro_batcher import micro_batcher
+from Application.services.training_jobs import training_jobs, TRAIN_ON_STARTUP
+from Application.services.serving_mode import serving_mode
+from Application.services.structured_logging import configure_logging, shutdown_logging
+from Application.services.metrics import RequestTimingMiddleware, render_metrics, CONTENT_TYPE
 from fastapi.middleware.cors import CORSMiddleware
 
 
+logger = logging.getLogger(__name__)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Call model availability check during startup
-    check_model_availability()
-    print("[STARTUP] Prediction service is starting...")
+    # JSON logs written by a background thread, so request handlers never block on stdout
+    # (already running in workers forked by serve.py, where this call is a no-op)
+    configure_logging()
+    # Load the model once so every request reuses the resident copy
+    load_model_at_startup()
+    if TRAIN_ON_STARTUP:
+        train_missing_model()
+    # Pick up retrained models without a restart
+    model_watcher.start()
+    logger.info("Prediction service is starting...")
     yield
-    print("[SHUTDOWN] App is shutting down...")
+    logger.info("App is shutting down...")
+    model_watcher.stop()
+    micro_batcher.stop()
+    inference_executor.shutdown()
+    training_jobs.shutdown()
+    shutdown_logging()
 
 app = FastAPI(
     title="Greenhouse ML API",
@@ -21,14 +42,26 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# At app startup (e.g., in main.py)
-def check_model_availability():
-    """Check if ML model is available at startup."""
-    model_files = glob.glob(os.path.join("Application/trained_models", "reg_model_*.pkl"))
-    if not model_files:
-        print("[STARTUP WARNING] No ML model files found. Predictions will use fallback logic.")
+def load_model_at_startup():
+    """Load the latest ML model into the registry at startup, unless it was loaded before forking (see serve.py)."""
+    if model_registry.attempted:
+        return
+    active = model_registry.load_latest()
+    if active is None:
+        logger.warning("No usable ML model (%s). Predictions will use fallback logic.", model_registry.failure.reason)
     else:
-        print(f"[STARTUP] Found {len(model_files)} ML model(s). Using: {os.path.basename(max(model_files, key=os.path.getctime))}")
+        logger.info("Using ML model: %s (loaded at %s)", active.version, active.loaded_at.isoformat())
+
+def train_missing_model():
+    """Queue a training job when no model could be loaded; it is swapped in when it finishes."""
+    if model_registry.get() is not None:
+        return
+    if serving_mode.multi_worker:
+        logger.warning("No model to serve and training jobs need SERVE_WORKERS=1; "
+                       "run Application.training.training_models.train_randomForest")
+        return
+    job = training_jobs.submit()
+    logger.info("Training the first model in job %s; predictions use fallback logic until it finishes", job.job_id)
 
 # Add CORS middleware for API access from other services
 app.add_middleware(
@@ -39,9 +72,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Time request parsing and response serialization for the /metrics stage histograms
+app.add_middleware(RequestTimingMiddleware)
+
 # Register the ML prediction router
 app.include_router(ml_router)
 
+# Prometheus scrape endpoint: per-stage latency histograms and result counters
+@app.get("/metrics", tags=["Health"])
+async def metrics():
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
 # Simple health check endpoint for Docker/k8s
 @app.get("/health", tags=["Health"])
 async def health_check():
@@ -0,0 +1,359 @@
+"""
+Pre-fork launcher: load the model once, then serve it from several uvicorn worker processes.
+
+The parent imports the app, loads the model and compiles its flat forest, freezes the
+garbage collector and only then forks, so every worker shares the model's pages
+copy-on-write instead of loading its own copy. All workers accept connections from one
+listening socket. The parent restarts workers that die and watches MODEL_DIR: a new model
+is loaded in the parent and the workers are replaced by a fresh generation forked from it,
+so the new model is shared too. SIGHUP forces the same reload and SIGUSR1 rolls back to the
+previous model; workers send these when /admin/reload and /admin/rollback are called.
+
+A single worker (the default) keeps managing its own model, as under plain uvicorn: it
+watches MODEL_DIR itself and is never replaced for a new model, so its training jobs and
+other in-memory state survive. Several workers cannot run training jobs (their job tables
+are not shared) and cannot serve models with per-bed rolling features (neither is bed state).
+
+    python -m Application.serve --workers auto           # one worker per available CPU
+    python -m Application.serve --workers 4 --port 8000
+"""
+import os
+import gc
+import sys
+import math
+import time
+import signal
+import socket
+import logging
+import argparse
+
+from Application.services.serving_mode import RELOAD_SIGNAL, ROLLBACK_SIGNAL, serving_mode
+
+# Constants
+SERVE_HOST = os.environ.get("SERVE_HOST", "0.0.0.0")
+SERVE_PORT = int(os.environ.get("SERVE_PORT", "8000"))
+# Worker processes: a number, or "auto" for one per CPU available to the container
+SERVE_WORKERS = os.environ.get("SERVE_WORKERS", os.environ.get("WEB_CONCURRENCY", "1"))
+# Time workers get to finish in-flight requests on shutdown or replacement before they are killed
+SERVE_GRACEFUL_TIMEOUT_SECONDS = float(os.environ.get("SERVE_GRACEFUL_TIMEOUT_SECONDS", "30"))
+
+# Exit code of a worker whose app failed to start; the launcher stops instead of restarting it
+WORKER_BOOT_ERROR = 3
+# Exit code of the launcher when the model cannot be served with the requested workers
+MODEL_REFUSED_EXIT = 2
+
+# Signals the launcher handles; blocked across fork so a new worker never runs the launcher's handlers
+LAUNCHER_SIGNALS = {signal.SIGTERM, signal.SIGINT, RELOAD_SIGNAL, ROLLBACK_SIGNAL}
+
+TEMPORAL_MODEL_REFUSAL = "bed state is kept per worker, so models with per-bed rolling features need SERVE_WORKERS=1"
+
+logger = logging.getLogger(__name__)
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: its affinity mask, capped by a cgroup CPU quota (containers)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return max(1, cpus)
+
+
+def cgroup_cpu_quota(root: str = "/sys/fs/cgroup"):
+    """The cgroup CPU limit in CPUs (e.g. docker --cpus=2.5 gives 2.5), or None without a limit."""
+    try:
+        with open(os.path.join(root, "cpu.max")) as f:  # cgroup v2
+            quota, period = f.read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open(os.path.join(root, "cpu", "cpu.cfs_quota_us")) as f:  # cgroup v1
+            quota = int(f.read())
+        with open(os.path.join(root, "cpu", "cpu.cfs_period_us")) as f:
+            period = int(f.read())
+        return None if quota <= 0 else quota / period
+    except (OSError, ValueError):
+        return None
+
+
+def resolve_worker_count(value) -> int:
+    """
+    Worker processes for a SERVE_WORKERS / --workers value.
+
+    Prediction is CPU-bound, so "auto" starts one worker per available CPU.
+
+    Raises:
+        ValueError: If value is neither "auto" nor a positive integer
+    """
+    if str(value).strip().lower() == "auto":
+        return available_cpus()
+    workers = int(value)
+    if workers < 1:
+        raise ValueError(f"Worker count must be at least 1, got {workers}")
+    return workers
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """The listening socket shared by every worker; the kernel hands each connection to one of them."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    """
+    Supervises worker processes forked from a parent that already holds the model.
+
+    Workers that exit are replaced (unless their app failed to start). When the parent
+    loads a new model or rolls back, a new generation of workers is forked and the old one
+    is told to finish its requests and exit, so there is no gap in service.
+    """
+
+    def __init__(self, app, sock: socket.socket, workers: int, log_level: str = "warning",
+                 graceful_timeout: float = SERVE_GRACEFUL_TIMEOUT_SECONDS, poll_interval: float = 0.0):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.log_level = log_level
+        self.graceful_timeout = graceful_timeout
+        self.poll_interval = poll_interval
+        self.children = set()
+        self.retiring = {}
+        self.stopping = False
+        self.reload_requested = False
+        self.rollback_requested = False
+        self.exit_code = 0
+
+    def run(self) -> int:
+        """Serve until SIGTERM or SIGINT; returns the launcher's exit code."""
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(RELOAD_SIGNAL, self._request_reload)
+        signal.signal(ROLLBACK_SIGNAL, self._request_rollback)
+
+        freeze_heap()
+        for _ in range(self.workers):
+            self.spawn()
+        logger.info("Serving on %s with %d workers (parent %d)", format_address(self.sock), self.workers, os.getpid())
+
+        next_poll = time.monotonic() + self.poll_interval
+        while not self.stopping:
+            self.reap()
+            if self.reload_requested or (self.poll_interval > 0 and time.monotonic() >= next_poll):
+                self.reload_model(force=self.reload_requested)
+                self.reload_requested = False
+                next_poll = time.monotonic() + self.poll_interval
+            if self.rollback_requested:
+                self.rollback_model()
+                self.rollback_requested = False
+            self.kill_overdue()
+            time.sleep(0.2)
+
+        self.shutdown()
+        return self.exit_code
+
+    def spawn(self) -> int:
+        # The log writer thread does not survive fork; stop it so no lock is held across the fork
+        from Application.services.structured_logging import configure_logging, shutdown_logging
+        shutdown_logging()
+        mask = signal.pthread_sigmask(signal.SIG_BLOCK, LAUNCHER_SIGNALS)
+        pid = os.fork()
+        if pid == 0:
+            run_worker(self.app, self.sock, self.log_level)
+        signal.pthread_sigmask(signal.SIG_SETMASK, mask)
+        configure_logging()
+        self.children.add(pid)
+        return pid
+
+    def reap(self):
+        """Collect exited workers and replace the ones that were not asked to exit."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            code = os.waitstatus_to_exitcode(status)
+            if self.retiring.pop(pid, None) is not None or pid not in self.children:
+                continue
+            self.children.discard(pid)
+            if self.stopping:
+                continue
+            if code == WORKER_BOOT_ERROR:
+                logger.error("Worker %d failed to start, stopping", pid)
+                self.exit_code = WORKER_BOOT_ERROR
+                self.stopping = True
+                continue
+            logger.warning("Worker %d exited with code %s, starting a new one", pid, code)
+            self.spawn()
+
+    def reload_model(self, force: bool = False):
+        """Load the newest model in the parent and, if it changed, replace every worker."""
+        from Application.services.model_registry import model_registry
+        before = model_registry.get()
+        model_registry.reload(force=force)
+        if model_registry.get() is not before:
+            self.replace_workers()
+
+    def rollback_model(self):
+        """Swap the previous model back in, in the parent, and replace every worker."""
+        from Application.services.model_registry import model_registry
+        if model_registry.rollback() is None:
+            logger.warning("No previous model available for rollback")
+            return
+        self.replace_workers()
+
+    def replace_workers(self):
+        from Application.services.model_registry import model_registry
+        logger.info("Replacing %d workers to serve %s", len(self.children), model_registry.get().version)
+        freeze_heap()
+        old = list(self.children)
+        self.children.clear()
+        for _ in range(self.workers):
+            self.spawn()
+        self.retire(old)
+
+    def retire(self, pids):
+        deadline = time.monotonic() + self.graceful_timeout
+        for pid in pids:
+            self.retiring[pid] = deadline
+            signal_worker(pid, signal.SIGTERM)
+
+    def kill_overdue(self):
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if now >= deadline:
+                logger.warning("Worker %d did not exit in %ss, killing it", pid, self.graceful_timeout)
+                signal_worker(pid, signal.SIGKILL)
+                self.retiring[pid] = math.inf
+
+    def shutdown(self):
+        logger.info("Stopping %d workers", len(self.children))
+        self.retire(list(self.children))
+        self.children.clear()
+        while self.retiring:
+            self.reap()
+            self.kill_overdue()
+            if self.retiring:
+                time.sleep(0.1)
+
+    def _request_stop(self, signum, frame):
+        self.stopping = True
+
+    def _request_reload(self, signum, frame):
+        self.reload_requested = True
+
+    def _request_rollback(self, signum, frame):
+        self.rollback_requested = True
+
+
+def signal_worker(pid: int, signum: int):
+    try:
+        os.kill(pid, signum)
+    except ProcessLookupError:
+        pass
+
+
+def freeze_heap():
+    """
+    Move everything allocated so far out of the garbage collector's reach before forking.
+
+    A collection in a worker would otherwise write to the GC header of every object it
+    scans (the model included) and turn the shared pages into private copies.
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def format_address(sock: socket.socket) -> str:
+    host, port = sock.getsockname()[:2]
+    return f"{host}:{port}"
+
+
+def run_worker(app, sock: socket.socket, log_level: str):
+    """Body of a forked worker: serve the inherited socket with uvicorn, then exit without returning."""
+    from Application.services.structured_logging import configure_logging, shutdown_logging
+    import uvicorn
+
+    code = 0
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(RELOAD_SIGNAL, signal.SIG_IGN)
+        signal.signal(ROLLBACK_SIGNAL, signal.SIG_IGN)
+        # A SIGTERM sent while the worker was being forked is delivered here, with the default handler
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, LAUNCHER_SIGNALS)
+        configure_logging()
+        # uvicorn installs its own SIGTERM/SIGINT handlers and shuts down gracefully on them
+        server = uvicorn.Server(uvicorn.Config(app, log_level=log_level, lifespan="on", access_log=False))
+        server.run(sockets=[sock])
+        if not server.started:
+            code = WORKER_BOOT_ERROR
+    except BaseException:
+        logger.exception("Worker %d crashed", os.getpid())
+        code = 1
+    finally:
+        shutdown_logging()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Greenhouse ML API from pre-forked workers")
+    parser.add_argument("--host", default=SERVE_HOST)
+    parser.add_argument("--port", type=int, default=SERVE_PORT)
+    parser.add_argument("--workers", default=SERVE_WORKERS, help='Worker processes, or "auto" (one per CPU)')
+    parser.add_argument("--log-level", default="warning", help="uvicorn's own log level")
+    parser.add_argument("--graceful-timeout", type=float, default=SERVE_GRACEFUL_TIMEOUT_SECONDS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    workers = resolve_worker_count(args.workers)
+    # Split the CPUs between the workers' inference threads instead of giving each worker all of them
+    os.environ.setdefault("INFERENCE_WORKERS", str(max(1, available_cpus() // workers)))
+
+    # Imported after the environment is final: the services read their settings at import
+    from Application.main import app, load_model_at_startup
+    from Application.services.model_registry import MODEL_REFUSED_REASON, model_registry, model_watcher
+    from Application.services.structured_logging import configure_logging, shutdown_logging
+
+    configure_logging()
+    poll_interval = 0
+    if workers > 1:
+        # Workers forward model changes to this process; it watches MODEL_DIR for all of them
+        serving_mode.set_workers(workers, os.getpid())
+        model_registry.requirement = lambda model: TEMPORAL_MODEL_REFUSAL if model.feature_pipeline.temporal else None
+        poll_interval = model_watcher.interval_seconds
+        model_watcher.interval_seconds = 0
+
+    load_model_at_startup()
+    failure = model_registry.failure
+    if model_registry.get() is None and failure is not None and failure.reason == MODEL_REFUSED_REASON:
+        logger.error("Cannot serve %s with %d workers: %s", failure.model_path, workers, TEMPORAL_MODEL_REFUSAL)
+        shutdown_logging()
+        return MODEL_REFUSED_EXIT
+
+    sock = bind_socket(args.host, args.port)
+    server = PreforkServer(app, sock, workers, log_level=args.log_level, graceful_timeout=args.graceful_timeout,
+                           poll_interval=poll_interval)
+    try:
+        return server.run()
+    finally:
+        sock.close()
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+import os
+import math
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Constants
+# Only the last BED_STATE_CAPACITY readings of the window are kept: with the defaults (32 readings
+# per 6 hours) a bed reporting more often than every 11.25 minutes has its oldest readings dropped
+# early, and the features cover less than the window. Early drops are counted in stats().
+BED_STATE_WINDOW_HOURS = float(os.environ.get("BED_STATE_WINDOW_HOURS", "6"))
+# Readings kept per bed; size it to at least the window divided by the beds' reporting interval
+BED_STATE_CAPACITY = int(os.environ.get("BED_STATE_CAPACITY", "32"))
+# Beds tracked at once; the least recently updated bed is forgotten first
+BED_STATE_MAX_BEDS = int(os.environ.get("BED_STATE_MAX_BEDS", "10000"))
+
+# Rolling features produced for every reading, in model column order
+TEMPORAL_FEATURE_NAMES = ("soil_humidity_slope", "temperature_rolling_mean", "drying_rate")
+
+
+def to_hours(timestamp: datetime) -> float:
+    """Hours since the epoch; naive timestamps are taken as UTC."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp() / 3600.0
+
+
+class BedHistory:
+    """
+    Recent readings of one bed in fixed-size ring buffers, with running window sums.
+
+    Each reading adds its terms to the sums and each reading leaving the window
+    subtracts them, so a reading costs O(1) however long the window is. The sums are
+    taken relative to an origin that is moved to the oldest reading (and the sums
+    recomputed) once per buffer length, which keeps rounding drift bounded.
+    """
+
+    __slots__ = ("window_hours", "capacity", "times", "soil", "temperature", "start", "size", "pushes",
+                 "early_evictions",
+                 "origin", "sum_t", "sum_tt", "sum_s", "sum_ts", "sum_temp",
+                 "last_time", "last_soil", "last_since_watering", "anchor_time", "anchor_soil")
+
+    def __init__(self, window_hours: float = BED_STATE_WINDOW_HOURS, capacity: int = BED_STATE_CAPACITY):
+        self.window_hours = window_hours
+        self.capacity = max(2, capacity)
+        self.times = array("d", bytes(8 * self.capacity))
+        self.soil = array("d", bytes(8 * self.capacity))
+        self.temperature = array("d", bytes(8 * self.capacity))
+        self.start = 0
+        self.size = 0
+        self.pushes = 0
+        # Readings dropped while still inside the window because the buffer was full
+        self.early_evictions = 0
+        self.origin = 0.0
+        self.sum_t = self.sum_tt = self.sum_s = self.sum_ts = self.sum_temp = 0.0
+        self.last_time = -math.inf
+        self.last_soil = 0.0
+        self.last_since_watering = math.inf
+        self.anchor_time = 0.0
+        self.anchor_soil = 0.0
+
+    def push(self, hours: float, soil: float, temperature: float, since_watering: float) -> bool:
+        """
+        Add a reading taken at hours (since the epoch).
+
+        Returns:
+            bool: False if the reading is not newer than the last one (a retry or a late
+            reading) and was ignored
+        """
+        if hours <= self.last_time:
+            return False
+
+        # Drop readings that left the window, and the oldest one if the buffer is still full
+        while self.size and self.times[self.start] <= hours - self.window_hours:
+            self._evict()
+        if self.size == self.capacity:
+            self._evict()
+            self.early_evictions += 1
+        if self.size == 0:
+            self.origin = hours
+            self.sum_t = self.sum_tt = self.sum_s = self.sum_ts = self.sum_temp = 0.0
+
+        i = (self.start + self.size) % self.capacity
+        self.times[i], self.soil[i], self.temperature[i] = hours, soil, temperature
+        self.size += 1
+        self._add(hours - self.origin, soil, temperature, 1.0)
+
+        # A drop in time since watering means the bed was watered; drying is measured from there
+        if since_watering < self.last_since_watering:
+            self.anchor_time, self.anchor_soil = hours, soil
+        self.last_time, self.last_soil, self.last_since_watering = hours, soil, since_watering
+
+        self.pushes += 1
+        if self.pushes % self.capacity == 0:
+            self._rebase()
+        return True
+
+    def _add(self, t: float, soil: float, temperature: float, sign: float):
+        self.sum_t += sign * t
+        self.sum_tt += sign * t * t
+        self.sum_s += sign * soil
+        self.sum_ts += sign * t * soil
+        self.sum_temp += sign * temperature
+
+    def _evict(self):
+        i = self.start
+        self._add(self.times[i] - self.origin, self.soil[i], self.temperature[i], -1.0)
+        self.start = (i + 1) % self.capacity
+        self.size -= 1
+
+    def _rebase(self):
+        self.origin = self.times[self.start]
+        self.sum_t = self.sum_tt = self.sum_s = self.sum_ts = self.sum_temp = 0.0
+        for k in range(self.size):
+            i = (self.start + k) % self.capacity
+            self._add(self.times[i] - self.origin, self.soil[i], self.temperature[i], 1.0)
+
+    def features(self) -> tuple:
+        """
+        (soil humidity slope in %/h, mean temperature, drying rate in %/h) over the window.
+
+        The slope is the least-squares fit through the window's soil readings; the
+        drying rate is the soil humidity lost per hour since the last watering.
+        """
+        n = self.size
+        slope = 0.0
+        if n >= 2:
+            denominator = n * self.sum_tt - self.sum_t * self.sum_t
+            if denominator > 1e-9:
+                slope = (n * self.sum_ts - self.sum_t * self.sum_s) / denominator
+        elapsed = self.last_time - self.anchor_time
+        drying_rate = (self.anchor_soil - self.last_soil) / elapsed if elapsed > 0 else 0.0
+        return slope, self.sum_temp / n, drying_rate
+
+
+class BedStateStore:
+    """
+    In-memory rolling state per plant bed, keyed by the request's bedId.
+
+    Every reading updates its bed's history and returns the bed's rolling features,
+    so the model sees recent history without the backend resending it. Beds are kept
+    in LRU order and the least recently updated bed is dropped beyond max_beds.
+    State lives in this process only and starts empty after a restart.
+    """
+
+    def __init__(self, window_hours: float = BED_STATE_WINDOW_HOURS, capacity: int = BED_STATE_CAPACITY,
+                 max_beds: int = BED_STATE_MAX_BEDS):
+        self.window_hours = window_hours
+        self.capacity = capacity
+        self.max_beds = max(1, max_beds)
+        self._beds: "OrderedDict[str, BedHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.updates = 0
+        self.ignored = 0
+        self.evictions = 0
+        self.early_evictions = 0
+
+    def update(self, bed_id: str, timestamp: datetime, soil: float, temperature: float,
+               since_watering: float) -> dict:
+        """
+        Record one reading of a bed and return its rolling features.
+
+        Readings that are not newer than the bed's last one (client retries, late
+        deliveries) leave the state unchanged and get the current features. The first
+        time a bed's buffer fills up inside the window, a warning is logged.
+
+        Returns:
+            dict: TEMPORAL_FEATURE_NAMES mapped to their values
+        """
+        hours = to_hours(timestamp)
+        with self._lock:
+            bed = self._beds.get(bed_id)
+            if bed is None:
+                bed = self._beds[bed_id] = BedHistory(self.window_hours, self.capacity)
+                if len(self._beds) > self.max_beds:
+                    self._beds.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._beds.move_to_end(bed_id)
+            early_evictions = bed.early_evictions
+            if bed.push(hours, soil, temperature, since_watering):
+                self.updates += 1
+            else:
+                self.ignored += 1
+            if bed.early_evictions > early_evictions:
+                self.early_evictions += 1
+                if bed.early_evictions == 1:
+                    logger.warning("Bed %s reports more than %d readings per %g h window; its oldest readings "
+                                   "are dropped early (raise BED_STATE_CAPACITY)", bed_id, self.capacity,
+                                   self.window_hours, extra={"event": "bed_state_capacity", "bed_id": bed_id})
+            return dict(zip(TEMPORAL_FEATURE_NAMES, bed.features()))
+
+    def features(self, bed_id: str) -> Optional[dict]:
+        """The bed's current rolling features, or None for an unknown bed."""
+        with self._lock:
+            bed = self._beds.get(bed_id)
+            return None if bed is None else dict(zip(TEMPORAL_FEATURE_NAMES, bed.features()))
+
+    def settings(self) -> dict:
+        """The settings that shape the features; models record them and must be served with the same."""
+        return {"window_hours": self.window_hours, "capacity": self.capacity}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "beds": len(self._beds),
+                "max_beds": self.max_beds,
+                "window_hours": self.window_hours,
+                "updates": self.updates,
+                "ignored": self.ignored,
+                "evictions": self.evictions,
+                "capacity": self.capacity,
+                "early_evictions": self.early_evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._beds.clear()
+
+
+class FeatureReplay:
+    """
+    Rolling features for historical rows, computed by feeding them through fresh bed histories.
+
+    Rows are replayed in timestamp order (per bed) exactly as the service would have
+    received them, so training sees the values the service will compute. Histories carry
+    over from one call to the next, so a file can be replayed chunk by chunk as long as
+    no bed goes back in time between chunks.
+    """
+
+    def __init__(self, window_hours: float = BED_STATE_WINDOW_HOURS, capacity: int = BED_STATE_CAPACITY):
+        self.window_hours = window_hours
+        self.capacity = capacity
+        self.histories = {}
+
+    def features(self, bed_ids, timestamps, soil, temperature, since_watering) -> np.ndarray:
+        """
+        Replay one batch of rows, in timestamp order within the batch.
+
+        Returns:
+            np.ndarray: (n_rows, 3) features in the order of the input rows
+
+        Raises:
+            ValueError: If a row is older than a row of the same bed replayed by an earlier call
+        """
+        out = np.empty((len(bed_ids), len(TEMPORAL_FEATURE_NAMES)))
+        hours = np.array([to_hours(timestamp) for timestamp in timestamps])
+        for i in np.argsort(hours, kind="stable"):
+            bed = self.histories.get(bed_ids[i])
+            if bed is None:
+                bed = self.histories[bed_ids[i]] = BedHistory(self.window_hours, self.capacity)
+            elif hours[i] < bed.last_time:
+                raise ValueError(f"Reading of bed {bed_ids[i]} at {timestamps[i]} is older than one already "
+                                 "replayed; rows must be in timestamp order per bed")
+            bed.push(hours[i], soil[i], temperature[i], since_watering[i])
+            out[i] = bed.features()
+        return out
+
+
+# Process-wide store used by the prediction service
+bed_state_store = BedStateStore()
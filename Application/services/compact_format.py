@@ -0,0 +1,161 @@
+import json
+import struct
+from datetime import datetime, timezone
+from typing import Sequence
+
+import numpy as np
+
+from Application.services.feature_pipeline import RAW_INPUT_DEFAULTS, RAW_INPUT_NAMES
+
+# Version of the record layout below; bump when a field is added, removed or reordered
+COMPACT_SCHEMA_ID = 1
+
+# Packed bodies start with a 12-byte header: magic, schema id, reserved (0), record count
+PACKED_MAGIC = b"GHRD"
+PACKED_HEADER = struct.Struct("<4sHHI")
+PACKED_MEDIA_TYPE = "application/x-greenhouse-readings"
+
+# One reading per record, fields in this order in both the packed and the JSON rows form:
+# timestamp in seconds since the epoch, bedId as a number (0 for none), then the raw model
+# inputs with growth_stage as its numeric code. NaN (null in JSON) marks a missing value.
+COMPACT_FIELDS = ["timestamp", "bedId"] + RAW_INPUT_NAMES
+RECORD_DTYPE = np.dtype(
+    [("timestamp", "<f8"), ("bedId", "<u4")] + [(name, "<f4") for name in RAW_INPUT_NAMES]
+)
+
+# Timestamps datetime can represent (years 1 to 9999, UTC), whole seconds so rounding stays in range
+MIN_TIMESTAMP = datetime(1, 1, 1, tzinfo=timezone.utc).timestamp()
+MAX_TIMESTAMP = datetime(9999, 12, 31, 23, 59, 59, tzinfo=timezone.utc).timestamp()
+
+# Growth stage codes accepted in compact readings, with the name the fallback rules know them by
+GROWTH_STAGE_NAMES = {0: "Seedling", 1: "Vegetative", 2: "Flowering"}
+
+
+class CompactFormatError(ValueError):
+    """A compact request body that cannot be decoded."""
+
+
+class CompactReadings:
+    """
+    A batch of decoded compact readings, one float64 column per field.
+
+    Missing values stay NaN; raw_inputs fills them with the model defaults, while the
+    fallback rules fill them with their own.
+    """
+
+    def __init__(self, timestamps: np.ndarray, bed_ids: np.ndarray, columns: dict):
+        self.timestamps = timestamps
+        self.bed_ids = bed_ids
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def raw_inputs(self) -> dict:
+        """Raw model inputs for FeaturePipeline.transform, missing values replaced by RAW_INPUT_DEFAULTS."""
+        return {
+            name: np.where(np.isnan(column), RAW_INPUT_DEFAULTS[name], column)
+            for name, column in self.columns.items()
+        }
+
+
+def decode_packed(body: bytes) -> CompactReadings:
+    """
+    Decode a packed body: the header followed by count RECORD_DTYPE records (little endian).
+
+    The records are read in place with np.frombuffer; nothing is built per reading.
+
+    Raises:
+        CompactFormatError: If the header, length or values are invalid
+    """
+    if len(body) < PACKED_HEADER.size:
+        raise CompactFormatError(f"Body shorter than the {PACKED_HEADER.size}-byte header")
+    magic, schema, _, count = PACKED_HEADER.unpack_from(body)
+    if magic != PACKED_MAGIC:
+        raise CompactFormatError("Body does not start with the packed readings magic")
+    check_schema(schema)
+    expected = PACKED_HEADER.size + count * RECORD_DTYPE.itemsize
+    if len(body) != expected:
+        raise CompactFormatError(f"Header announces {count} readings ({expected} bytes), body has {len(body)} bytes")
+
+    records = np.frombuffer(body, dtype=RECORD_DTYPE, count=count, offset=PACKED_HEADER.size)
+    return validate(
+        records["timestamp"].astype(float),
+        records["bedId"].astype(np.int64),
+        {name: records[name].astype(float) for name in RAW_INPUT_NAMES}
+    )
+
+
+def decode_rows(body: bytes) -> CompactReadings:
+    """
+    Decode the JSON form: {"schema": 1, "rows": [[timestamp, bedId, <raw inputs>...], ...]}.
+
+    Rows are converted to one float matrix in a single call; null becomes NaN.
+
+    Raises:
+        CompactFormatError: If the body is not valid JSON or a row is malformed
+    """
+    try:
+        data = json.loads(body)
+    except ValueError as e:
+        raise CompactFormatError(f"Invalid JSON: {e}")
+    if not isinstance(data, dict) or not isinstance(data.get("rows"), list):
+        raise CompactFormatError('Body must be an object with "schema" and "rows"')
+    check_schema(data.get("schema"))
+
+    rows = data["rows"]
+    try:
+        matrix = np.array(rows, dtype=float).reshape(len(rows), -1) if rows else np.empty((0, len(COMPACT_FIELDS)))
+    except (TypeError, ValueError):
+        raise CompactFormatError(f"Every row must be a list of {len(COMPACT_FIELDS)} numbers or nulls")
+    if matrix.shape[1] != len(COMPACT_FIELDS):
+        raise CompactFormatError(f"Expected rows of {len(COMPACT_FIELDS)} values, got {matrix.shape[1]}")
+
+    bed_ids = np.nan_to_num(matrix[:, 1], nan=0.0)
+    if np.any((bed_ids < 0) | (bed_ids >= 2 ** 32) | (bed_ids != np.floor(bed_ids))):
+        raise CompactFormatError("bedId must be an integer between 0 and 2^32 - 1")
+    return validate(
+        matrix[:, 0],
+        bed_ids.astype(np.int64),
+        {name: matrix[:, i] for i, name in enumerate(RAW_INPUT_NAMES, start=2)}
+    )
+
+
+def check_schema(schema):
+    if schema != COMPACT_SCHEMA_ID:
+        raise CompactFormatError(f"Unsupported schema {schema}, expected {COMPACT_SCHEMA_ID}")
+
+
+def validate(timestamps: np.ndarray, bed_ids: np.ndarray, columns: dict) -> CompactReadings:
+    """Column-wise checks replacing per-field validation: finite values, valid dates and known growth stages."""
+    if not np.all(np.isfinite(timestamps)):
+        raise CompactFormatError("timestamp is required and must be finite")
+    if np.any((timestamps < MIN_TIMESTAMP) | (timestamps > MAX_TIMESTAMP)):
+        raise CompactFormatError(f"timestamp must be between {MIN_TIMESTAMP:.0f} and {MAX_TIMESTAMP:.0f} "
+                                 "seconds since the epoch")
+    for name, column in columns.items():
+        if np.any(np.isinf(column)):
+            raise CompactFormatError(f"{name} must be finite")
+    stages = columns["growth_stage"]
+    known = np.isin(stages, list(GROWTH_STAGE_NAMES)) | np.isnan(stages)
+    if not np.all(known):
+        raise CompactFormatError(f"growth_stage must be one of {sorted(GROWTH_STAGE_NAMES)}")
+    return CompactReadings(timestamps, bed_ids, columns)
+
+
+def encode_packed(rows: Sequence[Sequence]) -> bytes:
+    """
+    Packed body for rows in COMPACT_FIELDS order (None for a missing value); used by clients and tests.
+
+    Raises:
+        CompactFormatError: If a row does not have one value per field
+    """
+    records = np.zeros(len(rows), dtype=RECORD_DTYPE)
+    for i, row in enumerate(rows):
+        if len(row) != len(COMPACT_FIELDS):
+            raise CompactFormatError(f"Expected rows of {len(COMPACT_FIELDS)} values, got {len(row)}")
+        values = [np.nan if value is None else value for value in row]
+        if row[1] is None:
+            values[1] = 0
+        records[i] = tuple(values)
+    return PACKED_HEADER.pack(PACKED_MAGIC, COMPACT_SCHEMA_ID, 0, len(rows)) + records.tobytes()
@@ -0,0 +1,212 @@
+import os
+import json
+from typing import List, Optional
+
+import numpy as np
+
+# JSON file with rule sets that replace or extend DEFAULT_FALLBACK_RULES, keyed by fallback reason
+FALLBACK_RULES_PATH = os.environ.get("FALLBACK_RULES_PATH")
+
+# Rule set used for reasons without their own entry
+DEFAULT_RULE_SET = "default"
+
+# Inputs read from request fields rather than from mlSensorReadings
+PAYLOAD_FIELDS = ("plantGrowthStage", "timeSinceLastWateringInHours")
+
+# Rule-based predictions used when the model cannot answer, keyed by fallback reason.
+#
+# "base" gives the starting hours and each entry of "multipliers" scales them, in order.
+# A numeric rule lists its cases like an if/elif chain: ["<", 20, 4.0] means "if the input
+# is below 20 use 4.0"; "<" cases must have ascending thresholds, ">" cases descending ones,
+# and "otherwise" applies when no case matches. A categorical rule maps exact values.
+# "clamp" bounds the final hours (null for no bounds).
+DEFAULT_FALLBACK_RULES = {
+    "no_model_found": {
+        "base": {"input": "Soil Humidity", "default": 50,
+                 "cases": [["<", 20, 4.0], ["<", 30, 12.0], ["<", 40, 24.0], ["<", 60, 36.0]], "otherwise": 48.0},
+        "multipliers": [
+            {"input": "Temperature", "default": 25, "cases": [[">", 30, 0.8], ["<", 15, 1.2]], "otherwise": 1.0},
+            {"input": "Air Humidity", "default": 50, "cases": [["<", 30, 0.9], [">", 70, 1.1]], "otherwise": 1.0},
+            {"input": "Light", "default": 200, "cases": [[">", 800, 0.9], ["<", 100, 1.1]], "otherwise": 1.0},
+            {"input": "plantGrowthStage",
+             "categories": {"Seedling": 0.8, "Seedling Stage": 0.8, "Vegetative": 1.0, "Vegetative Stage": 1.0,
+                            "Flowering": 1.1, "Flowering Stage": 1.1},
+             "otherwise": 1.0},
+            {"input": "timeSinceLastWateringInHours", "cases": [[">", 48, 0.8]], "otherwise": 1.0},
+        ],
+        "clamp": [1.0, 72.0],
+    },
+    # The model file exists but could not be unpickled in this environment
+    "model_module_error": {
+        "base": {"input": "Soil Humidity", "default": 50,
+                 "cases": [["<", 20, 4.0], ["<", 30, 12.0], ["<", 40, 24.0], ["<", 50, 36.0]], "otherwise": 48.0},
+        "multipliers": [
+            {"input": "Temperature", "default": 25, "cases": [[">", 30, 0.7], ["<", 15, 1.3]], "otherwise": 1.0},
+            {"input": "plantGrowthStage",
+             "categories": {"Seedling": 0.9, "Seedling Stage": 0.9, "Flowering": 1.1, "Flowering Stage": 1.1},
+             "otherwise": 1.0},
+        ],
+        "clamp": None,
+    },
+    # Prediction errors and any other reason: soil humidity only
+    DEFAULT_RULE_SET: {
+        "base": {"input": "Soil Humidity", "default": 50,
+                 "cases": [["<", 20, 4.0], ["<", 30, 12.0], ["<", 40, 24.0], ["<", 60, 36.0]], "otherwise": 48.0},
+        "multipliers": [],
+        "clamp": [1.0, 72.0],
+    },
+}
+
+
+class ThresholdRule:
+    """
+    One numeric rule compiled to sorted bin edges, evaluated with np.searchsorted.
+
+    "x < t" cases become edge t and "x > t" cases become the next float above t, so
+    with side="right" every input lands in the same bin the if/elif chain would pick.
+    """
+
+    def __init__(self, spec: dict):
+        self.input = spec["input"]
+        self.default = float(spec.get("default", 0.0))
+        below = [(float(t), float(v)) for op, t, v in spec["cases"] if op == "<"]
+        above = [(float(t), float(v)) for op, t, v in spec["cases"] if op == ">"]
+        if len(below) + len(above) != len(spec["cases"]):
+            raise ValueError(f"Rule for {self.input}: case operators must be '<' or '>'")
+        if [t for t, _ in below] != sorted(t for t, _ in below):
+            raise ValueError(f"Rule for {self.input}: '<' thresholds must be ascending")
+        if [t for t, _ in above] != sorted((t for t, _ in above), reverse=True):
+            raise ValueError(f"Rule for {self.input}: '>' thresholds must be descending")
+        if below and above and below[-1][0] > above[-1][0]:
+            raise ValueError(f"Rule for {self.input}: '<' and '>' cases overlap")
+
+        above.reverse()
+        self.edges = np.array([t for t, _ in below] + [np.nextafter(t, np.inf) for t, _ in above])
+        self.values = np.array([v for _, v in below] + [float(spec["otherwise"])] + [v for _, v in above])
+
+    def evaluate(self, x: np.ndarray) -> np.ndarray:
+        return self.values[np.searchsorted(self.edges, x, side="right")]
+
+
+class CategoryRule:
+    """One categorical rule: exact matches map to a value, anything else to "otherwise"."""
+
+    def __init__(self, spec: dict):
+        self.input = spec["input"]
+        self.default = None
+        self.categories = {str(name): float(value) for name, value in spec["categories"].items()}
+        self.otherwise = float(spec["otherwise"])
+
+    def evaluate(self, x) -> np.ndarray:
+        return np.array([self.categories.get(value, self.otherwise) for value in x], dtype=float)
+
+
+def compile_rule(spec: dict):
+    return CategoryRule(spec) if "categories" in spec else ThresholdRule(spec)
+
+
+class FallbackRuleSet:
+    """A compiled rule set: base hours, multipliers applied in order, optional clamp."""
+
+    def __init__(self, spec: dict):
+        self.base = compile_rule(spec["base"])
+        self.multipliers = [compile_rule(rule) for rule in spec.get("multipliers", [])]
+        clamp = spec.get("clamp")
+        self.clamp = (float(clamp[0]), float(clamp[1])) if clamp else None
+        self.rules = [self.base] + self.multipliers
+
+    @property
+    def inputs(self) -> dict:
+        """Inputs read by the rules, with the value used when a sensor reading is missing."""
+        return {rule.input: rule.default for rule in self.rules}
+
+    def evaluate(self, columns: dict) -> np.ndarray:
+        """
+        Hours until watering for a batch of inputs.
+
+        Args:
+            columns: One array (or list, for categorical inputs) per input name
+
+        Returns:
+            np.ndarray: Fallback hours, one per row
+        """
+        hours = self.base.evaluate(columns[self.base.input])
+        # Multiply one rule at a time, in table order, so results match the scalar rules bit for bit
+        for rule in self.multipliers:
+            hours = hours * rule.evaluate(columns[rule.input])
+        if self.clamp is not None:
+            hours = np.clip(hours, *self.clamp)
+        return hours
+
+
+class FallbackRules:
+    """Compiled fallback rule sets, keyed by fallback reason."""
+
+    def __init__(self, spec: dict):
+        self.rule_sets = {reason: FallbackRuleSet(rule_set) for reason, rule_set in spec.items()}
+        if DEFAULT_RULE_SET not in self.rule_sets:
+            raise ValueError(f"Fallback rules need a '{DEFAULT_RULE_SET}' rule set")
+
+    def rule_set(self, reason: str) -> FallbackRuleSet:
+        return self.rule_sets.get(reason, self.rule_sets[DEFAULT_RULE_SET])
+
+    def predict(self, payloads: List, reason: str) -> np.ndarray:
+        """
+        Fallback hours for a batch of prediction requests.
+
+        Sensor readings are gathered into one column per input the rule set reads
+        (the last reading wins when a sensor is repeated), then every rule is applied
+        to the whole batch at once.
+        """
+        rule_set = self.rule_set(reason)
+        n = len(payloads)
+        columns = {}
+        for name, default in rule_set.inputs.items():
+            if name in PAYLOAD_FIELDS:
+                values = [getattr(payload, name) for payload in payloads]
+                columns[name] = values if name == "plantGrowthStage" else np.array(values, dtype=float)
+            else:
+                columns[name] = np.full(n, default, dtype=float)
+
+        sensors = {name: column for name, column in columns.items() if name not in PAYLOAD_FIELDS}
+        for i, payload in enumerate(payloads):
+            for reading in payload.mlSensorReadings:
+                column = sensors.get(reading.SensorName)
+                if column is not None:
+                    column[i] = reading.Value
+        return rule_set.evaluate(columns)
+
+    def predict_columns(self, raw: dict, stage_names: dict, reason: str) -> np.ndarray:
+        """
+        Fallback hours for readings already decoded into columns (see compact_format.py).
+
+        Args:
+            raw: One float array per raw input name, NaN where a reading is missing
+            stage_names: Growth stage code to the plantGrowthStage name the rules match
+            reason: Fallback reason selecting the rule set
+        """
+        rule_set = self.rule_set(reason)
+        n = len(raw["growth_stage"])
+        columns = {}
+        for name, default in rule_set.inputs.items():
+            if name == "plantGrowthStage":
+                columns[name] = [stage_names.get(code) for code in raw["growth_stage"].tolist()]
+            elif name in raw:
+                columns[name] = np.where(np.isnan(raw[name]), default, raw[name])
+            else:
+                # Sensors the compact schema has no field for are always missing
+                columns[name] = np.full(n, default, dtype=float)
+        return rule_set.evaluate(columns)
+
+
+def load_fallback_rules(path: Optional[str] = FALLBACK_RULES_PATH) -> FallbackRules:
+    """DEFAULT_FALLBACK_RULES with the rule sets from the JSON file at path, if set, replacing or added."""
+    spec = dict(DEFAULT_FALLBACK_RULES)
+    if path:
+        with open(path) as f:
+            spec.update(json.load(f))
+    return FallbackRules(spec)
+
+
+# Process-wide rules used by the prediction service
+fallback_rules = load_fallback_rules()
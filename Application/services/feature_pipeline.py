@@ -0,0 +1,195 @@
+import os
+import json
+from typing import Optional
+
+import numpy as np
+
+from Application.services.bed_state import TEMPORAL_FEATURE_NAMES, FeatureReplay, bed_state_store
+
+# Bump when a feature is added, removed, reordered or computed differently; models trained
+# with another version are refused by the registry
+FEATURE_PIPELINE_VERSION = 1
+
+# Raw inputs in model column order, with the value used when a reading is missing
+RAW_INPUT_DEFAULTS = {
+    "Temperature": 25.0,
+    "Soil Humidity": 40.0,
+    "Air Humidity": 50.0,
+    "Light": 200.0,
+    "CO2": 400.0,
+    "PIR": 0.0,
+    "Proximity": 0.0,
+    "timeSinceLastWateringInHours": 0.0,
+    "growth_stage": 1.0,
+}
+RAW_INPUT_NAMES = list(RAW_INPUT_DEFAULTS)
+
+# Map growth stage to numeric values
+GROWTH_STAGE_MAP = {
+    "Seedling": 0,
+    "Seedling Stage": 0,
+    "Vegetative": 1,
+    "Vegetative Stage": 1,
+    "Flowering": 2,
+    "Flowering Stage": 2
+}
+DEFAULT_GROWTH_STAGE = 1
+
+# Engineered features, each written once; the expressions work unchanged on Python floats
+# (one row) and on NumPy columns (many rows), so both paths compute bit-identical values
+DERIVED_FEATURES = [
+    ("temp_soil", lambda c: c["Temperature"] * c["Soil Humidity"] / 100.0),
+    ("temp_air", lambda c: c["Temperature"] * c["Air Humidity"] / 100.0),
+    ("light_temp", lambda c: c["Light"] * c["Temperature"] / 1000.0),
+    ("soil_air", lambda c: c["Soil Humidity"] * c["Air Humidity"] / 100.0),
+    ("time_soil", lambda c: c["timeSinceLastWateringInHours"] * c["Soil Humidity"] / 100.0),
+    ("temp_squared", lambda c: c["Temperature"] * c["Temperature"] / 100.0),
+    ("soil_squared", lambda c: c["Soil Humidity"] * c["Soil Humidity"] / 100.0),
+]
+
+# Column names the models are trained with (sklearn's feature_names_in_)
+FEATURE_NAMES = [
+    "Temperature", "Soil Humidity", "Air Humidity", "Light", "co2", "pir", "proximity",
+    "timeSinceLastWateringInHours", "growth_stage",
+] + [name for name, _ in DERIVED_FEATURES]
+
+# Rolling per-bed features appended by temporal pipelines (see bed_state.py), with the value
+# used when a request has no bedId: what a bed with a single reading produces
+TEMPORAL_FEATURE_DEFAULTS = [
+    ("soil_humidity_slope", lambda c: 0.0),
+    ("temperature_rolling_mean", lambda c: c["Temperature"]),
+    ("drying_rate", lambda c: 0.0),
+]
+
+FEATURES_PREFIX = "reg_features_"
+
+
+def feature_spec_path_for(model_path: str) -> str:
+    """Return the feature pipeline spec saved next to a reg_model_*.pkl file."""
+    folder, name = os.path.split(model_path)
+    return os.path.join(folder, name.replace("reg_model_", FEATURES_PREFIX, 1).rsplit(".", 1)[0] + ".json")
+
+
+class FeaturePipeline:
+    """
+    The 16 model features, shared by training, serving, bulk scoring and surrogates.
+
+    transform_one builds a single row from Python floats with no NumPy overhead;
+    transform builds an (n_rows, 16) matrix column-wise. Both evaluate the same
+    DERIVED_FEATURES expressions.
+
+    A temporal pipeline appends the rolling per-bed features after the 16; temporal
+    holds the bed state settings they were computed with, which serving must match.
+    """
+
+    def __init__(self, version: int = FEATURE_PIPELINE_VERSION, temporal: Optional[dict] = None):
+        self.version = version
+        self.temporal = temporal
+        self.feature_names = list(FEATURE_NAMES) + (list(TEMPORAL_FEATURE_NAMES) if temporal else [])
+        self.n_features = len(self.feature_names)
+
+    def transform_one(self, raw: dict) -> list:
+        """One feature row from a mapping of raw input name to value (missing inputs use defaults)."""
+        columns = {name: float(raw.get(name, default)) for name, default in RAW_INPUT_DEFAULTS.items()}
+        row = list(columns.values()) + [expression(columns) for _, expression in DERIVED_FEATURES]
+        if self.temporal:
+            row += [float(raw[name]) if name in raw else default(columns) for name, default in TEMPORAL_FEATURE_DEFAULTS]
+        return row
+
+    def transform(self, raw: dict) -> np.ndarray:
+        """
+        Feature matrix from a mapping of raw input name to a column of values.
+
+        Scalars are broadcast; missing inputs use defaults.
+
+        Returns:
+            np.ndarray: (n_rows, n_features) float64 matrix
+        """
+        n = max((np.size(value) for value in raw.values()), default=1)
+        out = np.empty((n, self.n_features))
+        columns = {}
+        for i, (name, default) in enumerate(RAW_INPUT_DEFAULTS.items()):
+            out[:, i] = raw.get(name, default)
+            columns[name] = out[:, i]
+        for i, (_, expression) in enumerate(DERIVED_FEATURES, start=len(RAW_INPUT_DEFAULTS)):
+            out[:, i] = expression(columns)
+        if self.temporal:
+            for i, (name, default) in enumerate(TEMPORAL_FEATURE_DEFAULTS, start=len(FEATURE_NAMES)):
+                out[:, i] = raw[name] if name in raw else default(columns)
+        return out
+
+    def transform_frame(self, df, replay: Optional[FeatureReplay] = None) -> np.ndarray:
+        """
+        Feature matrix from a DataFrame with the cleaned_data_greenhouse.csv schema.
+
+        Temporal pipelines replay the rows through bed histories in timestamp order, one
+        bed per bedId value (the whole frame is one bed without that column). Pass the same
+        replay for consecutive chunks of one file to carry the histories over; by default
+        the frame is replayed on its own.
+        """
+        # CO2, PIR and Proximity are not in the training data and fall back to their defaults
+        raw = {name: df[name].to_numpy(dtype=float) for name in RAW_INPUT_NAMES[:8] if name in df.columns}
+        stages = df["plantGrowthStage"].map(GROWTH_STAGE_MAP).astype(float)
+        raw["growth_stage"] = stages.fillna(DEFAULT_GROWTH_STAGE).to_numpy()
+        if self.temporal:
+            bed_ids = df["bedId"].to_numpy() if "bedId" in df.columns else np.zeros(len(df))
+            replay = replay or FeatureReplay(**self.temporal)
+            rolling = replay.features(
+                bed_ids, df["timestamp"].tolist(),
+                *(raw.get(name, np.full(len(df), RAW_INPUT_DEFAULTS[name]))
+                  for name in ("Soil Humidity", "Temperature", "timeSinceLastWateringInHours"))
+            )
+            raw.update(zip(TEMPORAL_FEATURE_NAMES, rolling.T))
+        return self.transform(raw)
+
+    def spec(self) -> dict:
+        """Description saved with each trained model and compared when it is loaded."""
+        spec = {
+            "version": self.version,
+            "feature_names": self.feature_names,
+            "raw_input_defaults": RAW_INPUT_DEFAULTS,
+        }
+        if self.temporal:
+            spec["temporal"] = self.temporal
+        return spec
+
+    def save_spec(self, path: str) -> str:
+        with open(path, 'w') as f:
+            json.dump(self.spec(), f, indent=4)
+        return path
+
+    def check_spec(self, spec: Optional[dict]):
+        """
+        Raise if a model was trained with a different feature pipeline.
+
+        Raises:
+            ValueError: If the version, feature names or bed state settings differ
+        """
+        if spec is None:
+            return
+        if spec.get("version") != self.version or spec.get("feature_names") != self.feature_names:
+            raise ValueError(f"Model was trained with feature pipeline v{spec.get('version')}, "
+                             f"service uses v{self.version}")
+        if spec.get("temporal") != self.temporal:
+            raise ValueError(f"Model was trained with bed state settings {spec.get('temporal')}, "
+                             f"service uses {self.temporal}")
+
+
+def load_feature_spec(model_path: str) -> Optional[dict]:
+    """The spec saved next to model_path, or None for models trained before specs were saved."""
+    path = feature_spec_path_for(model_path)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def pipeline_for_spec(spec: Optional[dict]) -> "FeaturePipeline":
+    """The shared pipeline a model's saved spec asks for: temporal or not."""
+    return TEMPORAL_FEATURE_PIPELINE if spec and spec.get("temporal") else FEATURE_PIPELINE
+
+
+# Shared instances used by every caller
+FEATURE_PIPELINE = FeaturePipeline()
+# Temporal models are served with features from the process-wide bed state store
+TEMPORAL_FEATURE_PIPELINE = FeaturePipeline(temporal=bed_state_store.settings())
@@ -0,0 +1,154 @@
+import os
+import logging
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor, ExtraTreesRegressor
+
+logger = logging.getLogger(__name__)
+
+# Constants
+MODEL_ENGINE = os.environ.get("MODEL_ENGINE", "flat")  # "flat", "sklearn" or "surrogate"
+# Above this many rows sklearn's compiled predict is faster than the NumPy evaluator
+FLAT_FOREST_MAX_ROWS = int(os.environ.get("FLAT_FOREST_MAX_ROWS", "256"))
+
+
+class FlatForest:
+    """
+    A trained tree ensemble flattened into contiguous NumPy arrays.
+
+    All trees share one set of node arrays; roots holds the index of each tree's root
+    node and leaves point to themselves in left/right. Evaluation walks every
+    (tree, row) pair down one level per vectorized step, dropping pairs as they reach
+    a leaf, with no per-tree Python calls or joblib dispatch. missing_left records
+    which way sklearn sends NaN at each split.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth: int, n_features: int,
+                 is_leaf=None, missing_left=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features)
+        self.is_leaf = is_leaf if is_leaf is not None else left == np.arange(len(left))
+        self.missing_left = missing_left if missing_left is not None else np.zeros(len(left), dtype=bool)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @classmethod
+    def from_sklearn(cls, model) -> "FlatForest":
+        """
+        Export a fitted single-output RandomForestRegressor/ExtraTreesRegressor.
+
+        Raises:
+            TypeError: If the model is not a supported fitted forest
+        """
+        if not isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)):
+            raise TypeError(f"Cannot flatten model of type {type(model).__name__}")
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise TypeError("Only single-output forests can be flattened")
+
+        features, thresholds, lefts, rights, values, roots, missing_lefts = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            values.append(tree.value[:, 0, 0])
+            missing_left = getattr(tree, "missing_go_to_left", np.zeros(tree.node_count))
+            missing_lefts.append(~is_leaf & (np.asarray(missing_left) != 0))
+
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.int32),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.int32),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.int32),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            n_features=model.n_features_in_,
+            missing_left=np.concatenate(missing_lefts)
+        )
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Predict a (n_rows, n_features) matrix, or a single row, exactly as sklearn would.
+
+        NaN follows each split's missing value direction, as in sklearn.
+
+        Raises:
+            ValueError: If X has the wrong number of features, or values that are infinite
+            or too large for float32 (which sklearn refuses too)
+        """
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, but the forest expects {self.n_features_in_}")
+        # sklearn compares float32 inputs against float64 thresholds; round the same way
+        with np.errstate(over="ignore"):
+            X = np.ascontiguousarray(X, dtype=np.float32).astype(np.float64)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        has_nan = False
+        if not np.isfinite(flat_X).all():
+            if np.isinf(flat_X).any():
+                raise ValueError("Input X contains infinity or a value too large for dtype('float32').")
+            has_nan = True
+
+        # One slot per (tree, row) pair, tree-major
+        nodes = np.repeat(self.roots, n_rows)
+        row_offsets = np.tile(np.arange(n_rows) * n_features, self.n_trees)
+        active = np.flatnonzero(~self.is_leaf[nodes])
+        while active.size:
+            current = nodes[active]
+            x = flat_X[row_offsets[active] + self.feature[current]]
+            go_left = x <= self.threshold[current]
+            if has_nan:
+                go_left |= np.isnan(x) & self.missing_left[current]
+            following = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = following
+            active = active[~self.is_leaf[following]]
+
+        return self.value[nodes].reshape(self.n_trees, n_rows).mean(axis=0)
+
+
+def compile_forest(model, engine: str = MODEL_ENGINE):
+    """
+    Compile a loaded model into a FlatForest for low-latency serving.
+
+    Returns None when the flat engine is disabled, the model is not a supported forest,
+    or the compiled forest disagrees with the original model on a probe batch.
+    """
+    if engine != "flat":
+        return None
+    try:
+        flat = FlatForest.from_sklearn(model)
+    except TypeError:
+        return None
+
+    probe = np.random.default_rng(0).uniform(0, 100, size=(8, flat.n_features_in_))
+    # Include missing values, so the NaN directions are checked too
+    probe[np.arange(8), np.arange(8) % flat.n_features_in_] = np.nan
+    if not np.allclose(flat.predict(probe), model.predict(probe)):
+        logger.warning("Flattened forest disagrees with the original model, serving with sklearn")
+        return None
+    return flat
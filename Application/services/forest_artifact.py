@@ -0,0 +1,115 @@
+import os
+import json
+import shutil
+import numpy as np
+from datetime import datetime, timezone
+
+from Application.services.flat_forest import FlatForest
+
+# On-disk layout: <name>.forest/header.json plus one .npy file per node array
+FORMAT_NAME = "greenhouse-flat-forest"
+# Version 2 added missing_left; version 1 artifacts are refused, so their pickle is loaded instead
+FORMAT_VERSION = 2
+ARTIFACT_SUFFIX = ".forest"
+HEADER_FILE = "header.json"
+ARRAY_NAMES = ("feature", "threshold", "left", "right", "value", "roots", "is_leaf", "missing_left")
+
+
+def artifact_path_for(model_path: str) -> str:
+    """Return the artifact directory stored next to a reg_model_*.pkl file."""
+    return os.path.splitext(model_path)[0] + ARTIFACT_SUFFIX
+
+
+def save_forest_artifact(flat: FlatForest, path: str, metadata: dict = None) -> str:
+    """
+    Write a flat forest as a versioned directory of .npy arrays plus a JSON header.
+
+    The directory is written under a temporary name and renamed into place, so readers
+    never observe a partially written artifact.
+
+    Args:
+        flat: Forest to save
+        path: Target directory (conventionally artifact_path_for(model_path))
+        metadata: Optional extra information stored in the header
+
+    Returns:
+        str: Path to the artifact directory
+    """
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    arrays = {}
+    for name in ARRAY_NAMES:
+        array = np.ascontiguousarray(getattr(flat, name))
+        np.save(os.path.join(tmp_path, f"{name}.npy"), array, allow_pickle=False)
+        arrays[name] = {"dtype": str(array.dtype), "shape": list(array.shape)}
+
+    header = {
+        "format": FORMAT_NAME,
+        "format_version": FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "n_features": flat.n_features_in_,
+        "n_trees": flat.n_trees,
+        "n_nodes": flat.n_nodes,
+        "max_depth": flat.max_depth,
+        "arrays": arrays,
+        "metadata": metadata or {},
+    }
+    with open(os.path.join(tmp_path, HEADER_FILE), 'w') as f:
+        json.dump(header, f, indent=4)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_artifact_header(path: str) -> dict:
+    """
+    Read and check an artifact header.
+
+    Raises:
+        ValueError: If the directory is not a supported forest artifact
+    """
+    with open(os.path.join(path, HEADER_FILE)) as f:
+        header = json.load(f)
+    if header.get("format") != FORMAT_NAME:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} artifact")
+    if header.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact version {header.get('format_version')} in {path}")
+    return header
+
+
+def load_forest_artifact(path: str, mmap: bool = True) -> FlatForest:
+    """
+    Open a forest artifact, memory-mapping its arrays by default.
+
+    Memory-mapped arrays are backed by the page cache, so every worker process that
+    opens the same artifact shares a single physical copy of the forest.
+
+    Raises:
+        ValueError: If the header or arrays do not describe a consistent forest
+    """
+    header = read_artifact_header(path)
+    arrays = {}
+    for name in ARRAY_NAMES:
+        array = np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r' if mmap else None,
+                        allow_pickle=False)
+        # Plain ndarray view over the mapping avoids np.memmap overhead on every operation
+        arrays[name] = array.view(np.ndarray)
+        expected = header["arrays"][name]
+        if list(array.shape) != expected["shape"] or str(array.dtype) != expected["dtype"]:
+            raise ValueError(f"Array {name} in {path} does not match its header")
+
+    return FlatForest(
+        feature=arrays["feature"],
+        threshold=arrays["threshold"],
+        left=arrays["left"],
+        right=arrays["right"],
+        value=arrays["value"],
+        roots=arrays["roots"],
+        max_depth=header["max_depth"],
+        n_features=header["n_features"],
+        is_leaf=arrays["is_leaf"],
+        missing_left=arrays["missing_left"]
+    )
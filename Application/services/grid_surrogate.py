@@ -0,0 +1,116 @@
+import os
+import json
+import itertools
+import numpy as np
+from Application.services.feature_pipeline import FEATURE_PIPELINE, RAW_INPUT_NAMES
+
+# Position of each raw input in the 16-feature vector
+RAW_FEATURE_INDEX = {name: i for i, name in enumerate(RAW_INPUT_NAMES)}
+
+# Inputs that dominate the model and span the grid; all other inputs are held at reference values
+DEFAULT_GRID_AXES = ["Soil Humidity", "Temperature", "timeSinceLastWateringInHours", "growth_stage"]
+
+SURROGATE_PREFIX = "reg_surrogate_"
+
+
+def surrogate_path_for(model_path: str) -> str:
+    """Return the surrogate file built from a reg_model_*.pkl file."""
+    folder, name = os.path.split(model_path)
+    return os.path.join(folder, name.replace("reg_model_", SURROGATE_PREFIX, 1).rsplit(".", 1)[0] + ".npz")
+
+
+class GridSurrogate:
+    """
+    Dense lookup table of model predictions over a grid of the dominant inputs.
+
+    predict answers with multilinear interpolation between the 2^D surrounding grid
+    points, a fixed amount of work per row regardless of the size of the forest.
+    Inputs outside the grid are clamped to its edges.
+    """
+
+    def __init__(self, axis_names, axis_points, values, reference: dict, metadata: dict = None):
+        self.axis_names = list(axis_names)
+        self.axis_points = [np.asarray(points, dtype=float) for points in axis_points]
+        self.values = np.asarray(values, dtype=float)
+        self.reference = dict(reference)
+        self.metadata = metadata or {}
+        self.n_features_in_ = 16
+        self._columns = [RAW_FEATURE_INDEX[name] for name in self.axis_names]
+        self._corners = np.array(list(itertools.product((0, 1), repeat=len(self.axis_names))))
+
+    @classmethod
+    def build(cls, model, axis_points: dict, reference: dict, metadata: dict = None) -> "GridSurrogate":
+        """
+        Evaluate a model over the full grid.
+
+        Args:
+            model: Fitted model taking the 16-feature matrix
+            axis_points: Ordered mapping of input name to sorted grid points
+            reference: Values used for every raw input that is not a grid axis
+            metadata: Extra information stored with the surrogate
+        """
+        names = list(axis_points)
+        mesh = np.meshgrid(*[np.asarray(axis_points[name], dtype=float) for name in names], indexing="ij")
+        n = mesh[0].size
+
+        raw = {name: np.full(n, float(reference[name])) for name in RAW_FEATURE_INDEX}
+        for name, grid in zip(names, mesh):
+            raw[name] = grid.ravel()
+
+        features = FEATURE_PIPELINE.transform(raw)
+        values = np.asarray(model.predict(features), dtype=float).reshape(mesh[0].shape)
+        return cls(names, [axis_points[name] for name in names], values, reference, metadata)
+
+    def predict(self, X) -> np.ndarray:
+        """Interpolate predictions for a (n_rows, 16) feature matrix or a single row."""
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+
+        lower = np.empty((X.shape[0], len(self.axis_names)), dtype=np.intp)
+        fraction = np.empty((X.shape[0], len(self.axis_names)))
+        for d, (column, points) in enumerate(zip(self._columns, self.axis_points)):
+            x = np.clip(X[:, column], points[0], points[-1])
+            if len(points) == 1:
+                lower[:, d] = 0
+                fraction[:, d] = 0.0
+                continue
+            i = np.clip(np.searchsorted(points, x, side="right") - 1, 0, len(points) - 2)
+            lower[:, d] = i
+            fraction[:, d] = (x - points[i]) / (points[i + 1] - points[i])
+
+        result = np.zeros(X.shape[0])
+        upper_bound = np.array([len(points) - 1 for points in self.axis_points])
+        for corner in self._corners:
+            index = np.minimum(lower + corner, upper_bound)
+            weight = np.prod(np.where(corner, fraction, 1.0 - fraction), axis=1)
+            result += weight * self.values[tuple(index.T)]
+        return result
+
+    def error_report(self, model, X) -> dict:
+        """Compare the surrogate with the real model on a feature matrix."""
+        errors = np.abs(self.predict(X) - np.asarray(model.predict(X), dtype=float))
+        return {
+            "max_abs_error": float(errors.max()),
+            "mean_abs_error": float(errors.mean()),
+            "p95_abs_error": float(np.percentile(errors, 95)),
+            "n_samples": int(len(errors)),
+        }
+
+    def save(self, path: str) -> str:
+        meta = {
+            "axis_names": self.axis_names,
+            "reference": self.reference,
+            "metadata": self.metadata,
+        }
+        arrays = {f"axis_{d}": points for d, points in enumerate(self.axis_points)}
+        with open(path, 'wb') as f:
+            np.savez(f, values=self.values, meta=np.array(json.dumps(meta)), **arrays)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "GridSurrogate":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            axis_points = [data[f"axis_{d}"] for d in range(len(meta["axis_names"]))]
+            return cls(meta["axis_names"], axis_points, data["values"], meta["reference"], meta["metadata"])
@@ -0,0 +1,146 @@
+import os
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from Application.services.model_registry import LoadedModel
+
+# Constants
+INFERENCE_EXECUTOR = os.environ.get("INFERENCE_EXECUTOR", "thread")  # "thread" or "process"
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1))))
+INFERENCE_MAX_QUEUE = int(os.environ.get("INFERENCE_MAX_QUEUE", "64"))
+# Process pools kept alive, one per model snapshot: the active model and the previous one (rollback)
+INFERENCE_PROCESS_POOLS = 2
+
+
+class InferenceOverloadedError(Exception):
+    """Raised when the inference queue is full and the request should be retried later."""
+
+
+# Model snapshot served by a process-pool worker, handed over when the worker starts
+_worker_model: Optional[LoadedModel] = None
+
+
+def _init_process_worker(active: LoadedModel):
+    global _worker_model
+    _worker_model = active
+
+
+def _predict_in_process(features: np.ndarray) -> np.ndarray:
+    """Run predict inside a pool process with the snapshot its pool was started for."""
+    return _predict_in_thread(_worker_model, features)
+
+
+def _predict_in_thread(active: LoadedModel, features: np.ndarray) -> np.ndarray:
+    return np.asarray(active.predictor_for(len(features)).predict(features), dtype=float)
+
+
+class InferenceExecutor:
+    """
+    Runs CPU-bound model inference off the asyncio event loop.
+
+    At most max_workers predictions run at once and at most max_queue more may wait;
+    anything beyond that is rejected with InferenceOverloadedError instead of queueing
+    without bound, so latency stays bounded under overload and /health stays responsive.
+    """
+
+    def __init__(self, kind: str = INFERENCE_EXECUTOR, max_workers: int = INFERENCE_WORKERS,
+                 max_queue: int = INFERENCE_MAX_QUEUE):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown inference executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._pool = None
+        # Process pools keyed by the model snapshot their workers serve, oldest first
+        self._process_pools: "OrderedDict[LoadedModel, ProcessPoolExecutor]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        return self._pool
+
+    def _get_process_pool(self, active: LoadedModel) -> ProcessPoolExecutor:
+        """
+        The process pool serving a model snapshot, started on its first prediction.
+
+        Workers receive the snapshot itself when they start (inherited, not copied, when
+        forked), so they never read model files, which training may already have cleaned
+        up. Pools beyond INFERENCE_PROCESS_POOLS are shut down once their queued work is done.
+        """
+        with self._lock:
+            pool = self._process_pools.get(active)
+            if pool is not None:
+                self._process_pools.move_to_end(active)
+                return pool
+            pool = self._process_pools[active] = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=_init_process_worker, initargs=(active,)
+            )
+            retired = []
+            while len(self._process_pools) > INFERENCE_PROCESS_POOLS:
+                retired.append(self._process_pools.popitem(last=False)[1])
+        for old in retired:
+            old.shutdown(wait=False)
+        return pool
+
+    def _admit(self):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise InferenceOverloadedError(
+                    f"Inference queue full ({self._in_flight} requests in flight)"
+                )
+            self._in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    async def predict(self, active: LoadedModel, features: np.ndarray) -> np.ndarray:
+        """
+        Predict a feature matrix with the given model snapshot on the worker pool.
+
+        Raises:
+            InferenceOverloadedError: If the concurrency and queue limits are exhausted
+        """
+        self._admit()
+        try:
+            loop = asyncio.get_running_loop()
+            if self.kind == "process":
+                future = loop.run_in_executor(self._get_process_pool(active), _predict_in_process, features)
+            else:
+                future = loop.run_in_executor(self._get_pool(), _predict_in_thread, active, features)
+            return await future
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            pools = [self._pool, *self._process_pools.values()]
+            self._pool = None
+            self._process_pools.clear()
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Process-wide executor shared by all prediction endpoints
+inference_executor = InferenceExecutor()
@@ -0,0 +1,187 @@
+import time
+import bisect
+import threading
+from typing import Optional
+
+# Latency histogram bucket upper bounds in seconds (Prometheus "le" labels)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Stages of a /api/ml/predict request, in order
+PREDICT_STAGES = ("parse", "model_lookup", "features", "cache_lookup", "predict", "serialize")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with one time series per combination of label values."""
+
+    def __init__(self, name: str, documentation: str, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, label_values)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one time series per combination of label values."""
+
+    def __init__(self, name: str, documentation: str, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, *label_values, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values) -> int:
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (bucket_counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                    cumulative += bucket_count
+                    le = _labels(self.label_names, label_values, f'le="{_number(bound)}"')
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                labels = _labels(self.label_names, label_values)
+                lines.append(f"{self.name}_sum{labels} {_number(total)}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+# Metrics exported on /metrics
+PREDICT_STAGE_SECONDS = Histogram(
+    "greenhouse_predict_stage_seconds",
+    "Time spent in each stage of a prediction request",
+    label_names=("stage",)
+)
+PREDICT_REQUEST_SECONDS = Histogram(
+    "greenhouse_predict_request_seconds",
+    "End-to-end time of prediction requests, from receipt to response start",
+    label_names=("endpoint",)
+)
+PREDICTIONS_TOTAL = Counter(
+    "greenhouse_predictions_total",
+    "Predictions returned, by model version (fallback_<reason> for rule-based answers)",
+    label_names=("model_version",)
+)
+FALLBACKS_TOTAL = Counter(
+    "greenhouse_prediction_fallbacks_total",
+    "Predictions answered by the rule-based fallback, by reason",
+    label_names=("reason",)
+)
+
+ALL_METRICS = (PREDICT_STAGE_SECONDS, PREDICT_REQUEST_SECONDS, PREDICTIONS_TOTAL, FALLBACKS_TOTAL)
+
+
+def observe_stage(stage: str, started: float) -> float:
+    """Record the time since started for a stage and return the current perf_counter() value."""
+    now = time.perf_counter()
+    PREDICT_STAGE_SECONDS.observe(stage, value=now - started)
+    return now
+
+
+def record_result(model_version: Optional[str], fallback_reason: Optional[str]):
+    """Count one prediction result by model version and, for fallbacks, by reason."""
+    PREDICTIONS_TOTAL.inc(model_version or "unknown")
+    if fallback_reason:
+        FALLBACKS_TOTAL.inc(fallback_reason)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in ALL_METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    for metric in ALL_METRICS:
+        metric.reset()
+
+
+class RequestTimingMiddleware:
+    """
+    ASGI middleware timing request parsing and response serialization.
+
+    Stores the receipt time in the request state; endpoints compare it with their own
+    start time for the "parse" stage (body parsing and Pydantic validation) and set
+    handler_done_at when they return, so the time until the response starts is
+    recorded as the "serialize" stage.
+    """
+
+    def __init__(self, app, paths=("/api/ml/predict", "/api/ml/predict/batch")):
+        self.app = app
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        received_at = time.perf_counter()
+        state = scope.setdefault("state", {})
+        state["received_at"] = received_at
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                handler_done_at = state.get("handler_done_at")
+                if handler_done_at is not None:
+                    PREDICT_STAGE_SECONDS.observe("serialize", value=now - handler_done_at)
+                PREDICT_REQUEST_SECONDS.observe(scope["path"], value=now - received_at)
+            await send(message)
+
+        await self.app(scope, receive, timed_send)
@@ -0,0 +1,162 @@
+import os
+import time
+import asyncio
+from typing import Optional
+
+import numpy as np
+
+from Application.services.model_registry import LoadedModel
+from Application.services.inference_executor import InferenceExecutor, InferenceOverloadedError, inference_executor
+
+# Constants
+MICRO_BATCH_ENABLED = os.environ.get("MICRO_BATCH_ENABLED", "false").lower() in ("1", "true", "yes")
+MICRO_BATCH_WINDOW_MS = float(os.environ.get("MICRO_BATCH_WINDOW_MS", "2"))
+MICRO_BATCH_MAX_SIZE = int(os.environ.get("MICRO_BATCH_MAX_SIZE", "64"))
+# Rows allowed to wait for a batch; more are rejected with InferenceOverloadedError
+MICRO_BATCH_MAX_QUEUE = int(os.environ.get("MICRO_BATCH_MAX_QUEUE", "1024"))
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predictions into one vectorized predict call.
+
+    The first request to arrive opens a window of window_ms; every row queued before
+    the window closes (up to max_batch_size) is stacked into one matrix and predicted
+    together on the inference executor. Each caller's future gets its own row's result.
+
+    At most max_queue rows wait for a batch, and at most the executor's max_workers
+    batches are predicted at once; while all of them are busy, rows keep queueing and
+    form larger batches, and rows beyond max_queue get InferenceOverloadedError.
+    """
+
+    def __init__(self, executor: InferenceExecutor, enabled: bool = MICRO_BATCH_ENABLED,
+                 window_ms: float = MICRO_BATCH_WINDOW_MS, max_batch_size: int = MICRO_BATCH_MAX_SIZE,
+                 max_queue: int = MICRO_BATCH_MAX_QUEUE):
+        self.executor = executor
+        self.enabled = enabled
+        self.window_seconds = max(0.0, window_ms) / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_queue = max(1, max_queue)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._flush_slots: Optional[asyncio.Semaphore] = None
+        self._flushes = set()
+        self._rejected = 0
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self._batches = 0
+        self._items = 0
+        self._size_buckets = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self._queue_wait_sum = 0.0
+        self._queue_wait_max = 0.0
+
+    def _ensure_worker(self):
+        # The queue and worker task belong to the running loop; recreate them if it changed
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._flush_slots = asyncio.Semaphore(self.executor.max_workers)
+            self._worker = loop.create_task(self._run())
+
+    async def predict(self, active: LoadedModel, features: np.ndarray) -> float:
+        """
+        Queue one feature row for the next batch and wait for its prediction.
+
+        Raises:
+            InferenceOverloadedError: If max_queue rows are already waiting
+        """
+        self._ensure_worker()
+        future = self._loop.create_future()
+        try:
+            self._queue.put_nowait((active, features, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self._rejected += 1
+            raise InferenceOverloadedError(f"Micro-batch queue full ({self.max_queue} rows waiting)")
+        return await future
+
+    async def _run(self):
+        queue, slots = self._queue, self._flush_slots
+        while True:
+            # Wait for a free flush slot first, so rows arriving meanwhile join this batch
+            await slots.acquire()
+            batch = [await queue.get()]
+            if queue.qsize() < self.max_batch_size - 1 and self.window_seconds > 0:
+                await asyncio.sleep(self.window_seconds)
+            while len(batch) < self.max_batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            # Keep collecting while the batch is predicted
+            flush = asyncio.get_running_loop().create_task(self._flush(batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+            flush.add_done_callback(lambda _: slots.release())
+
+    async def _flush(self, batch):
+        started = time.perf_counter()
+        self._record(batch, started)
+
+        # A model swap may land mid-window: predict each snapshot's rows with that snapshot
+        groups = {}
+        for item in batch:
+            groups.setdefault(id(item[0]), []).append(item)
+
+        for items in groups.values():
+            active = items[0][0]
+            try:
+                predictions = await self.executor.predict(active, np.vstack([item[1] for item in items]))
+            except Exception as e:
+                for _, _, future, _ in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, _, future, _), prediction in zip(items, predictions):
+                if not future.done():
+                    future.set_result(float(prediction))
+
+    def _record(self, batch, started: float):
+        self._batches += 1
+        self._items += len(batch)
+        for index, bound in enumerate(BATCH_SIZE_BUCKETS):
+            if len(batch) <= bound:
+                self._size_buckets[index] += 1
+                break
+        else:
+            self._size_buckets[-1] += 1
+        for item in batch:
+            wait = started - item[3]
+            self._queue_wait_sum += wait
+            self._queue_wait_max = max(self._queue_wait_max, wait)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "window_ms": self.window_seconds * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "max_queue": self.max_queue,
+            "batches": self._batches,
+            "items": self._items,
+            "mean_batch_size": self._items / self._batches if self._batches else 0.0,
+            "batch_size_buckets": {
+                **{str(bound): count for bound, count in zip(BATCH_SIZE_BUCKETS, self._size_buckets)},
+                "+Inf": self._size_buckets[-1],
+            },
+            "queue_wait_seconds_sum": self._queue_wait_sum,
+            "queue_wait_seconds_max": self._queue_wait_max,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "flushing": len(self._flushes),
+            "rejected": self._rejected,
+        }
+
+    def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+
+# Process-wide batcher used by analyze_prediction when MICRO_BATCH_ENABLED is set
+micro_batcher = MicroBatcher(inference_executor)
@@ -1,222 +1,348 @@
 import os
-import glob
-import traceback
-import joblib
-import pickle
+import math
+import time
+import asyncio
+import logging
+import numpy as np
 from datetime import datetime, timezone
+from typing import List
 from Application.Dtos.predict import PredictionRequestDto, PredictionResultDto
+from Application.services.model_registry import model_registry, MODULE_ERROR_REASON, MODEL_DIR
+from Application.services.inference_executor import inference_executor, InferenceOverloadedError
+from Application.services.micro_batcher import micro_batcher
+from Application.services.prediction_cache import prediction_cache, cache_generation
+from Application.services.structured_logging import success_sampler
+from Application.services.metrics import observe_stage
+from Application.services.fallback_rules import fallback_rules
+from Application.services.bed_state import bed_state_store, TEMPORAL_FEATURE_NAMES
+from Application.services.compact_format import CompactReadings, GROWTH_STAGE_NAMES
+from Application.services.feature_pipeline import (
+    FEATURE_PIPELINE, FeaturePipeline, RAW_INPUT_DEFAULTS, RAW_INPUT_NAMES, GROWTH_STAGE_MAP, DEFAULT_GROWTH_STAGE
+)
 
-# Constants
-MODEL_DIR = os.environ.get("MODEL_DIR", "Application/trained_models")
+logger = logging.getLogger(__name__)
+
+# Sensor readings taken from the payload; everything else comes from the request fields
+SENSOR_DEFAULTS = {name: RAW_INPUT_DEFAULTS[name] for name in RAW_INPUT_NAMES[:7]}
+# Fallback reason for a NaN or infinite input or prediction
+NON_FINITE_REASON = "prediction_error_NonFiniteValue"
+
+async def get_active_model():
+    """Return the registry's active model, loading it on a worker thread if startup did not."""
+    if model_registry.attempted:
+        return model_registry.get()
+    return await asyncio.to_thread(model_registry.ensure_loaded)
 
 async def analyze_prediction(payload: PredictionRequestDto) -> PredictionResultDto:
-    """Analyze sensor data and predict hours until watering is needed."""
+    """
+    Analyze sensor data and predict hours until watering is needed.
+
+    Raises:
+        InferenceOverloadedError: If the inference queue is full
+    """
     try:
-        # Find the most recent model file
-        model_files = glob.glob(os.path.join(MODEL_DIR, "reg_model_*.pkl"))
-        if not model_files:
-            print(f"[ML_MODEL] No model files found in {MODEL_DIR}")
-            return create_fallback_prediction(payload, "no_model_found")
+        # Every reading with a bedId extends the bed's history, whichever model answers
+        bed_features = observe_bed_state(payload)
 
-        model_path = max(model_files, key=os.path.getctime)
-        model_version = os.path.basename(model_path)  # Store version but don't return it
-        print(f"[ML_MODEL] Using model: {model_path}")
+        # Use the model held in memory by the registry (loaded at startup)
+        started = time.perf_counter()
+        active = await get_active_model()
+        started = observe_stage("model_lookup", started)
+        if active is None:
+            failure = model_registry.failure
+            if failure.reason == MODULE_ERROR_REASON:
+                return create_fallback_model_prediction(payload, failure.model_path)
+            return create_fallback_prediction(payload, failure.reason)
 
-        try:
-            # Try to load the model with normal joblib first
-            model = joblib.load(model_path)
-        except ModuleNotFoundError as e:
-            print(f"[ML_MODEL] Prediction error: {str(e)}")
-            print(f"[ML_MODEL] Error details: {traceback.format_exc()}")
-
-            # Try alternate loading methods if it's a numpy._core issue
-            if "numpy._core" in str(e):
-                try:
-                    print(f"[ML_MODEL] Trying alternate model loading with pickle")
-                    with open(model_path, 'rb') as f:
-                        model = pickle.load(f, encoding='latin1')
-                    print(f"[ML_MODEL] Successfully loaded with alternate method")
-                    # Continue to prediction with the loaded model
-                    features = extract_features_from_payload(payload)
-                    prediction = model.predict([features])[0]
-                    print(f"[ML_API] Successful prediction: {prediction:.2f} hours using pickle_compatible_{model_version}")
-                    return PredictionResultDto(
-                        PredictionTime=datetime.now(timezone.utc),  # Updated to use timezone-aware datetime
-                        HoursUntilNextWatering=float(prediction),
-                        modelVersion=f"pickle_compatible_{model_version}"
-                    )
-                except Exception as pickle_error:
-                    print(f"[ML_MODEL] Alternate loading also failed: {str(pickle_error)}")
-                    print(f"[ML_MODEL] Error details: {traceback.format_exc()}")
-                    # Fall back to rule-based prediction
-                    return create_fallback_model_prediction(payload, model_path)
-            else:
-                # For other module errors, use fallback
-                return create_fallback_model_prediction(payload, model_path)
-        except Exception as e:
-            print(f"[ML_MODEL] Error loading model: {str(e)}")
-            print(f"[ML_MODEL] Error details: {traceback.format_exc()}")
-            return create_fallback_prediction(payload, f"model_load_error_{type(e).__name__}")
+        # Extract features for prediction (with the rolling bed features if the model was trained with them)
+        features = extract_features_from_payload(payload, active.feature_pipeline, bed_features)
+        started = observe_stage("features", started)
 
-        # Extract features for prediction
-        features = extract_features_from_payload(payload)
+        # NaN or infinite readings are answered by the fallback rules, never by the model
+        if not np.isfinite(features).all():
+            logger.warning("Non-finite input for model %s", active.version, extra={"event": "prediction_error"})
+            return create_fallback_prediction(payload, NON_FINITE_REASON)
 
-        # Make prediction
+        # Near-identical readings for the same model are answered from the cache
+        generation = cache_generation(active)
+        cache_key = prediction_cache.make_key(features)
+        prediction = prediction_cache.get(generation, cache_key)
+        started = observe_stage("cache_lookup", started)
+        if prediction is not None:
+            return PredictionResultDto(
+                PredictionTime=datetime.now(timezone.utc),
+                HoursUntilNextWatering=prediction,
+                modelVersion=active.version
+            )
+
+        # Make prediction on the inference pool so the event loop stays free
         try:
-            prediction = model.predict([features])[0]
-            print(f"[ML_API] Successful prediction: {prediction:.2f} hours using model {model_version}")
+            row = np.asarray(features, dtype=float)
+            if micro_batcher.enabled:
+                # Coalesce with other requests arriving in the same window
+                prediction = await micro_batcher.predict(active, row)
+            else:
+                prediction = (await inference_executor.predict(active, row[np.newaxis, :]))[0]
+            observe_stage("predict", started)
+            if not math.isfinite(prediction):
+                logger.error("Model %s returned %s", active.version, prediction, extra={"event": "prediction_error"})
+                return create_fallback_prediction(payload, NON_FINITE_REASON)
+            prediction_cache.put(generation, cache_key, float(prediction))
+            if success_sampler() and logger.isEnabledFor(logging.INFO):
+                logger.info("Successful prediction: %.2f hours using model %s", prediction, active.version,
+                            extra={"event": "prediction", "hours": float(prediction), "model_version": active.version})
             return PredictionResultDto(
                 PredictionTime=datetime.now(timezone.utc),  # Updated to use timezone-aware datetime
                 HoursUntilNextWatering=float(prediction),
-                modelVersion=model_version
+                modelVersion=active.version
             )
+        except InferenceOverloadedError:
+            raise
         except Exception as e:
-            print(f"[ML_MODEL] Prediction failed: {str(e)}")
-            print(f"[ML_MODEL] Error details: {traceback.format_exc()}")
+            logger.error("Prediction failed: %s", e, exc_info=True, extra={"event": "prediction_error"})
             return create_fallback_prediction(payload, f"prediction_error_{type(e).__name__}")
 
+    except InferenceOverloadedError:
+        raise
     except Exception as e:
-        print(f"[ML_MODEL] Unexpected error: {str(e)}")
-        print(f"[ML_MODEL] Error details: {traceback.format_exc()}")
+        logger.error("Unexpected error: %s", e, exc_info=True, extra={"event": "prediction_error"})
         return create_fallback_prediction(payload, f"unexpected_error_{type(e).__name__}")
 
-def extract_features_from_payload(payload: PredictionRequestDto) -> list:
-    """Extract and compute features to match the 16 features expected by the model."""
-    sensor_dict = {reading.SensorName: reading.Value for reading in payload.mlSensorReadings}
-    
-    # Extract base features from payload
-    temperature = sensor_dict.get("Temperature", 25.0)
-    soil_humidity = sensor_dict.get("Soil Humidity", 40.0)
-    air_humidity = sensor_dict.get("Air Humidity", 50.0)
-    light = sensor_dict.get("Light", 200.0)
-    co2 = sensor_dict.get("CO2", 400.0)
-    pir = sensor_dict.get("PIR", 0.0)
-    proximity = sensor_dict.get("Proximity", 0.0)
-    time_since_watering = payload.timeSinceLastWateringInHours
-    
-    # Map growth stage to numeric values
-    growth_stage_map = {
-        "Seedling": 0,
-        "Seedling Stage": 0,
-        "Vegetative": 1,
-        "Vegetative Stage": 1,
-        "Flowering": 2,
-        "Flowering Stage": 2
-    }
-    growth_stage = growth_stage_map.get(payload.plantGrowthStage, 1)
-    
-    # Create engineered features to match what was likely used in training
-    # Feature interactions
-    temp_soil = temperature * soil_humidity / 100.0
-    temp_air = temperature * air_humidity / 100.0
-    light_temp = light * temperature / 1000.0
-    soil_air = soil_humidity * air_humidity / 100.0
-    time_soil = time_since_watering * soil_humidity / 100.0
-    
-    # Squared features
-    temp_squared = temperature * temperature / 100.0
-    soil_squared = soil_humidity * soil_humidity / 100.0
-    
-    # Create the full feature list (16 features)
-    features = [
-        temperature,           # 1. Temperature
-        soil_humidity,         # 2. Soil Humidity
-        air_humidity,          # 3. Air Humidity
-        light,                 # 4. Light
-        co2,                   # 5. CO2
-        pir,                   # 6. PIR
-        proximity,             # 7. Proximity
-        time_since_watering,   # 8. Hours since last watering
-        growth_stage,          # 9. Plant growth stage
-        temp_soil,             # 10. Temperature × Soil Humidity interaction
-        temp_air,              # 11. Temperature × Air Humidity interaction  
-        light_temp,            # 12. Light × Temperature interaction
-        soil_air,              # 13. Soil Humidity × Air Humidity interaction
-        time_soil,             # 14. Time × Soil Humidity interaction
-        temp_squared,          # 15. Temperature squared
-        soil_squared           # 16. Soil Humidity squared
+async def analyze_batch_prediction(payloads: List[PredictionRequestDto]) -> List[PredictionResultDto]:
+    """
+    Predict hours until watering for many payloads with a single model call, preserving order.
+
+    Raises:
+        InferenceOverloadedError: If the inference queue is full
+    """
+    if not payloads:
+        return []
+
+    # Readings are recorded in request order; several readings of one bed should be sent oldest first
+    bed_features = [observe_bed_state(payload) for payload in payloads]
+    active = await get_active_model()
+    if active is None:
+        failure = model_registry.failure
+        if failure.reason == MODULE_ERROR_REASON:
+            return create_fallback_model_predictions(payloads, failure.model_path)
+        return create_fallback_predictions(payloads, failure.reason)
+
+    try:
+        features = extract_feature_matrix(payloads, active.feature_pipeline, bed_features)
+        predictions = await predict_feature_matrix(active, features)
+    except InferenceOverloadedError:
+        raise
+    except Exception as e:
+        logger.error("Batch prediction failed: %s", e, exc_info=True, extra={"event": "prediction_error"})
+        return create_fallback_predictions(payloads, f"prediction_error_{type(e).__name__}")
+
+    return build_model_results(
+        active, predictions, lambda rows, reason: create_fallback_predictions([payloads[i] for i in rows], reason)
+    )
+
+async def analyze_compact_batch(readings: CompactReadings) -> List[PredictionResultDto]:
+    """
+    Predict hours until watering for readings decoded from the compact format, preserving order.
+
+    The decoded columns go straight into the feature matrix; no request DTO is built per reading.
+
+    Raises:
+        InferenceOverloadedError: If the inference queue is full
+    """
+    if not len(readings):
+        return []
+
+    raw = readings.raw_inputs()
+    bed_features = observe_compact_bed_state(readings, raw)
+    active = await get_active_model()
+    if active is None:
+        failure = model_registry.failure
+        if failure.reason == MODULE_ERROR_REASON:
+            return create_compact_fallback_predictions(readings, MODULE_ERROR_REASON,
+                                                       f"fallback_{os.path.basename(failure.model_path)}")
+        return create_compact_fallback_predictions(readings, failure.reason)
+
+    try:
+        features = add_bed_features(active.feature_pipeline.transform(raw), active.feature_pipeline, bed_features)
+        predictions = await predict_feature_matrix(active, features)
+    except InferenceOverloadedError:
+        raise
+    except Exception as e:
+        logger.error("Compact prediction failed: %s", e, exc_info=True, extra={"event": "prediction_error"})
+        return create_compact_fallback_predictions(readings, f"prediction_error_{type(e).__name__}")
+
+    return build_model_results(
+        active, predictions, lambda rows, reason: create_compact_fallback_predictions(readings, reason, rows=rows)
+    )
+
+async def predict_feature_matrix(active, features: np.ndarray) -> np.ndarray:
+    """
+    Predictions for a feature matrix; only finite rows that miss the cache go to the model.
+
+    Rows with a NaN or infinite feature are predicted as NaN, so build_model_results
+    hands them to the fallback.
+    """
+    generation = cache_generation(active)
+    finite = np.isfinite(features).all(axis=1)
+    cache_keys = [prediction_cache.make_key(row) if ok else None for row, ok in zip(features, finite)]
+    predictions = np.array([prediction_cache.get(generation, key) for key in cache_keys], dtype=float)
+    misses = np.flatnonzero(np.isnan(predictions) & finite)
+    if misses.size:
+        predictions[misses] = await inference_executor.predict(active, features[misses])
+        for index in misses:
+            if np.isfinite(predictions[index]):
+                prediction_cache.put(generation, cache_keys[index], float(predictions[index]))
+    return predictions
+
+def build_model_results(active, predictions: np.ndarray, fallback) -> List[PredictionResultDto]:
+    """
+    Result DTOs for a batch predicted by the model.
+
+    Args:
+        active: The model that made the predictions
+        predictions: One prediction per item, in order
+        fallback: Called as fallback(rows, reason) for the rows with a non-finite prediction;
+            returns their fallback results in the same order
+    """
+    prediction_time = datetime.now(timezone.utc)
+    results = [
+        PredictionResultDto(
+            PredictionTime=prediction_time,
+            HoursUntilNextWatering=float(prediction),
+            modelVersion=active.version
+        ) if np.isfinite(prediction) else None
+        for prediction in predictions
     ]
-    
+    invalid = [i for i, result in enumerate(results) if result is None]
+    if invalid:
+        for i, result in zip(invalid, fallback(invalid, NON_FINITE_REASON)):
+            results[i] = result
+    if success_sampler() and logger.isEnabledFor(logging.INFO):
+        logger.info("Batch prediction of %d items using model %s", len(results), active.version,
+                    extra={"event": "batch_prediction", "items": len(results), "model_version": active.version})
+    return results
+
+def observe_bed_state(payload: PredictionRequestDto) -> dict:
+    """Record a payload's reading in its bed's history and return the bed's rolling features ({} without a bedId)."""
+    if payload.bedId is None:
+        return {}
+    sensors = {reading.SensorName: reading.Value for reading in payload.mlSensorReadings}
+    soil = sensors.get("Soil Humidity", SENSOR_DEFAULTS["Soil Humidity"])
+    temperature = sensors.get("Temperature", SENSOR_DEFAULTS["Temperature"])
+    # A NaN or infinite reading would poison the bed's window sums; its row is answered by the fallback anyway
+    if not (math.isfinite(soil) and math.isfinite(temperature)):
+        return {}
+    return bed_state_store.update(payload.bedId, payload.timestamp, soil, temperature,
+                                  payload.timeSinceLastWateringInHours)
+
+def observe_compact_bed_state(readings: CompactReadings, raw: dict) -> List[dict]:
+    """
+    Record the compact readings that carry a bedId in their beds' histories, in order.
+
+    Compact bed ids are numbers; bed 7 is the same bed as bedId "7" in JSON requests.
+
+    Args:
+        readings: The decoded readings
+        raw: Their raw inputs with missing values already defaulted
+    """
+    bed_features = [{}] * len(readings)
+    for i in np.flatnonzero(readings.bed_ids).tolist():
+        bed_features[i] = bed_state_store.update(
+            str(int(readings.bed_ids[i])),
+            datetime.fromtimestamp(float(readings.timestamps[i]), timezone.utc),
+            float(raw["Soil Humidity"][i]),
+            float(raw["Temperature"][i]),
+            float(raw["timeSinceLastWateringInHours"][i])
+        )
+    return bed_features
+
+def extract_features_from_payload(payload: PredictionRequestDto, feature_pipeline: FeaturePipeline = FEATURE_PIPELINE,
+                                  bed_features: dict = None) -> list:
+    """Extract and compute the features expected by the model for one payload (16, plus 3 for temporal models)."""
+    raw = {reading.SensorName: reading.Value for reading in payload.mlSensorReadings if reading.SensorName in SENSOR_DEFAULTS}
+    raw["timeSinceLastWateringInHours"] = payload.timeSinceLastWateringInHours
+    raw["growth_stage"] = GROWTH_STAGE_MAP.get(payload.plantGrowthStage, DEFAULT_GROWTH_STAGE)
+    if bed_features:
+        raw.update(bed_features)
+    return feature_pipeline.transform_one(raw)
+
+def extract_feature_matrix(payloads: List[PredictionRequestDto], feature_pipeline: FeaturePipeline = FEATURE_PIPELINE,
+                           bed_features: List[dict] = None) -> np.ndarray:
+    """
+    Build the (n_payloads, n_features) feature matrix for a batch of payloads.
+
+    Only the raw sensor lookup loops over payloads; the engineered features are
+    computed column-wise and match extract_features_from_payload row by row.
+    """
+    n = len(payloads)
+    raw = {name: np.full(n, default) for name, default in SENSOR_DEFAULTS.items()}
+    time_since_watering = np.empty(n)
+    growth_stage = np.empty(n)
+
+    for i, payload in enumerate(payloads):
+        for reading in payload.mlSensorReadings:
+            column = raw.get(reading.SensorName)
+            if column is not None:
+                column[i] = reading.Value
+        time_since_watering[i] = payload.timeSinceLastWateringInHours
+        growth_stage[i] = GROWTH_STAGE_MAP.get(payload.plantGrowthStage, DEFAULT_GROWTH_STAGE)
+
+    raw["timeSinceLastWateringInHours"] = time_since_watering
+    raw["growth_stage"] = growth_stage
+    return add_bed_features(feature_pipeline.transform(raw), feature_pipeline, bed_features)
+
+def add_bed_features(features: np.ndarray, feature_pipeline: FeaturePipeline, bed_features: List[dict]) -> np.ndarray:
+    """Write the rolling bed features into the last columns of a temporal feature matrix, in place."""
+    # Rows without a bedId keep the pipeline's single-reading defaults
+    if feature_pipeline.temporal and bed_features:
+        rows = [i for i, values in enumerate(bed_features) if values]
+        if rows:
+            features[rows, -len(TEMPORAL_FEATURE_NAMES):] = [
+                [bed_features[i][name] for name in TEMPORAL_FEATURE_NAMES] for i in rows
+            ]
     return features
 
 def create_fallback_model_prediction(payload: PredictionRequestDto, model_path: str) -> PredictionResultDto:
-    print("[ML_MODEL] Creating simple fallback model")
-    sensor_dict = {reading.SensorName: reading.Value for reading in payload.mlSensorReadings}
-    soil_humidity = sensor_dict.get("Soil Humidity", 50)
-    if soil_humidity < 20:
-        hours = 4.0
-    elif soil_humidity < 30:
-        hours = 12.0
-    elif soil_humidity < 40:
-        hours = 24.0
-    elif soil_humidity < 50:
-        hours = 36.0
-    else:
-        hours = 48.0
-    temperature = sensor_dict.get("Temperature", 25)
-    if temperature > 30:
-        hours *= 0.7
-    elif temperature < 15:
-        hours *= 1.3
-    if payload.plantGrowthStage in ["Seedling", "Seedling Stage"]:
-        hours *= 0.9
-    elif payload.plantGrowthStage in ["Flowering", "Flowering Stage"]:
-        hours *= 1.1
-    
-    model_name = os.path.basename(model_path)
-    print(f"[ML_API] Fallback prediction: {hours:.2f} hours (fallback_{model_name})")
-    
-    return PredictionResultDto(
-        PredictionTime=datetime.now(timezone.utc),  # Updated to use timezone-aware datetime
-        HoursUntilNextWatering=float(hours),
-        modelVersion=f"fallback_{model_name}"
-    )
+    """Rule-based prediction used when the model file exists but cannot be loaded."""
+    return create_fallback_model_predictions([payload], model_path)[0]
 
 def create_fallback_prediction(payload: PredictionRequestDto, reason: str) -> PredictionResultDto:
-    print(f"[ML_MODEL] Using fallback prediction due to: {reason}")
-    sensor_dict = {reading.SensorName: reading.Value for reading in payload.mlSensorReadings}
-    soil_humidity = sensor_dict.get("Soil Humidity", 50)
-    if soil_humidity < 20:
-        hours = 4.0
-    elif soil_humidity < 30:
-        hours = 12.0
-    elif soil_humidity < 40:
-        hours = 24.0
-    elif soil_humidity < 60:
-        hours = 36.0
+    """Rule-based prediction used when no model can answer, with the rule set for reason."""
+    return create_fallback_predictions([payload], reason)[0]
+
+def create_fallback_model_predictions(payloads: List[PredictionRequestDto], model_path: str) -> List[PredictionResultDto]:
+    """Rule-based predictions for a batch when the model file exists but cannot be loaded."""
+    return build_fallback_results(payloads, MODULE_ERROR_REASON, f"fallback_{os.path.basename(model_path)}")
+
+def create_fallback_predictions(payloads: List[PredictionRequestDto], reason: str) -> List[PredictionResultDto]:
+    """Rule-based predictions for a batch, evaluated with the fallback rule table in one pass."""
+    return build_fallback_results(payloads, reason, f"fallback_{reason}")
+
+def create_compact_fallback_predictions(readings: CompactReadings, reason: str, version: str = None,
+                                        rows: List[int] = None) -> List[PredictionResultDto]:
+    """Rule-based predictions for compact readings (only those at rows, if given), from their decoded columns."""
+    columns = readings.columns if rows is None else {name: column[rows] for name, column in readings.columns.items()}
+    hours = fallback_rules.predict_columns(columns, GROWTH_STAGE_NAMES, reason)
+    return fallback_results(hours, reason, version or f"fallback_{reason}")
+
+def build_fallback_results(payloads: List[PredictionRequestDto], reason: str, version: str) -> List[PredictionResultDto]:
+    return fallback_results(fallback_rules.predict(payloads, reason), reason, version)
+
+def fallback_results(hours: np.ndarray, reason: str, version: str) -> List[PredictionResultDto]:
+    if len(hours) == 1:
+        logger.warning("Fallback prediction: %.2f hours (%s)", hours[0], version,
+                       extra={"event": "fallback", "hours": float(hours[0]), "reason": reason})
     else:
-        hours = 48.0
-    if reason == "no_model_found":
-        print("[ML_MODEL] No model available, using extended fallback logic")
-        temperature = sensor_dict.get("Temperature", 25)
-        if temperature > 30:
-            hours *= 0.8
-        elif temperature < 15:
-            hours *= 1.2
-        air_humidity = sensor_dict.get("Air Humidity", 50)
-        if air_humidity < 30:
-            hours *= 0.9
-        elif air_humidity > 70:
-            hours *= 1.1
-        light = sensor_dict.get("Light", 200)
-        if light > 800:
-            hours *= 0.9
-        elif light < 100:
-            hours *= 1.1
-        if payload.plantGrowthStage in ["Seedling", "Seedling Stage"]:
-            hours *= 0.8
-        elif payload.plantGrowthStage in ["Vegetative", "Vegetative Stage"]:
-            hours *= 1.0
-        elif payload.plantGrowthStage in ["Flowering", "Flowering Stage"]:
-            hours *= 1.1
-        if payload.timeSinceLastWateringInHours > 48:
-            hours *= 0.8
-    hours = max(min(hours, 72.0), 1.0)
-    
-    print(f"[ML_API] Fallback prediction: {hours:.2f} hours (fallback_{reason})")
-    
-    return PredictionResultDto(
-        PredictionTime=datetime.now(timezone.utc),  # Updated to use timezone-aware datetime
-        HoursUntilNextWatering=float(hours),
-        modelVersion=f"fallback_{reason}"
-    )
\ No newline at end of file
+        logger.warning("Fallback predictions for %d items (%s)", len(hours), version,
+                       extra={"event": "fallback", "items": len(hours), "reason": reason})
+
+    prediction_time = datetime.now(timezone.utc)
+    return [
+        PredictionResultDto(
+            PredictionTime=prediction_time,
+            HoursUntilNextWatering=float(value),
+            modelVersion=version,
+            fallbackReason=reason
+        )
+        for value in hours
+    ]
@@ -0,0 +1,434 @@
+import os
+import glob
+import time
+import pickle
+import logging
+import threading
+import joblib
+import numpy as np
+from datetime import datetime, timezone
+from typing import Optional
+from Application.services.flat_forest import compile_forest, FLAT_FOREST_MAX_ROWS, MODEL_ENGINE
+from Application.services.forest_artifact import artifact_path_for, load_forest_artifact
+from Application.services.grid_surrogate import GridSurrogate, surrogate_path_for
+from Application.services.feature_pipeline import FEATURE_PIPELINE, FeaturePipeline, load_feature_spec, pipeline_for_spec
+
+logger = logging.getLogger(__name__)
+
+# Constants
+MODEL_DIR = os.environ.get("MODEL_DIR", "Application/trained_models")
+MODEL_PATTERN = "reg_model_*.pkl"
+MODEL_FORMAT = os.environ.get("MODEL_FORMAT", "auto")  # "auto" prefers the .forest artifact, "pickle" ignores it
+# With MODEL_ENGINE=surrogate, refuse surrogates whose recorded mean error (hours) exceeds this
+SURROGATE_MAX_MEAN_ERROR = float(os.environ.get("SURROGATE_MAX_MEAN_ERROR", "inf"))
+MODEL_POLL_INTERVAL_SECONDS = float(os.environ.get("MODEL_POLL_INTERVAL_SECONDS", "30"))
+
+# Number of features produced by the shared (non-temporal) feature pipeline
+EXPECTED_FEATURE_COUNT = FEATURE_PIPELINE.n_features
+
+# Failure reason used when the model file exists but cannot be unpickled in this
+# environment (e.g. saved with a different NumPy); callers use the simple model fallback
+MODULE_ERROR_REASON = "model_module_error"
+
+# Failure reason for models saved with a different feature pipeline version
+FEATURE_MISMATCH_REASON = "feature_pipeline_mismatch"
+
+# Failure reason for models the serving setup cannot serve (see ModelRegistry.requirement)
+MODEL_REFUSED_REASON = "model_refused"
+
+
+class LoadedModel:
+    """Snapshot of a model held in memory together with where and when it was loaded."""
+
+    def __init__(self, model, model_path: str, version: str, loaded_at: datetime, load_seconds: float,
+                 file_signature=None, flat_forest=None, surrogate=None,
+                 feature_pipeline: FeaturePipeline = FEATURE_PIPELINE):
+        self.model = model
+        self.model_path = model_path
+        self.version = version
+        self.loaded_at = loaded_at
+        self.load_seconds = load_seconds
+        self.file_signature = file_signature
+        self.flat_forest = flat_forest
+        self.surrogate = surrogate
+        # The pipeline the model was trained with: the shared 16 features, or those plus the bed state features
+        self.feature_pipeline = feature_pipeline
+        # Pickle loaded on demand for large batches when only the forest artifact was opened
+        self._batch_model = None
+        self._batch_model_lock = threading.Lock()
+        self._batch_model_attempted = False
+
+    def __getstate__(self):
+        # Pickled when handed to inference worker processes that are not forked
+        state = self.__dict__.copy()
+        del state["_batch_model_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._batch_model_lock = threading.Lock()
+
+    @property
+    def engine(self) -> str:
+        if self.surrogate is not None:
+            return "surrogate"
+        return "flat" if self.flat_forest is not None else "sklearn"
+
+    @property
+    def model_format(self) -> str:
+        """'forest' when served from a memory-mapped artifact alone, otherwise 'pickle'."""
+        return "forest" if self.model is None else "pickle"
+
+    def predictor_for(self, n_rows: int):
+        """Pick the faster implementation for a batch: the flat forest for small batches, sklearn for large ones."""
+        if self.surrogate is not None:
+            return self.surrogate
+        if self.flat_forest is not None and n_rows <= FLAT_FOREST_MAX_ROWS:
+            return self.flat_forest
+        model = self.model if self.model is not None else self.batch_model()
+        return model if model is not None else self.flat_forest
+
+    def batch_model(self):
+        """
+        The sklearn model of an artifact-only snapshot, loaded from the pickle on the first large batch.
+
+        Loading it costs the memory the artifact saves, and each worker process loads its
+        own copy; raise FLAT_FOREST_MAX_ROWS above the largest batch to never load it.
+
+        Returns:
+            The model, or None if the pickle cannot be loaded (the flat forest serves instead)
+        """
+        with self._batch_model_lock:
+            if not self._batch_model_attempted:
+                self._batch_model_attempted = True
+                try:
+                    self._batch_model, _ = load_model_file(self.model_path)
+                    logger.info("Loaded %s for batches above %d rows", self.version, FLAT_FOREST_MAX_ROWS)
+                except Exception as e:
+                    logger.warning("Could not load %s for large batches, using the flat forest: %s", self.version, e)
+            return self._batch_model
+
+
+class LoadFailure:
+    """Outcome of a load attempt that did not produce a usable model."""
+
+    def __init__(self, reason: str, model_path: Optional[str] = None):
+        self.reason = reason
+        self.model_path = model_path
+
+
+def find_latest_model_file(model_dir: str = MODEL_DIR) -> Optional[str]:
+    """Return the most recently created model file in model_dir, or None if there is none."""
+    model_files = glob.glob(os.path.join(model_dir, MODEL_PATTERN))
+    if not model_files:
+        return None
+    return max(model_files, key=os.path.getctime)
+
+
+def file_signature(model_path: str):
+    """Identify a model file by path and modification time so rewrites are detected."""
+    try:
+        return (model_path, os.path.getmtime(model_path))
+    except OSError:
+        return (model_path, None)
+
+
+def validate_model(model, expected_features: int = EXPECTED_FEATURE_COUNT):
+    """
+    Check that a freshly loaded model can serve predictions before it is swapped in.
+
+    Args:
+        model: The loaded model
+        expected_features: Features produced by the model's feature pipeline (default: 16)
+
+    Raises:
+        ValueError: If the model cannot predict a single row of expected_features
+    """
+    if not hasattr(model, "predict"):
+        raise ValueError("Loaded object has no predict method")
+    n_features = getattr(model, "n_features_in_", None)
+    if isinstance(n_features, (int, np.integer)) and n_features != expected_features:
+        raise ValueError(f"Model expects {n_features} features, service provides {expected_features}")
+    probe = np.asarray(model.predict(np.zeros((1, expected_features))), dtype=float)
+    if probe.shape != (1,) or not np.isfinite(probe).all():
+        raise ValueError(f"Model returned an invalid probe prediction: {probe!r}")
+
+
+def load_model_file(model_path: str):
+    """
+    Unpickle a model file, retrying with pickle/latin1 for NumPy version incompatibilities.
+
+    Returns:
+        tuple: (model, version)
+
+    Raises:
+        Exception: Whatever the final loading attempt raised
+    """
+    model_version = os.path.basename(model_path)
+    try:
+        return joblib.load(model_path), model_version
+    except ModuleNotFoundError as e:
+        if "numpy._core" not in str(e):
+            raise
+        logger.warning("NumPy incompatibility loading %s, trying pickle", model_version)
+        try:
+            with open(model_path, 'rb') as f:
+                model = pickle.load(f, encoding='latin1')
+        except Exception as pickle_error:
+            logger.error("Alternate loading also failed: %s", pickle_error)
+            raise e from pickle_error
+        return model, f"pickle_compatible_{model_version}"
+
+
+def load_serving_model(model_path: str, model_format: str = MODEL_FORMAT):
+    """
+    Load what is needed to serve a model file, preferring its memory-mapped forest artifact.
+
+    Returns:
+        tuple: (model, flat_forest, version); model is None when the artifact alone is
+        used and flat_forest is None when the pickle was loaded
+
+    Raises:
+        Exception: Whatever loading the pickle raised
+    """
+    artifact_path = artifact_path_for(model_path)
+    if model_format != "pickle" and os.path.isdir(artifact_path):
+        try:
+            return None, load_forest_artifact(artifact_path), os.path.basename(model_path)
+        except Exception as e:
+            logger.warning("Could not open %s: %s, loading pickle instead", artifact_path, e)
+    model, version = load_model_file(model_path)
+    return model, None, version
+
+
+def load_surrogate(model_path: str, feature_pipeline: FeaturePipeline = FEATURE_PIPELINE,
+                   engine: str = MODEL_ENGINE) -> Optional[GridSurrogate]:
+    """
+    Load the lookup-grid surrogate built from model_path when the surrogate engine is selected.
+
+    Surrogate grids cover the 16 snapshot features only, so models with a temporal
+    feature_pipeline never get one.
+    """
+    if engine != "surrogate" or feature_pipeline.temporal:
+        return None
+    path = surrogate_path_for(model_path)
+    if not os.path.exists(path):
+        logger.warning("Surrogate engine selected but %s does not exist, serving the model", path)
+        return None
+    surrogate = GridSurrogate.load(path)
+    mean_error = surrogate.metadata.get("mean_abs_error", float("inf"))
+    if mean_error > SURROGATE_MAX_MEAN_ERROR:
+        logger.warning("Surrogate mean error %.3fh exceeds %sh, serving the model",
+                       mean_error, SURROGATE_MAX_MEAN_ERROR)
+        return None
+    return surrogate
+
+
+class ModelRegistry:
+    """
+    Keeps the active prediction model resident in memory.
+
+    The model is loaded once (normally from the FastAPI lifespan hook) and the same
+    object is handed to every request, so steady-state requests only pay for predict.
+    New model files are loaded and validated off to the side and then swapped in with
+    a single reference assignment; requests that already hold the previous snapshot
+    finish with it. The previous model is kept so an operator can roll back.
+    """
+
+    def __init__(self, model_dir: str = MODEL_DIR):
+        self.model_dir = model_dir
+        self._lock = threading.Lock()
+        self._active: Optional[LoadedModel] = None
+        self._previous: Optional[LoadedModel] = None
+        self._failure: Optional[LoadFailure] = None
+        self._attempted = False
+        self._last_seen_signature = None
+        # Optional check of a loaded model against the serving setup: returns the reason to refuse it, or None
+        self.requirement = None
+
+    def load_latest(self) -> Optional[LoadedModel]:
+        """Load the newest model file in the model directory and make it the active model."""
+        self.reload(force=True)
+        return self._active
+
+    def reload(self, force: bool = False) -> Optional[LoadFailure]:
+        """
+        Load the newest model file if it differs from the active one and swap it in.
+
+        A model that fails to load or validate never replaces a working model.
+
+        Args:
+            force: Reload even if the newest file was already seen
+
+        Returns:
+            LoadFailure if the newest file could not be used, otherwise None
+        """
+        with self._lock:
+            self._attempted = True
+            model_path = find_latest_model_file(self.model_dir)
+            if model_path is None:
+                logger.warning("No model files found in %s", self.model_dir)
+                if self._active is None:
+                    self._failure = LoadFailure("no_model_found")
+                return LoadFailure("no_model_found")
+
+            signature = file_signature(model_path)
+            if not force and signature == self._last_seen_signature:
+                return None
+            self._last_seen_signature = signature
+
+            candidate, failure = self._load_candidate(model_path, signature)
+            if failure is not None:
+                if self._active is None:
+                    self._failure = failure
+                else:
+                    logger.error("Keeping %s after failed reload (%s)", self._active.version, failure.reason)
+                return failure
+
+            # Atomic swap: readers see either the old or the new snapshot, never a mix
+            if self._active is not None:
+                self._previous = self._active
+            self._active = candidate
+            self._failure = None
+            logger.info("Loaded model %s in %.3fs", candidate.version, candidate.load_seconds,
+                        extra={"event": "model_loaded", "model_version": candidate.version})
+            return None
+
+    def _load_candidate(self, model_path: str, signature):
+        """Load and validate a model file without touching the active model."""
+        start = time.perf_counter()
+        try:
+            model, flat_forest, version = load_serving_model(model_path)
+        except ModuleNotFoundError as e:
+            logger.error("Could not load %s: %s", model_path, e, exc_info=True)
+            return None, LoadFailure(MODULE_ERROR_REASON, model_path)
+        except Exception as e:
+            logger.error("Error loading model: %s", e, exc_info=True)
+            return None, LoadFailure(f"model_load_error_{type(e).__name__}", model_path)
+
+        try:
+            spec = load_feature_spec(model_path)
+            feature_pipeline = pipeline_for_spec(spec)
+            feature_pipeline.check_spec(spec)
+        except Exception as e:
+            logger.error("Model %s does not match the service's features: %s", version, e)
+            return None, LoadFailure(FEATURE_MISMATCH_REASON, model_path)
+
+        try:
+            validate_model(model if model is not None else flat_forest, feature_pipeline.n_features)
+        except Exception as e:
+            logger.error("Model %s failed validation: %s", version, e)
+            return None, LoadFailure(f"model_validation_error_{type(e).__name__}", model_path)
+
+        if flat_forest is None:
+            try:
+                flat_forest = compile_forest(model)
+            except Exception as e:
+                logger.warning("Could not compile %s into a flat forest: %s", version, e)
+
+        try:
+            surrogate = load_surrogate(model_path, feature_pipeline)
+        except Exception as e:
+            logger.warning("Could not load surrogate for %s: %s", version, e)
+            surrogate = None
+
+        candidate = LoadedModel(
+            model=model,
+            model_path=model_path,
+            version=version,
+            loaded_at=datetime.now(timezone.utc),
+            load_seconds=time.perf_counter() - start,
+            file_signature=signature,
+            flat_forest=flat_forest,
+            surrogate=surrogate,
+            feature_pipeline=feature_pipeline
+        )
+        refusal = self.requirement(candidate) if self.requirement is not None else None
+        if refusal:
+            logger.error("Refusing model %s: %s", version, refusal)
+            return None, LoadFailure(MODEL_REFUSED_REASON, model_path)
+        return candidate, None
+
+    def rollback(self) -> Optional[LoadedModel]:
+        """Swap the previous model back in; returns the new active model or None if there is none."""
+        with self._lock:
+            if self._previous is None:
+                return None
+            self._active, self._previous = self._previous, self._active
+            self._failure = None
+            logger.info("Rolled back to model %s", self._active.version,
+                        extra={"event": "model_rollback", "model_version": self._active.version})
+            return self._active
+
+    def ensure_loaded(self) -> Optional[LoadedModel]:
+        """Return the active model, loading it on first use if startup did not."""
+        if not self._attempted:
+            return self.load_latest()
+        return self._active
+
+    def get(self) -> Optional[LoadedModel]:
+        """Return the active model snapshot, or None when predictions must use fallback logic."""
+        return self._active
+
+    @property
+    def attempted(self) -> bool:
+        return self._attempted
+
+    @property
+    def previous(self) -> Optional[LoadedModel]:
+        return self._previous
+
+    @property
+    def failure(self) -> Optional[LoadFailure]:
+        return self._failure
+
+    def reset(self):
+        """Forget the active model so the next request loads from disk again."""
+        with self._lock:
+            self._active = None
+            self._previous = None
+            self._failure = None
+            self._attempted = False
+            self._last_seen_signature = None
+
+
+class ModelWatcher:
+    """
+    Background thread that polls the model directory and hot-swaps new model files.
+
+    Loading and validation run on this thread, so the event loop never waits on disk
+    I/O or unpickling.
+    """
+
+    def __init__(self, registry: "ModelRegistry", interval_seconds: float = MODEL_POLL_INTERVAL_SECONDS):
+        self.registry = registry
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start polling; a non-positive interval disables the watcher."""
+        if self.interval_seconds <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+        logger.info("Watching %s every %ss", self.registry.model_dir, self.interval_seconds)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.registry.reload()
+            except Exception as e:
+                logger.error("Watcher error: %s", e, exc_info=True)
+
+
+# Process-wide registry shared by the API and the prediction service
+model_registry = ModelRegistry()
+model_watcher = ModelWatcher(model_registry)
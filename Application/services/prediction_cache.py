@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional
+from Application.services.feature_pipeline import RAW_INPUT_NAMES, FEATURE_NAMES, TEMPORAL_FEATURE_NAMES
+
+# Constants
+PREDICTION_CACHE_ENABLED = os.environ.get("PREDICTION_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+PREDICTION_CACHE_TTL_SECONDS = float(os.environ.get("PREDICTION_CACHE_TTL_SECONDS", "300"))
+PREDICTION_CACHE_MAX_BYTES = int(os.environ.get("PREDICTION_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+# The first nine model features are the raw inputs; the rest are derived from them,
+# so quantizing these is enough to identify the whole 16-feature vector
+RAW_FEATURE_NAMES = RAW_INPUT_NAMES
+
+# Sensor resolution used to quantize each raw input (e.g. 0.1 °C, 1 % humidity, 10 lux)
+DEFAULT_RESOLUTIONS = {
+    "Temperature": 0.1,
+    "Soil Humidity": 1.0,
+    "Air Humidity": 1.0,
+    "Light": 10.0,
+    "CO2": 10.0,
+    "PIR": 1.0,
+    "Proximity": 1.0,
+    "timeSinceLastWateringInHours": 0.1,
+    "growth_stage": 1.0,
+    # Rolling bed features, present in the vectors of temporal models only
+    "soil_humidity_slope": 0.05,
+    "temperature_rolling_mean": 0.1,
+    "drying_rate": 0.05,
+}
+
+# Temporal models append the rolling bed features after the 16; they are not derived
+# from the raw inputs, so they are part of the key too
+TEMPORAL_FEATURE_OFFSET = len(FEATURE_NAMES)
+
+# Conservative per-entry cost: key tuple of 9 ints, float value, expiry and LRU links
+ENTRY_BYTES = 512
+
+
+def load_resolutions() -> dict:
+    """Default resolutions overridden by the PREDICTION_CACHE_RESOLUTIONS JSON object, if set."""
+    resolutions = dict(DEFAULT_RESOLUTIONS)
+    overrides = os.environ.get("PREDICTION_CACHE_RESOLUTIONS")
+    if overrides:
+        resolutions.update({name: float(step) for name, step in json.loads(overrides).items()})
+    return resolutions
+
+
+class PredictionCache:
+    """
+    LRU cache with TTL for model predictions, keyed on quantized feature vectors.
+
+    Entries belong to one model generation; the first lookup with a different model
+    (new version, reload or rollback) drops every entry. Size is bounded by max_bytes
+    using a fixed per-entry estimate, evicting least recently used entries first.
+    """
+
+    def __init__(self, enabled: bool = PREDICTION_CACHE_ENABLED, ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS,
+                 max_bytes: int = PREDICTION_CACHE_MAX_BYTES, resolutions: dict = None, clock=time.monotonic):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_bytes // ENTRY_BYTES)
+        resolutions = resolutions or load_resolutions()
+        self._steps = [float(resolutions.get(name, DEFAULT_RESOLUTIONS[name])) for name in RAW_FEATURE_NAMES]
+        self._temporal_steps = [float(resolutions.get(name, DEFAULT_RESOLUTIONS[name])) for name in TEMPORAL_FEATURE_NAMES]
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generation = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def make_key(self, features) -> Optional[tuple]:
+        """
+        Quantize the raw inputs (and rolling bed features) of a feature vector to the configured resolutions.
+
+        Returns:
+            Optional[tuple]: The key, or None if a value is NaN or infinite; such rows bypass the cache
+        """
+        try:
+            key = tuple(int(round(features[i] / step)) for i, step in enumerate(self._steps))
+            if len(features) > TEMPORAL_FEATURE_OFFSET:
+                key += tuple(int(round(features[TEMPORAL_FEATURE_OFFSET + i] / step))
+                             for i, step in enumerate(self._temporal_steps))
+        except (ValueError, OverflowError):
+            return None
+        return key
+
+    def _use_generation(self, generation):
+        if generation != self._generation:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._generation = generation
+
+    def get(self, generation, key) -> Optional[float]:
+        """Return the cached prediction for key under the given model generation, or None."""
+        if not self.enabled or key is None:
+            return None
+        with self._lock:
+            self._use_generation(generation)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, generation, key, value: float):
+        if not self.enabled or key is None:
+            return
+        with self._lock:
+            self._use_generation(generation)
+            self._entries[key] = (value, self._clock() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "estimated_bytes": len(self._entries) * ENTRY_BYTES,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+def cache_generation(active) -> tuple:
+    """Identify a loaded model snapshot; a reload of the same file is a new generation."""
+    return (active.version, active.loaded_at)
+
+
+# Process-wide cache in front of model inference
+prediction_cache = PredictionCache()
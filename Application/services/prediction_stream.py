@@ -0,0 +1,258 @@
+import os
+import json
+import asyncio
+import logging
+from typing import AsyncIterator, List, Optional
+
+from pydantic import ValidationError
+from starlette.responses import StreamingResponse
+
+from Application.Dtos.predict import PredictionRequestDto, SensorReadingDto
+from Application.Dtos.stream import StreamSchemaDto, StreamReadingDto, StreamPredictionDto
+from Application.services.ml_model_services import analyze_batch_prediction
+from Application.services.inference_executor import InferenceOverloadedError
+from Application.services.metrics import record_result
+
+logger = logging.getLogger(__name__)
+
+# Constants
+# Largest number of readings predicted together; readings that arrive while a batch runs join the next one
+STREAM_MAX_BATCH = int(os.environ.get("STREAM_MAX_BATCH", "256"))
+# Readings parsed ahead of prediction per stream; beyond this the stream stops reading (TCP backpressure)
+STREAM_MAX_PENDING = int(os.environ.get("STREAM_MAX_PENDING", "1024"))
+STREAM_MAX_MESSAGE_BYTES = int(os.environ.get("STREAM_MAX_MESSAGE_BYTES", "65536"))
+
+# Marks the end of the client's messages in a stream's queue
+_END = object()
+
+
+class StreamMessageError(ValueError):
+    """A stream message that cannot be used; answered with an error and the stream goes on."""
+
+    def __init__(self, message: str, message_id=None):
+        super().__init__(message)
+        self.message_id = message_id
+
+
+class StreamStats:
+    """Counters shared by every stream, reported by the stats endpoint."""
+
+    def __init__(self):
+        self.open = 0
+        self.opened = 0
+        self.readings = 0
+        self.errors = 0
+        self.batches = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "open": self.open,
+            "opened": self.opened,
+            "readings": self.readings,
+            "errors": self.errors,
+            "batches": self.batches,
+            "mean_batch_size": self.readings / self.batches if self.batches else 0.0,
+        }
+
+
+stream_stats = StreamStats()
+
+
+def describe_validation_error(error: ValidationError) -> str:
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first["loc"])
+    return f"{location}: {first['msg']}" if location else first["msg"]
+
+
+class PredictionStream:
+    """
+    One client's long-lived prediction stream (a WebSocket or a chunked NDJSON body).
+
+    Each message is one JSON object: a reading, or a schema message
+    {"sensors": [...]} after which readings may send bare "values" in that order
+    instead of repeating SensorName and Unit. A reader task parses messages into a
+    bounded queue; the prediction loop takes everything queued (up to max_batch)
+    and predicts it with one batch call, so batches grow with the arrival rate and
+    a lone reading is not held back. Results go out in message order, one per reading.
+    """
+
+    def __init__(self, max_batch: int = STREAM_MAX_BATCH, max_pending: int = STREAM_MAX_PENDING):
+        self.max_batch = max(1, max_batch)
+        self.max_pending = max(1, max_pending)
+        self.sensors: Optional[List[str]] = None
+
+    def parse(self, message) -> Optional[tuple]:
+        """
+        Parse one message.
+
+        Returns:
+            tuple: (id, PredictionRequestDto) for a reading, None for a schema message
+
+        Raises:
+            StreamMessageError: If the message is not valid JSON or not a valid reading
+        """
+        if len(message) > STREAM_MAX_MESSAGE_BYTES:
+            raise StreamMessageError(f"Message exceeds {STREAM_MAX_MESSAGE_BYTES} bytes")
+        try:
+            data = json.loads(message)
+        except ValueError as e:
+            raise StreamMessageError(f"Invalid JSON: {e}")
+        if not isinstance(data, dict):
+            raise StreamMessageError("Message must be a JSON object")
+
+        message_id = data.get("id")
+        try:
+            if "sensors" in data:
+                self.sensors = StreamSchemaDto.model_validate(data).sensors
+                return None
+            reading = StreamReadingDto.model_validate(data)
+        except ValidationError as e:
+            raise StreamMessageError(describe_validation_error(e), message_id)
+
+        readings = reading.mlSensorReadings
+        if readings is None:
+            if self.sensors is None:
+                raise StreamMessageError("values sent before a {\"sensors\": [...]} message", message_id)
+            if len(reading.values) != len(self.sensors):
+                raise StreamMessageError(f"Expected {len(self.sensors)} values, got {len(reading.values)}", message_id)
+            # Already validated as floats; the sensor names are the stream's, shared by every reading
+            readings = [SensorReadingDto.model_construct(SensorName=name, Unit="", Value=value)
+                        for name, value in zip(self.sensors, reading.values)]
+        payload = PredictionRequestDto.model_construct(
+            timestamp=reading.timestamp,
+            plantGrowthStage=reading.plantGrowthStage,
+            timeSinceLastWateringInHours=reading.timeSinceLastWateringInHours,
+            bedId=reading.bedId,
+            mlSensorReadings=readings
+        )
+        return message_id, payload
+
+    async def predictions(self, messages: AsyncIterator) -> AsyncIterator[str]:
+        """
+        Serialized StreamPredictionDto for every reading (and error) in messages, in order.
+
+        Args:
+            messages: The client's messages (str or bytes), ending when the client is done
+
+        Raises:
+            Exception: Whatever reading messages raised, other than StreamMessageError
+            (e.g. the client disconnecting), after answering the readings before it
+        """
+        queue = asyncio.Queue(maxsize=self.max_pending)
+        reader = asyncio.get_running_loop().create_task(self._read(messages, queue))
+        stream_stats.open += 1
+        stream_stats.opened += 1
+        try:
+            while True:
+                batch = [await queue.get()]
+                while len(batch) < self.max_batch and not queue.empty():
+                    batch.append(queue.get_nowait())
+                # The reader puts a failure and the end marker after every reading
+                end = batch[-1] is _END
+                if end:
+                    batch.pop()
+                failure = None
+                if batch and isinstance(batch[-1], Exception) and not isinstance(batch[-1], StreamMessageError):
+                    failure = batch.pop()
+                for response in await self._answer(batch):
+                    yield response.model_dump_json(exclude_none=True)
+                if failure is not None:
+                    raise failure
+                if end:
+                    return
+        finally:
+            stream_stats.open -= 1
+            reader.cancel()
+
+    async def _read(self, messages: AsyncIterator, queue: asyncio.Queue):
+        try:
+            async for message in messages:
+                try:
+                    item = self.parse(message)
+                except StreamMessageError as e:
+                    item = e
+                if item is not None:
+                    await queue.put(item)
+        except Exception as e:
+            # Handed to the prediction loop, which answers what came before and then stops
+            await queue.put(e)
+        await queue.put(_END)
+
+    async def _answer(self, batch: list) -> List[StreamPredictionDto]:
+        """Predict the readings of a batch together; errors keep their place in the output."""
+        readings = [item for item in batch if not isinstance(item, StreamMessageError)]
+        predictions, failure = iter(()), None
+        if readings:
+            stream_stats.batches += 1
+            stream_stats.readings += len(readings)
+            try:
+                predictions = iter(await analyze_batch_prediction([payload for _, payload in readings]))
+            except InferenceOverloadedError:
+                failure = "Prediction service is overloaded, please retry shortly"
+            except Exception as e:
+                logger.error("Stream prediction failed: %s", e, exc_info=True, extra={"event": "prediction_error"})
+                failure = "An error occurred while processing the prediction"
+
+        responses = []
+        for item in batch:
+            if isinstance(item, StreamMessageError):
+                stream_stats.errors += 1
+                responses.append(StreamPredictionDto(Id=item.message_id, Error=str(item)))
+                continue
+            if failure is not None:
+                stream_stats.errors += 1
+                responses.append(StreamPredictionDto(Id=item[0], Error=failure))
+                continue
+            result = next(predictions)
+            record_result(result.modelVersion, result.fallbackReason)
+            responses.append(StreamPredictionDto(
+                Id=item[0],
+                PredictionTime=result.PredictionTime,
+                HoursUntilNextWatering=result.HoursUntilNextWatering,
+                FallbackReason=result.fallbackReason
+            ))
+        return responses
+
+
+async def ndjson_lines(chunks: AsyncIterator[bytes], max_bytes: int = STREAM_MAX_MESSAGE_BYTES) -> AsyncIterator[bytes]:
+    """
+    Split a chunked request body into its non-empty lines.
+
+    Raises:
+        StreamMessageError: If a line grows beyond max_bytes without a newline
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+        if len(buffer) > max_bytes:
+            raise StreamMessageError(f"Line exceeds {max_bytes} bytes")
+    if buffer.strip():
+        yield buffer
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for bodies that are still being read while the response streams.
+
+    StreamingResponse listens for the client disconnecting by calling receive(), which
+    would take request body chunks away from the endpoint; here only the body reader
+    calls receive(), and it raises ClientDisconnect when the client goes away.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def websocket_messages(websocket) -> AsyncIterator:
+    """Text or binary frames of a WebSocket until the client disconnects."""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        yield message.get("text") if message.get("text") is not None else message.get("bytes", b"")
@@ -0,0 +1,41 @@
+import os
+import signal
+from typing import Optional
+
+# Signals a worker sends to the launcher (Application.serve) to change the model of every worker
+RELOAD_SIGNAL = signal.SIGHUP
+ROLLBACK_SIGNAL = signal.SIGUSR1
+
+
+class ServingMode:
+    """
+    How this process serves requests: alone, or as one of several workers forked by Application.serve.
+
+    With several workers, the model belongs to the launcher: it loads new models and forks
+    a fresh set of workers around them. A worker therefore asks the launcher to reload or
+    roll back instead of changing its own registry. State a worker keeps in memory, such
+    as training jobs, is invisible to the others.
+    """
+
+    def __init__(self):
+        self.launcher_pid: Optional[int] = None
+        self.workers = 1
+
+    def set_workers(self, workers: int, launcher_pid: int):
+        """Called by the launcher before forking; the workers inherit the values."""
+        self.workers = workers
+        self.launcher_pid = launcher_pid if workers > 1 else None
+
+    @property
+    def multi_worker(self) -> bool:
+        return self.launcher_pid is not None
+
+    def request_reload(self):
+        os.kill(self.launcher_pid, RELOAD_SIGNAL)
+
+    def request_rollback(self):
+        os.kill(self.launcher_pid, ROLLBACK_SIGNAL)
+
+
+# Process-wide serving mode, set by the launcher
+serving_mode = ServingMode()
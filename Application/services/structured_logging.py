@@ -0,0 +1,136 @@
+import os
+import sys
+import json
+import queue
+import random
+import logging
+import logging.handlers
+from datetime import datetime, timezone
+from typing import Optional
+
+# Constants
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")  # "json" or "text"
+# Fraction of successful predictions that are logged; errors and fallbacks are always logged
+LOG_SUCCESS_SAMPLE_RATE = float(os.environ.get("LOG_SUCCESS_SAMPLE_RATE", "0.01"))
+# Records waiting for the writer thread; new records are dropped (and counted) when full
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+
+# Attributes every LogRecord has; anything else was passed through extra= and becomes a JSON field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the timestamp, level, logger, message and any extra= fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never blocks or formats on the calling thread.
+
+    The stdlib QueueHandler renders the message (and traceback) in prepare(); here the
+    record is queued as-is, so message arguments and tracebacks are only formatted by
+    the listener thread. When the queue is full the record is dropped and counted.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class SuccessSampler:
+    """Decides which successful predictions are logged, keeping counts of both outcomes."""
+
+    def __init__(self, rate: float = LOG_SUCCESS_SAMPLE_RATE):
+        self.rate = rate
+        self.logged = 0
+        self.skipped = 0
+
+    def __call__(self) -> bool:
+        if self.rate >= 1.0 or (self.rate > 0.0 and random.random() < self.rate):
+            self.logged += 1
+            return True
+        self.skipped += 1
+        return False
+
+
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Shared by the prediction paths
+success_sampler = SuccessSampler()
+
+
+def configure_logging(level: str = LOG_LEVEL, log_format: str = LOG_FORMAT, stream=None):
+    """
+    Route all application logging through a bounded queue to a background writer.
+
+    Safe to call more than once; later calls are ignored until shutdown_logging().
+
+    Args:
+        level: Root log level name (e.g. "INFO", "DEBUG")
+        log_format: "json" for one JSON object per line, "text" for plain lines
+        stream: Output stream for the writer thread (default stdout)
+    """
+    global _queue_handler, _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if log_format == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+
+    _queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, output, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flush queued records and detach the queue handler."""
+    global _queue_handler, _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    logging.getLogger().removeHandler(_queue_handler)
+    _queue_handler = None
+    _listener = None
+
+
+def logging_stats() -> dict:
+    return {
+        "level": logging.getLevelName(logging.getLogger().getEffectiveLevel()),
+        "queued": _queue_handler.queue.qsize() if _queue_handler else 0,
+        "dropped": _queue_handler.dropped if _queue_handler else 0,
+        "success_sample_rate": success_sampler.rate,
+        "success_logged": success_sampler.logged,
+        "success_skipped": success_sampler.skipped,
+    }
@@ -0,0 +1,234 @@
+import os
+import uuid
+import queue
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+
+from Application.services.model_registry import ModelRegistry, model_registry
+
+logger = logging.getLogger(__name__)
+
+# Constants
+TRAINING_EXECUTOR = os.environ.get("TRAINING_EXECUTOR", "process")  # "process" or "thread"
+# Jobs share MODEL_DIR and its cleanup, so by default they run one at a time
+TRAINING_WORKERS = int(os.environ.get("TRAINING_WORKERS", "1"))
+TRAINING_MAX_PENDING = int(os.environ.get("TRAINING_MAX_PENDING", "4"))
+TRAINING_JOB_HISTORY = int(os.environ.get("TRAINING_JOB_HISTORY", "50"))
+# Queue a training job at startup when no loadable model exists (set in the Docker image)
+TRAIN_ON_STARTUP = os.environ.get("TRAIN_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+
+# Phases reported by train_randomForest.py, in order, used to estimate progress
+TRAINING_PHASES = ("load", "features", "fit", "prune", "evaluate", "save")
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+
+class TrainingQueueFullError(Exception):
+    """Raised when TRAINING_MAX_PENDING jobs are already waiting or running."""
+
+
+# Progress queue of the worker process (or of the service itself for thread workers)
+_progress_queue = None
+
+
+def _init_training_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _run_training_job(job_id: str, argv: list) -> Optional[dict]:
+    """Run train_randomForest.py in a worker, reporting each phase as it starts."""
+    # Imported here so the service does not load the training stack until a job runs
+    from Application.training.training_models.train_randomForest import main
+
+    _progress_queue.put((job_id, RUNNING))
+    return main(argv, on_phase=lambda phase: _progress_queue.put((job_id, phase)))
+
+
+class TrainingJob:
+    """State of one training job as reported by the status endpoint."""
+
+    def __init__(self, job_id: str, options: dict):
+        self.job_id = job_id
+        self.options = options
+        self.status = QUEUED
+        self.phase: Optional[str] = None
+        self.progress = 0.0
+        self.submitted_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.model_version: Optional[str] = None
+        self.registered = False
+        self.metrics: dict = {}
+        self.error: Optional[str] = None
+
+
+class TrainingJobManager:
+    """
+    Runs training jobs in a separate pool and registers the models they produce.
+
+    Jobs run in spawned processes by default, so training never competes with request
+    handling for the service's GIL, and each worker exits after its job to return its
+    memory. Workers report phase changes over a queue that a listener thread applies to
+    the job table. When a job finishes, the registry loads the newest model file, so the
+    new version is served without a restart.
+    """
+
+    def __init__(self, registry: ModelRegistry = model_registry, kind: str = TRAINING_EXECUTOR,
+                 max_workers: int = TRAINING_WORKERS, max_pending: int = TRAINING_MAX_PENDING,
+                 history: int = TRAINING_JOB_HISTORY, job_function=_run_training_job):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown training executor kind: {kind}")
+        self.registry = registry
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.history = max(1, history)
+        self.job_function = job_function
+        self._jobs: "OrderedDict[str, TrainingJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = None
+        self._progress = None
+        self._listener: Optional[threading.Thread] = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.kind == "process":
+                context = multiprocessing.get_context("spawn")
+                self._progress = context.Queue()
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context,
+                                                 initializer=_init_training_worker, initargs=(self._progress,),
+                                                 max_tasks_per_child=1)
+            else:
+                self._progress = queue.Queue()
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="training",
+                                                initializer=_init_training_worker, initargs=(self._progress,))
+            self._listener = threading.Thread(target=self._listen, args=(self._progress,),
+                                              name="training-progress", daemon=True)
+            self._listener.start()
+        return self._pool
+
+    def submit(self, incremental: bool = False, prune_tolerance: Optional[float] = None,
+               temporal: bool = False) -> TrainingJob:
+        """
+        Queue a training run.
+
+        Args:
+            incremental: Warm-start from the last model instead of a full training
+            prune_tolerance: Override the pruning MAE tolerance (default: the script's)
+            temporal: Train with the rolling per-bed features (full runs; incremental runs keep the base model's)
+
+        Returns:
+            TrainingJob: The queued job
+
+        Raises:
+            TrainingQueueFullError: If max_pending jobs are already queued or running
+        """
+        argv = ["--incremental"] if incremental else []
+        if prune_tolerance is not None:
+            argv += ["--prune-tolerance", str(prune_tolerance)]
+        if temporal:
+            argv.append("--temporal")
+        job = TrainingJob(uuid.uuid4().hex, {"incremental": incremental, "prune_tolerance": prune_tolerance,
+                                             "temporal": temporal})
+
+        with self._lock:
+            active = sum(1 for existing in self._jobs.values() if existing.status in (QUEUED, RUNNING))
+            if active >= self.max_pending:
+                raise TrainingQueueFullError(f"{active} training jobs already queued or running")
+            self._jobs[job.job_id] = job
+            self._trim_history()
+            future = self._get_pool().submit(self.job_function, job.job_id, argv)
+        future.add_done_callback(lambda done: self._finish(job, done))
+        logger.info("Queued training job %s", job.job_id, extra={"event": "training_queued", "job_id": job.job_id})
+        return job
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> list:
+        """Known jobs, newest first."""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in (SUCCEEDED, FAILED)]
+        for job_id in finished[:max(0, len(self._jobs) - self.history)]:
+            del self._jobs[job_id]
+
+    def _listen(self, progress):
+        while True:
+            message = progress.get()
+            if message is None:
+                return
+            job_id, phase = message
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job.status in (SUCCEEDED, FAILED):
+                    continue
+                if phase == RUNNING:
+                    job.status, job.started_at = RUNNING, datetime.now(timezone.utc)
+                    continue
+                job.phase = phase
+                if phase in TRAINING_PHASES:
+                    job.progress = round(TRAINING_PHASES.index(phase) / len(TRAINING_PHASES), 2)
+
+    def _finish(self, job: TrainingJob, future):
+        """Record a job's outcome and register the model it saved."""
+        try:
+            log = future.result()
+        except BaseException as e:
+            # Includes SystemExit from argparse or the training script; the job must still finish
+            # or it keeps its TRAINING_MAX_PENDING slot forever
+            with self._lock:
+                job.status, job.error = FAILED, f"{type(e).__name__}: {e}"
+                job.finished_at = datetime.now(timezone.utc)
+            logger.error("Training job %s failed: %s", job.job_id, job.error,
+                         extra={"event": "training_failed", "job_id": job.job_id})
+            return
+
+        if log is None:
+            # Incremental run without enough new rows: the current model stays
+            logger.info("Training job %s produced no new model", job.job_id)
+        else:
+            job.model_version = os.path.basename(log["regressor_path"])
+            job.metrics = {"mae": log.get("regression_mae"), "r2": log.get("regression_r2")}
+            # The watcher may already have loaded it; only a forced reload would repeat the work
+            failure = self.registry.reload()
+            active = self.registry.get()
+            job.registered = active is not None and os.path.basename(active.model_path) == job.model_version
+            if not job.registered:
+                reason = failure.reason if failure else "not the newest model"
+                job.error = f"Model was trained but not registered: {reason}"
+            logger.info("Training job %s finished with %s (registered: %s)", job.job_id, job.model_version,
+                        job.registered, extra={"event": "training_finished", "job_id": job.job_id,
+                                               "model_version": job.model_version})
+
+        # Marked succeeded only now, so pollers never see a finished job before registration
+        with self._lock:
+            job.status, job.progress = SUCCEEDED, 1.0
+            job.finished_at = datetime.now(timezone.utc)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {status: 0 for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return {"kind": self.kind, "max_workers": self.max_workers, "max_pending": self.max_pending, "jobs": counts}
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+            progress, self._progress = self._progress, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+            progress.put(None)
+
+
+# Process-wide training job manager used by the training endpoints
+training_jobs = TrainingJobManager()
@@ -0,0 +1,16 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from Application.services.model_registry import model_registry
+from Application.services.prediction_cache import prediction_cache
+
+@pytest.fixture(autouse=True)
+def reset_model_registry():
+    """Make every test load the model itself, so per-test joblib mocks take effect"""
+    model_registry.reset()
+    prediction_cache.clear()
+    yield
+    model_registry.reset()
+    prediction_cache.clear()
@@ -0,0 +1,115 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from unittest import mock
+import numpy as np
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+
+from Application.Dtos.predict import PredictionRequestDto, SensorReadingDto
+from Application.services import ml_model_services
+from Application.services.structured_logging import SuccessSampler
+from Application.services.ml_model_services import (
+    analyze_batch_prediction, extract_feature_matrix, extract_features_from_payload
+)
+from Application.main import app
+
+client = TestClient(app)
+
+def make_payload(temperature, soil_humidity, stage="Vegetative Stage", hours=5.0):
+    return PredictionRequestDto(
+        timestamp=datetime.now(timezone.utc),
+        plantGrowthStage=stage,
+        timeSinceLastWateringInHours=hours,
+        mlSensorReadings=[
+            SensorReadingDto(SensorName="Temperature", Unit="°C", Value=temperature),
+            SensorReadingDto(SensorName="Soil Humidity", Unit="%", Value=soil_humidity),
+            SensorReadingDto(SensorName="Light", Unit="lux", Value=350.0)
+        ]
+    )
+
+def mock_model():
+    """Mock model predicting the soil humidity column, so results reveal their order"""
+    model = mock.MagicMock()
+    model.predict.side_effect = lambda X: np.asarray(X)[:, 1]
+    return model
+
+def test_feature_matrix_matches_single_extraction():
+    """Test the vectorized features equal the per-payload features row by row"""
+    payloads = [
+        make_payload(25.0, 40.0),
+        make_payload(31.5, 12.0, stage="Seedling", hours=50.0),
+        make_payload(12.0, 70.0, stage="Unknown Stage", hours=0.0),
+    ]
+
+    matrix = extract_feature_matrix(payloads)
+
+    assert matrix.shape == (3, 16)
+    for row, payload in zip(matrix, payloads):
+        np.testing.assert_allclose(row, extract_features_from_payload(payload))
+
+@pytest.mark.asyncio
+async def test_batch_prediction_calls_model_once():
+    """Test a batch is predicted with one model call and keeps request order"""
+    payloads = [make_payload(20.0 + i, float(i)) for i in range(10)]
+
+    with mock.patch('joblib.load', return_value=mock_model()) as mock_load:
+        results = await analyze_batch_prediction(payloads)
+        model = mock_load.return_value
+
+    # One call validates the model on load, one serves the whole batch
+    assert model.predict.call_count == 2
+    assert [r.HoursUntilNextWatering for r in results] == [float(i) for i in range(10)]
+    assert all(r.fallbackReason is None for r in results)
+
+@pytest.mark.asyncio
+async def test_batch_rows_with_non_finite_readings_fall_back():
+    """Test rows with a NaN or infinite reading get the fallback and never reach the model"""
+    payloads = [make_payload(25.0, 10.0), make_payload(float("nan"), 20.0), make_payload(25.0, float("inf"))]
+
+    with mock.patch('joblib.load', return_value=mock_model()) as mock_load:
+        results = await analyze_batch_prediction(payloads)
+        model = mock_load.return_value
+
+    assert model.predict.call_args[0][0].shape[0] == 1
+    assert results[0].HoursUntilNextWatering == 10.0 and results[0].fallbackReason is None
+    assert [r.fallbackReason for r in results[1:]] == ["prediction_error_NonFiniteValue"] * 2
+
+@pytest.mark.asyncio
+async def test_batch_success_log_is_sampled(caplog):
+    """Test batch success logs go through the success sampler like single predictions"""
+    payloads = [make_payload(25.0, 10.0), make_payload(26.0, 20.0)]
+
+    with mock.patch('joblib.load', return_value=mock_model()), caplog.at_level("INFO"):
+        with mock.patch.object(ml_model_services, "success_sampler", SuccessSampler(0.0)):
+            await analyze_batch_prediction(payloads)
+        assert not [r for r in caplog.records if getattr(r, "event", None) == "batch_prediction"]
+
+        with mock.patch.object(ml_model_services, "success_sampler", SuccessSampler(1.0)):
+            await analyze_batch_prediction(payloads)
+        assert [r.items for r in caplog.records if getattr(r, "event", None) == "batch_prediction"] == [2]
+
+def test_batch_endpoint_reports_fallback_reasons():
+    """Test every item carries a fallback reason when no model can be loaded"""
+    payloads = [make_payload(25.0, 15.0), make_payload(25.0, 65.0)]
+    body = [p.model_dump(mode="json") for p in payloads]
+
+    with mock.patch('joblib.load', side_effect=Exception("Failed to load")):
+        response = client.post("/api/ml/predict/batch", json=body)
+
+    assert response.status_code == 200
+    predictions = response.json()["Predictions"]
+    assert len(predictions) == 2
+    assert all(p["FallbackReason"] for p in predictions)
+    assert predictions[0]["HoursUntilNextWatering"] < predictions[1]["HoursUntilNextWatering"]
+
+def test_batch_endpoint_rejects_oversized_batch():
+    """Test batches above the configured limit are rejected"""
+    body = [make_payload(25.0, 40.0).model_dump(mode="json")] * 3
+
+    with mock.patch('Application.api.ml_controller.MAX_BATCH_SIZE', 2):
+        response = client.post("/api/ml/predict/batch", json=body)
+
+    assert response.status_code == 413
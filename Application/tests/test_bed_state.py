@@ -0,0 +1,182 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import joblib
+import pytest
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from sklearn.ensemble import RandomForestRegressor
+
+from Application.Dtos.predict import PredictionRequestDto, SensorReadingDto
+from Application.services import ml_model_services
+from Application.services.bed_state import BedStateStore, TEMPORAL_FEATURE_NAMES, bed_state_store
+from Application.services.feature_pipeline import (
+    FEATURE_PIPELINE, TEMPORAL_FEATURE_PIPELINE, FeaturePipeline, feature_spec_path_for
+)
+from Application.services.model_registry import ModelRegistry, FEATURE_MISMATCH_REASON
+from Application.services.prediction_cache import PredictionCache
+
+START = datetime(2025, 5, 20, tzinfo=timezone.utc)
+
+def expected_features(times, soil, temperature, watered_at, window=6.0):
+    """Brute-force rolling features over the readings inside the window ending at the last one"""
+    times, soil, temperature = map(np.asarray, (times, soil, temperature))
+    inside = times > times[-1] - window
+    t, s = times[inside], soil[inside]
+    slope = np.polyfit(t - t[0], s, 1)[0] if len(t) >= 2 else 0.0
+    elapsed = times[-1] - times[watered_at]
+    drying = (soil[watered_at] - soil[-1]) / elapsed if elapsed > 0 else 0.0
+    return slope, temperature[inside].mean(), drying
+
+def test_rolling_features_match_brute_force():
+    """Test the O(1) running sums agree with recomputing over the window, across many rebases"""
+    rng = np.random.default_rng(0)
+    store = BedStateStore(window_hours=6.0, capacity=32)
+    times = np.cumsum(rng.uniform(0.1, 2.0, 500))
+    soil = 60 - 0.3 * times % 40 + rng.normal(0, 0.5, 500)
+    temperature = rng.uniform(15, 35, 500)
+    since_watering = times % 40
+
+    watered_at = 0
+    for i in range(len(times)):
+        if i and since_watering[i] < since_watering[i - 1]:
+            watered_at = i
+        features = store.update("bed-1", START + timedelta(hours=float(times[i])), soil[i], temperature[i],
+                                since_watering[i])
+        expected = expected_features(times[:i + 1], soil[:i + 1], temperature[:i + 1], watered_at)
+        np.testing.assert_allclose([features[name] for name in TEMPORAL_FEATURE_NAMES], expected, atol=1e-8)
+
+def test_retries_and_late_readings_leave_state_unchanged():
+    store = BedStateStore()
+    first = store.update("bed-1", START, 40.0, 20.0, 0.0)
+    second = store.update("bed-1", START + timedelta(hours=1), 38.0, 22.0, 1.0)
+
+    assert store.update("bed-1", START + timedelta(hours=1), 10.0, 40.0, 1.0) == second
+    assert store.update("bed-1", START, 10.0, 40.0, 0.0) == second
+    assert first == {"soil_humidity_slope": 0.0, "temperature_rolling_mean": 20.0, "drying_rate": 0.0}
+    assert second["soil_humidity_slope"] == pytest.approx(-2.0)
+    assert store.stats()["updates"] == 2 and store.stats()["ignored"] == 2
+
+def test_beds_are_independent_and_bounded():
+    store = BedStateStore(max_beds=2)
+    store.update("bed-1", START, 40.0, 20.0, 0.0)
+    store.update("bed-2", START, 50.0, 30.0, 0.0)
+    store.update("bed-1", START + timedelta(hours=1), 39.0, 20.0, 1.0)
+    store.update("bed-3", START, 60.0, 25.0, 0.0)
+
+    # bed-2 was the least recently updated
+    assert store.features("bed-2") is None
+    assert store.features("bed-1")["drying_rate"] == pytest.approx(1.0)
+    assert store.stats()["beds"] == 2 and store.stats()["evictions"] == 1
+
+def make_payload(hour, soil, temperature=25.0, since_watering=None, bed_id="bed-1"):
+    return PredictionRequestDto(
+        timestamp=START + timedelta(hours=hour),
+        plantGrowthStage="Vegetative",
+        timeSinceLastWateringInHours=hour if since_watering is None else since_watering,
+        bedId=bed_id,
+        mlSensorReadings=[
+            SensorReadingDto(SensorName="Temperature", Unit="°C", Value=temperature),
+            SensorReadingDto(SensorName="Soil Humidity", Unit="%", Value=soil)
+        ]
+    )
+
+def test_readings_dropped_inside_the_window_are_counted(caplog):
+    """Test a bed reporting faster than capacity allows is counted and warned about once"""
+    store = BedStateStore(window_hours=6.0, capacity=4)
+    with caplog.at_level("WARNING"):
+        for minute in range(0, 180, 30):
+            store.update("fast-bed", START + timedelta(minutes=minute), 40.0, 20.0, minute / 60)
+        for hour in range(6):
+            store.update("slow-bed", START + timedelta(hours=2 * hour), 40.0, 20.0, 2.0 * hour)
+
+    assert store.stats()["early_evictions"] == 2
+    assert [r.bed_id for r in caplog.records if getattr(r, "event", None) == "bed_state_capacity"] == ["fast-bed"]
+
+def test_training_replay_matches_serving():
+    """Test features computed from a training frame equal those the service builds request by request"""
+    rng = np.random.default_rng(1)
+    hours = np.arange(48.0)
+    df = pd.DataFrame({
+        "Temperature": rng.uniform(15, 35, 48),
+        "Soil Humidity": 50 - hours * 0.4 + rng.normal(0, 0.3, 48),
+        "timeSinceLastWateringInHours": hours % 20,
+        "plantGrowthStage": "Vegetative",
+        "timestamp": [START + timedelta(hours=h) for h in hours],
+    })
+    # Training frames are not necessarily in time order
+    shuffled = df.sample(frac=1.0, random_state=0)
+    expected = pd.DataFrame(TEMPORAL_FEATURE_PIPELINE.transform_frame(shuffled), index=shuffled.index).sort_index()
+
+    store = BedStateStore()
+    rows = []
+    for temperature, soil, since_watering, hour in zip(df["Temperature"], df["Soil Humidity"],
+                                                       df["timeSinceLastWateringInHours"], hours):
+        payload = make_payload(hour, soil, temperature, since_watering)
+        bed = store.update(payload.bedId, payload.timestamp, soil, temperature, since_watering)
+        rows.append(ml_model_services.extract_features_from_payload(payload, TEMPORAL_FEATURE_PIPELINE, bed))
+    np.testing.assert_array_equal(np.array(rows), expected.to_numpy())
+
+def test_requests_without_bed_id_get_single_reading_features():
+    payload = make_payload(0, 40.0, temperature=28.0, bed_id=None)
+    single = ml_model_services.extract_features_from_payload(payload, TEMPORAL_FEATURE_PIPELINE)
+    batch = ml_model_services.extract_feature_matrix([payload], TEMPORAL_FEATURE_PIPELINE, [{}])
+
+    assert single[16:] == [0.0, 28.0, 0.0]
+    assert single[:16] == ml_model_services.extract_features_from_payload(payload)
+    np.testing.assert_array_equal(batch[0], single)
+
+def test_non_finite_readings_are_not_recorded():
+    ml_model_services.observe_bed_state(make_payload(0, 40.0, bed_id="nan-bed"))
+    before = bed_state_store.features("nan-bed")
+
+    assert ml_model_services.observe_bed_state(make_payload(1, float("nan"), bed_id="nan-bed")) == {}
+    assert ml_model_services.observe_bed_state(make_payload(2, 38.0, temperature=float("inf"), bed_id="nan-bed")) == {}
+    assert bed_state_store.features("nan-bed") == before
+
+def test_cache_key_includes_rolling_features():
+    cache = PredictionCache()
+    snapshot = ml_model_services.extract_features_from_payload(make_payload(0, 40.0), TEMPORAL_FEATURE_PIPELINE)
+    drying = list(snapshot)
+    drying[-1] = 1.0
+
+    assert cache.make_key(snapshot) != cache.make_key(drying)
+    assert cache.make_key(snapshot[:16]) == cache.make_key(snapshot)[:9]
+
+def save_temporal_model(model_dir, feature_pipeline):
+    X = np.random.default_rng(0).uniform(0, 50, (60, feature_pipeline.n_features))
+    model = RandomForestRegressor(n_estimators=3, random_state=0).fit(X, X[:, -1])
+    path = os.path.join(model_dir, "reg_model_2025-06-01_00-00-00.pkl")
+    joblib.dump(model, path)
+    feature_pipeline.save_spec(feature_spec_path_for(path))
+    return model
+
+@pytest.mark.asyncio
+async def test_temporal_model_served_with_bed_history(tmp_path, monkeypatch):
+    """Test a model trained with bed features is loaded with the temporal pipeline and sees the history"""
+    model = save_temporal_model(str(tmp_path), TEMPORAL_FEATURE_PIPELINE)
+    registry = ModelRegistry(model_dir=str(tmp_path))
+    active = registry.load_latest()
+    assert active.feature_pipeline is TEMPORAL_FEATURE_PIPELINE and active.surrogate is None
+
+    monkeypatch.setattr(ml_model_services, "model_registry", registry)
+    ml_model_services.prediction_cache.clear()
+    bed_state_store.clear()
+    await ml_model_services.analyze_prediction(make_payload(0, 40.0))
+    result = await ml_model_services.analyze_prediction(make_payload(2, 36.0))
+
+    features = ml_model_services.extract_features_from_payload(
+        make_payload(2, 36.0), TEMPORAL_FEATURE_PIPELINE, bed_state_store.features("bed-1"))
+    assert features[-1] == pytest.approx(2.0)
+    assert result.HoursUntilNextWatering == pytest.approx(model.predict(np.array([features]))[0])
+    bed_state_store.clear()
+
+def test_temporal_model_with_other_bed_settings_is_refused(tmp_path):
+    save_temporal_model(str(tmp_path), FeaturePipeline(temporal={"window_hours": 12.0, "capacity": 32}))
+    registry = ModelRegistry(model_dir=str(tmp_path))
+
+    assert registry.load_latest() is None
+    assert registry.failure.reason == FEATURE_MISMATCH_REASON
+    assert FEATURE_PIPELINE.spec().get("temporal") is None
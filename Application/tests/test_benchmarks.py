@@ -0,0 +1,48 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import json
+import pytest
+
+from Application.benchmarks.report import compare_reports, summarize_latencies
+from Application.benchmarks.run_benchmarks import main, BENCHMARK_ENV_DEFAULTS, make_payloads
+
+def report(p99_ms, rps):
+    return {"results": {"inprocess": {"latency": {"p99_ms": p99_ms}, "throughput": {"c16": {"rps": rps}}}}}
+
+def test_compare_flags_regressions_in_the_right_direction():
+    """Test slower latencies and lower throughput beyond the tolerance are regressions"""
+    rows = {row["metric"]: row for row in compare_reports(report(13.0, 700.0), report(10.0, 1000.0), tolerance=0.2)}
+
+    assert rows["inprocess.latency.p99_ms"]["regressed"]
+    assert rows["inprocess.throughput.c16.rps"]["regressed"]
+
+    rows = {row["metric"]: row for row in compare_reports(report(5.0, 2000.0), report(10.0, 1000.0), tolerance=0.2)}
+    assert not any(row["regressed"] for row in rows.values())
+
+def test_summarize_latencies_in_milliseconds():
+    summary = summarize_latencies([0.001] * 99 + [0.1])
+
+    assert summary["p50_ms"] == 1.0
+    assert summary["max_ms"] == 100.0
+
+def test_payloads_are_reproducible():
+    assert make_payloads(5, seed=3)[4]["mlSensorReadings"] == make_payloads(5, seed=3)[4]["mlSensorReadings"]
+
+@pytest.mark.performance
+def test_inprocess_benchmark_writes_comparable_report(tmp_path, monkeypatch):
+    """Test a tiny in-process run produces a report that compares cleanly with itself"""
+    for name in BENCHMARK_ENV_DEFAULTS:
+        monkeypatch.delenv(name, raising=False)
+    output = str(tmp_path / "report.json")
+    args = ["--mode", "inprocess", "--requests", "20", "--concurrency", "1,4", "--batch-sizes", "1,10",
+            "--batch-repeats", "2", "--warmup", "2", "--allow-fallback", "--output", output]
+
+    assert main(args) == 0
+    with open(output) as f:
+        results = json.load(f)["results"]["inprocess"]
+    assert set(results) == {"latency", "throughput", "batch", "compact", "decoding", "cold_start", "rss_mb"}
+    assert results["decoding"]["compact_packed_us"] < results["decoding"]["dto_json_us"]
+    assert results["throughput"]["c4"]["rps"] > 0
+    assert main(args + ["--baseline", output, "--tolerance", "100"]) == 0
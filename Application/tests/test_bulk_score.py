@@ -0,0 +1,76 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from Application.training.training_models.bulk_score import score_file, chunk_features, PREDICTION_COLUMN
+from Application.training.utils.data_loader import parse_timestamps
+from Application.services.feature_pipeline import TEMPORAL_FEATURE_PIPELINE, feature_spec_path_for
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "training", "data", "cleaned_data_greenhouse.csv")
+
+@pytest.fixture(scope="module")
+def archive():
+    return pd.read_csv(DATA_PATH)
+
+@pytest.fixture
+def model_path(tmp_path, archive):
+    model = RandomForestRegressor(n_estimators=10, random_state=42)
+    model.fit(chunk_features(archive), archive["timeUntilNextWateringInHours"])
+    path = str(tmp_path / "reg_model_2025-01-01_00-00-00.pkl")
+    joblib.dump(model, path)
+    return path
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_chunked_scores_match_whole_file(tmp_path, archive, model_path, workers):
+    """Test streaming in chunks (inline and across processes) keeps row order and values"""
+    output = str(tmp_path / "scored.csv")
+
+    rows = score_file(DATA_PATH, output, model_path, chunk_size=128, workers=workers)
+    scored = pd.read_csv(output)
+    expected = joblib.load(model_path).predict(chunk_features(archive))
+
+    assert rows == len(archive) == len(scored)
+    assert list(scored.columns) == list(archive.columns) + [PREDICTION_COLUMN]
+    np.testing.assert_allclose(scored[PREDICTION_COLUMN], expected, atol=1e-4)
+    assert (scored["timestamp"] == archive["timestamp"]).all()
+
+def test_missing_columns_are_reported(tmp_path, model_path):
+    path = str(tmp_path / "bad.csv")
+    pd.DataFrame({"Temperature": [20.0]}).to_csv(path, index=False)
+
+    with pytest.raises(ValueError, match="missing columns"):
+        score_file(path, str(tmp_path / "out.csv"), model_path, workers=1)
+
+@pytest.fixture
+def temporal_model_path(tmp_path, archive):
+    features = TEMPORAL_FEATURE_PIPELINE.transform_frame(archive.assign(timestamp=parse_timestamps(archive["timestamp"])))
+    model = RandomForestRegressor(n_estimators=10, random_state=42)
+    model.fit(features, archive["timeUntilNextWateringInHours"])
+    path = str(tmp_path / "reg_model_2025-01-01_00-00-00.pkl")
+    joblib.dump(model, path)
+    TEMPORAL_FEATURE_PIPELINE.save_spec(feature_spec_path_for(path))
+    return path
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_temporal_model_sees_the_history_of_earlier_chunks(tmp_path, archive, temporal_model_path, workers):
+    """Test rolling features carry over chunk boundaries, as if the whole file were replayed at once"""
+    output = str(tmp_path / "scored.csv")
+
+    score_file(DATA_PATH, output, temporal_model_path, chunk_size=128, workers=workers)
+    features = TEMPORAL_FEATURE_PIPELINE.transform_frame(archive.assign(timestamp=parse_timestamps(archive["timestamp"])))
+    expected = joblib.load(temporal_model_path).predict(features)
+
+    np.testing.assert_allclose(pd.read_csv(output)[PREDICTION_COLUMN], expected, atol=1e-4)
+
+def test_temporal_model_needs_rows_in_time_order(tmp_path, archive, temporal_model_path):
+    path = str(tmp_path / "shuffled.csv")
+    archive.iloc[::-1].to_csv(path, index=False)
+
+    with pytest.raises(ValueError, match="timestamp order"):
+        score_file(path, str(tmp_path / "out.csv"), temporal_model_path, chunk_size=128, workers=1)
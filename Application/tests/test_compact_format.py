@@ -0,0 +1,144 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import json
+import pytest
+from unittest import mock
+import numpy as np
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+
+from Application.main import app
+from Application.Dtos.predict import PredictionRequestDto, SensorReadingDto
+from Application.services import ml_model_services
+from Application.services.bed_state import bed_state_store
+from Application.services.compact_format import (
+    COMPACT_SCHEMA_ID, PACKED_MEDIA_TYPE, CompactFormatError, GROWTH_STAGE_NAMES,
+    decode_packed, decode_rows, encode_packed
+)
+from Application.services.fallback_rules import fallback_rules
+from Application.services.feature_pipeline import FEATURE_PIPELINE
+
+client = TestClient(app)
+
+TIMESTAMP = datetime(2025, 5, 20, 10, tzinfo=timezone.utc)
+
+# timestamp, bedId, Temperature, Soil Humidity, Air Humidity, Light, CO2, PIR, Proximity, hours since watering, stage
+ROWS = [
+    [TIMESTAMP.timestamp(), 0, 22.5, 41.0, 55.0, 300.0, 420.0, 0.0, 1.0, 12.5, 0],
+    [TIMESTAMP.timestamp(), 0, 31.0, 18.5, None, None, None, None, None, 50.0, 2],
+    [TIMESTAMP.timestamp(), 0, None, 65.0, 25.0, 900.0, None, 1.0, None, 3.0, 1],
+]
+
+def payload_for(row) -> PredictionRequestDto:
+    """The JSON request equivalent to a compact row"""
+    names = ["Temperature", "Soil Humidity", "Air Humidity", "Light", "CO2", "PIR", "Proximity"]
+    return PredictionRequestDto(
+        timestamp=TIMESTAMP,
+        plantGrowthStage=GROWTH_STAGE_NAMES[row[10]],
+        timeSinceLastWateringInHours=row[9],
+        mlSensorReadings=[SensorReadingDto(SensorName=name, Unit="", Value=value)
+                          for name, value in zip(names, row[2:9]) if value is not None]
+    )
+
+def rows_body(rows, schema=COMPACT_SCHEMA_ID) -> bytes:
+    return json.dumps({"schema": schema, "rows": rows}).encode()
+
+def test_both_forms_decode_to_the_json_request_features():
+    """Test packed and JSON rows give the features of the equivalent named-sensor requests"""
+    expected = ml_model_services.extract_feature_matrix([payload_for(row) for row in ROWS])
+
+    from_rows = FEATURE_PIPELINE.transform(decode_rows(rows_body(ROWS)).raw_inputs())
+    from_packed = FEATURE_PIPELINE.transform(decode_packed(encode_packed(ROWS)).raw_inputs())
+
+    np.testing.assert_array_equal(from_rows, expected)
+    # Packed sensor values are float32
+    np.testing.assert_allclose(from_packed, expected, rtol=1e-6)
+
+def test_fallback_rules_match_the_json_request_path():
+    """Test missing values in compact readings get the rule defaults, not the model defaults"""
+    payloads = [payload_for(row) for row in ROWS]
+    readings = decode_rows(rows_body(ROWS))
+
+    for reason in ("no_model_found", "model_module_error", "prediction_error_ValueError"):
+        np.testing.assert_array_equal(
+            fallback_rules.predict_columns(readings.columns, GROWTH_STAGE_NAMES, reason),
+            fallback_rules.predict(payloads, reason)
+        )
+
+@pytest.mark.parametrize("body, message", [
+    (b"GHRD", "shorter"),
+    (b"XXXX" + encode_packed(ROWS)[4:], "magic"),
+    (encode_packed(ROWS)[:-4], "announces"),
+    (encode_packed(ROWS)[:4] + b"\x02" + encode_packed(ROWS)[5:], "schema"),
+])
+def test_malformed_packed_bodies_are_rejected(body, message):
+    with pytest.raises(CompactFormatError, match=message):
+        decode_packed(body)
+
+@pytest.mark.parametrize("body, message", [
+    (b"{not json", "Invalid JSON"),
+    (rows_body(ROWS, schema=2), "schema"),
+    (rows_body([ROWS[0], ROWS[0][:5]]), "list of 11"),
+    (rows_body([ROWS[0][:5]]), "11 values, got 5"),
+    (rows_body([ROWS[0][:1] + [-1] + ROWS[0][2:]]), "bedId"),
+    (rows_body([ROWS[0][:10] + [3]]), "growth_stage"),
+    (rows_body([[None] + ROWS[0][1:]]), "timestamp"),
+    (b'{"schema": 1, "rows": [[1e400, 0, 1, 2, 3, 4, 5, 6, 7, 8, 1]]}', "timestamp"),
+    (rows_body([[1e20] + ROWS[0][1:]]), "timestamp must be between"),
+    (rows_body([[-1e12] + ROWS[0][1:]]), "timestamp must be between"),
+])
+def test_malformed_rows_are_rejected(body, message):
+    with pytest.raises(CompactFormatError, match=message):
+        decode_rows(body)
+
+def mock_model():
+    """Mock model predicting the soil humidity column, so results reveal their order"""
+    model = mock.MagicMock()
+    model.predict.side_effect = lambda X: np.asarray(X)[:, 1]
+    return model
+
+@pytest.mark.parametrize("content_type, body", [
+    (PACKED_MEDIA_TYPE, encode_packed(ROWS)),
+    ("application/octet-stream", encode_packed(ROWS)),
+    ("application/json", rows_body(ROWS)),
+])
+def test_compact_endpoint_predicts_in_order(content_type, body):
+    with mock.patch('joblib.load', return_value=mock_model()):
+        response = client.post("/api/ml/predict/compact", content=body, headers={"Content-Type": content_type})
+
+    assert response.status_code == 200
+    predictions = response.json()["Predictions"]
+    assert [item["HoursUntilNextWatering"] for item in predictions] == [41.0, 18.5, 65.0]
+    assert all(item["FallbackReason"] is None for item in predictions)
+
+def test_compact_endpoint_rejects_out_of_range_timestamps():
+    """Test a finite timestamp datetime cannot represent is a 400, for bed readings too"""
+    row = [1e20, 7] + ROWS[0][2:]
+    for content_type, body in ((PACKED_MEDIA_TYPE, encode_packed([row])), ("application/json", rows_body([row]))):
+        response = client.post("/api/ml/predict/compact", content=body, headers={"Content-Type": content_type})
+        assert response.status_code == 400
+        assert "timestamp" in response.json()["detail"]
+
+def test_compact_endpoint_rejects_bad_requests():
+    assert client.post("/api/ml/predict/compact", content=b"x", headers={"Content-Type": "text/plain"}).status_code == 415
+
+    response = client.post("/api/ml/predict/compact", content=b"GHRD", headers={"Content-Type": PACKED_MEDIA_TYPE})
+    assert response.status_code == 400
+    assert "header" in response.json()["detail"]
+
+    with mock.patch('Application.api.ml_controller.MAX_BATCH_SIZE', 2):
+        response = client.post("/api/ml/predict/compact", content=rows_body(ROWS),
+                               headers={"Content-Type": "application/json"})
+    assert response.status_code == 413
+
+@pytest.mark.asyncio
+async def test_compact_bed_ids_share_state_with_json_requests():
+    bed_state_store.clear()
+    row = list(ROWS[0])
+    row[1] = 7
+    await ml_model_services.analyze_compact_batch(decode_packed(encode_packed([row])))
+
+    assert bed_state_store.features("7")["temperature_rolling_mean"] == pytest.approx(22.5)
+    bed_state_store.clear()
@@ -0,0 +1,61 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import shutil
+import pytest
+from unittest import mock
+import pandas as pd
+
+from Application.training.utils import data_loader
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "training", "data", "cleaned_data_greenhouse.csv")
+
+@pytest.fixture
+def csv_path(tmp_path, monkeypatch):
+    """Copy of the training CSV with the cache redirected to a temporary directory"""
+    monkeypatch.setattr(data_loader, "CACHE_DIR", str(tmp_path / "cache"))
+    path = str(tmp_path / "greenhouse.csv")
+    shutil.copy(DATA_PATH, path)
+    return path
+
+def test_typed_columns_match_default_parsing(csv_path):
+    """Test explicit dtypes keep the values pandas would infer"""
+    typed = data_loader.load_dataset(csv_path, use_cache=False)
+    inferred = pd.read_csv(csv_path)
+
+    assert typed["plantGrowthStage"].dtype == "category"
+    assert str(typed["timestamp"].dtype) == "datetime64[ns, UTC]"
+    pd.testing.assert_series_equal(typed["Temperature"], inferred["Temperature"])
+    assert (typed["plantGrowthStage"].astype(str) == inferred["plantGrowthStage"]).all()
+    assert (typed["timestamp"] == pd.to_datetime(inferred["timestamp"], utc=True)).all()
+
+def test_is_daytime_is_vectorized_equivalent(csv_path):
+    _, _, df, _ = data_loader.load_processed_dataset(path=csv_path, use_cache=False)
+
+    expected = df["hourOfDay"].apply(lambda h: 1 if 6 <= h <= 18 else 0)
+    assert (df["is_daytime"] == expected).all()
+
+def test_cache_is_reused_until_csv_content_changes(csv_path):
+    """Test the CSV is parsed once, re-hashed when touched, and re-parsed only when edited"""
+    first = data_loader.load_dataset(csv_path)
+
+    with mock.patch.object(data_loader, "read_csv_typed", wraps=data_loader.read_csv_typed) as parse:
+        cached = data_loader.load_dataset(csv_path)
+        os.utime(csv_path, ns=(0, 0))
+        touched = data_loader.load_dataset(csv_path)
+        assert parse.call_count == 0
+
+        with open(csv_path, 'a') as f:
+            f.write("20.0,30.0,40.0,100.0,Seedling Stage,1,2025-06-01 00:00:00.000000+00:00,0,Night,10.0\n")
+        edited = data_loader.load_dataset(csv_path)
+        assert parse.call_count == 1
+
+    pd.testing.assert_frame_equal(cached, first)
+    pd.testing.assert_frame_equal(touched, first)
+    assert len(edited) == len(first) + 1
+
+def test_timestamps_with_shared_offset_use_fast_path():
+    values = pd.Series(["2025-05-20 09:10:43.159000+02:00", "2025-05-20 10:00:00.000000+02:00"])
+
+    assert (data_loader.parse_timestamps(values) == pd.to_datetime(values, utc=True, format="ISO8601")).all()
@@ -0,0 +1,161 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import json
+import itertools
+import pytest
+import numpy as np
+from datetime import datetime, timezone
+
+from Application.Dtos.predict import PredictionRequestDto, SensorReadingDto
+from Application.services.fallback_rules import (
+    DEFAULT_FALLBACK_RULES, FallbackRules, ThresholdRule, fallback_rules, load_fallback_rules
+)
+from Application.services.ml_model_services import (
+    create_fallback_prediction, create_fallback_predictions, create_fallback_model_predictions
+)
+
+def legacy_fallback(payload, reason):
+    """The if/elif rules the table replaces (create_fallback_prediction before the rule table)"""
+    sensor_dict = {reading.SensorName: reading.Value for reading in payload.mlSensorReadings}
+    soil_humidity = sensor_dict.get("Soil Humidity", 50)
+    if soil_humidity < 20:
+        hours = 4.0
+    elif soil_humidity < 30:
+        hours = 12.0
+    elif soil_humidity < 40:
+        hours = 24.0
+    elif soil_humidity < 60:
+        hours = 36.0
+    else:
+        hours = 48.0
+    if reason == "no_model_found":
+        temperature = sensor_dict.get("Temperature", 25)
+        if temperature > 30:
+            hours *= 0.8
+        elif temperature < 15:
+            hours *= 1.2
+        air_humidity = sensor_dict.get("Air Humidity", 50)
+        if air_humidity < 30:
+            hours *= 0.9
+        elif air_humidity > 70:
+            hours *= 1.1
+        light = sensor_dict.get("Light", 200)
+        if light > 800:
+            hours *= 0.9
+        elif light < 100:
+            hours *= 1.1
+        if payload.plantGrowthStage in ["Seedling", "Seedling Stage"]:
+            hours *= 0.8
+        elif payload.plantGrowthStage in ["Vegetative", "Vegetative Stage"]:
+            hours *= 1.0
+        elif payload.plantGrowthStage in ["Flowering", "Flowering Stage"]:
+            hours *= 1.1
+        if payload.timeSinceLastWateringInHours > 48:
+            hours *= 0.8
+    return max(min(hours, 72.0), 1.0)
+
+def legacy_model_fallback(payload):
+    """The if/elif rules of create_fallback_model_prediction before the rule table"""
+    sensor_dict = {reading.SensorName: reading.Value for reading in payload.mlSensorReadings}
+    soil_humidity = sensor_dict.get("Soil Humidity", 50)
+    if soil_humidity < 20:
+        hours = 4.0
+    elif soil_humidity < 30:
+        hours = 12.0
+    elif soil_humidity < 40:
+        hours = 24.0
+    elif soil_humidity < 50:
+        hours = 36.0
+    else:
+        hours = 48.0
+    temperature = sensor_dict.get("Temperature", 25)
+    if temperature > 30:
+        hours *= 0.7
+    elif temperature < 15:
+        hours *= 1.3
+    if payload.plantGrowthStage in ["Seedling", "Seedling Stage"]:
+        hours *= 0.9
+    elif payload.plantGrowthStage in ["Flowering", "Flowering Stage"]:
+        hours *= 1.1
+    return hours
+
+def make_payload(stage, hours_since, **sensors):
+    return PredictionRequestDto(
+        timestamp=datetime.now(timezone.utc),
+        plantGrowthStage=stage,
+        timeSinceLastWateringInHours=hours_since,
+        mlSensorReadings=[SensorReadingDto(SensorName=name.replace("_", " "), Unit="", Value=value)
+                          for name, value in sensors.items()]
+    )
+
+@pytest.fixture(scope="module")
+def payloads():
+    """Every combination of values on, just around and between the rule thresholds"""
+    soil = [0.0, 19.999, 20.0, 25.0, 30.0, 39.9, 40.0, 49.99, 50.0, 59.999, 60.0, 100.0]
+    temperature = [10.0, 14.999, 15.0, 30.0, 30.0001, 40.0]
+    air = [29.0, 30.0, 70.0, 70.5]
+    light = [99.0, 100.0, 800.0, 801.0]
+    stages = ["Seedling", "Vegetative Stage", "Flowering", "Unknown"]
+    payloads = [
+        make_payload(stage, since, Soil_Humidity=s, Temperature=t, Air_Humidity=a, Light=l)
+        for s, t, a, l, stage, since in itertools.product(soil, temperature, air, light, stages, [48.0, 48.5])
+    ]
+    # Missing sensors fall back to the rule defaults
+    payloads.append(make_payload("Seedling", 0.0))
+    return payloads
+
+@pytest.mark.parametrize("reason", ["no_model_found", "prediction_error_ValueError", "unexpected_error_KeyError"])
+def test_table_matches_legacy_rules(payloads, reason):
+    """Test the vectorized table gives bit-identical hours to the old if/elif rules"""
+    expected = np.array([legacy_fallback(payload, reason) for payload in payloads])
+    np.testing.assert_array_equal(fallback_rules.predict(payloads, reason), expected)
+
+def test_model_module_error_table_matches_legacy_rules(payloads):
+    expected = [legacy_model_fallback(payload) for payload in payloads]
+    results = create_fallback_model_predictions(payloads, "Application/trained_models/reg_model_x.pkl")
+
+    assert [r.HoursUntilNextWatering for r in results] == expected
+    assert {r.modelVersion for r in results} == {"fallback_reg_model_x.pkl"}
+    assert {r.fallbackReason for r in results} == {"model_module_error"}
+
+def test_single_and_batch_fallbacks_agree(payloads):
+    batch = create_fallback_predictions(payloads[:50], "no_model_found")
+    single = [create_fallback_prediction(payload, "no_model_found") for payload in payloads[:50]]
+
+    assert [r.HoursUntilNextWatering for r in batch] == [r.HoursUntilNextWatering for r in single]
+    assert batch[0].modelVersion == "fallback_no_model_found"
+
+def test_last_repeated_reading_wins():
+    payload = make_payload("Vegetative", 0.0, Soil_Humidity=10.0)
+    payload.mlSensorReadings.append(SensorReadingDto(SensorName="Soil Humidity", Unit="%", Value=70.0))
+
+    assert fallback_rules.predict([payload], "default")[0] == 48.0
+
+def test_rules_load_from_config(tmp_path):
+    """Test a JSON file replaces rule sets without code changes"""
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({
+        "default": {"base": {"input": "Soil Humidity", "default": 50, "cases": [["<", 35, 6.0]], "otherwise": 30.0},
+                    "multipliers": [], "clamp": None}
+    }))
+    rules = load_fallback_rules(str(path))
+    payloads = [make_payload("Seedling", 0.0, Soil_Humidity=value) for value in (34.0, 35.0)]
+
+    assert list(rules.predict(payloads, "prediction_error_ValueError")) == [6.0, 30.0]
+    assert set(rules.rule_sets) == set(DEFAULT_FALLBACK_RULES)
+
+@pytest.mark.parametrize("cases", [
+    [["<", 30, 1.0], ["<", 20, 2.0]],
+    [[">", 20, 1.0], [">", 30, 2.0]],
+    [["<", 40, 1.0], [">", 30, 2.0]],
+    [["<=", 30, 1.0]],
+])
+def test_invalid_rules_are_rejected(cases):
+    with pytest.raises(ValueError):
+        ThresholdRule({"input": "Temperature", "cases": cases, "otherwise": 1.0})
+
+def test_default_rule_set_is_required():
+    with pytest.raises(ValueError, match="default"):
+        FallbackRules({"no_model_found": DEFAULT_FALLBACK_RULES["no_model_found"]})
@@ -0,0 +1,70 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import json
+import pytest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+
+from Application.Dtos.predict import PredictionRequestDto, SensorReadingDto
+from Application.services.feature_pipeline import FEATURE_PIPELINE, FeaturePipeline, feature_spec_path_for
+from Application.services.ml_model_services import extract_feature_matrix, extract_features_from_payload
+from Application.services.model_registry import ModelRegistry, FEATURE_MISMATCH_REASON
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "training", "data", "cleaned_data_greenhouse.csv")
+
+def payload_from_row(row) -> PredictionRequestDto:
+    """The request the backend would send for one archived reading"""
+    return PredictionRequestDto(
+        timestamp=datetime.now(timezone.utc),
+        plantGrowthStage=row["plantGrowthStage"],
+        timeSinceLastWateringInHours=row["timeSinceLastWateringInHours"],
+        mlSensorReadings=[
+            SensorReadingDto(SensorName=name, Unit="", Value=row[name])
+            for name in ("Temperature", "Soil Humidity", "Air Humidity", "Light")
+        ]
+    )
+
+def test_training_and_serving_features_are_identical():
+    """Test the training matrix equals what the API builds for the same readings, bit for bit"""
+    df = pd.read_csv(DATA_PATH)
+    payloads = [payload_from_row(row) for _, row in df.iterrows()]
+
+    training = FEATURE_PIPELINE.transform_frame(df)
+    serving_batch = extract_feature_matrix(payloads)
+    serving_single = np.array([extract_features_from_payload(p) for p in payloads])
+
+    assert training.shape == (len(df), 16)
+    assert np.array_equal(training, serving_batch)
+    assert np.array_equal(training, serving_single)
+
+def test_one_row_and_matrix_paths_agree_with_defaults():
+    raw = {"Temperature": 31.5, "Soil Humidity": 12.0, "timeSinceLastWateringInHours": 7.25}
+
+    row = FEATURE_PIPELINE.transform_one(raw)
+    matrix = FEATURE_PIPELINE.transform({name: np.array([value]) for name, value in raw.items()})
+
+    assert row == matrix[0].tolist()
+    assert row[4] == 400.0  # CO2 default
+
+def test_registry_refuses_model_with_other_feature_pipeline(tmp_path):
+    """Test a model saved with a different pipeline version is never served"""
+    model_path = tmp_path / "reg_model_2025-01-01_00-00-00.pkl"
+    model_path.write_bytes(b"placeholder")
+    spec = FeaturePipeline(version=FEATURE_PIPELINE.version + 1).spec()
+    with open(feature_spec_path_for(str(model_path)), 'w') as f:
+        json.dump(spec, f)
+
+    model = mock.MagicMock()
+    model.predict.side_effect = lambda X: np.zeros(len(X))
+    registry = ModelRegistry(model_dir=str(tmp_path))
+    with mock.patch('joblib.load', return_value=model):
+        assert registry.load_latest() is None
+    assert registry.failure.reason == FEATURE_MISMATCH_REASON
+
+    FEATURE_PIPELINE.save_spec(feature_spec_path_for(str(model_path)))
+    with mock.patch('joblib.load', return_value=model):
+        assert registry.reload(force=True) is None
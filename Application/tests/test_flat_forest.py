@@ -0,0 +1,108 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+import time
+from unittest import mock
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from Application.services.flat_forest import FlatForest, compile_forest
+from Application.services.feature_pipeline import FEATURE_PIPELINE, GROWTH_STAGE_MAP
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "training", "data", "cleaned_data_greenhouse.csv")
+
+@pytest.fixture(scope="module")
+def greenhouse_data():
+    """Feature matrix and target built from the training CSV the same way train_randomForest.py does"""
+    df = pd.read_csv(DATA_PATH)
+    X = FEATURE_PIPELINE.transform({
+        "Temperature": df["Temperature"],
+        "Soil Humidity": df["Soil Humidity"],
+        "Air Humidity": df["Air Humidity"],
+        "Light": df["Light"],
+        "CO2": np.full(len(df), 400.0),
+        "PIR": np.zeros(len(df)),
+        "Proximity": np.zeros(len(df)),
+        "timeSinceLastWateringInHours": df["timeSinceLastWateringInHours"],
+        "growth_stage": df["plantGrowthStage"].map(GROWTH_STAGE_MAP).fillna(1)
+    })
+    return X, df["timeUntilNextWateringInHours"].to_numpy()
+
+@pytest.fixture(scope="module")
+def forest(greenhouse_data):
+    X, y = greenhouse_data
+    return RandomForestRegressor(n_estimators=30, max_depth=30, random_state=42).fit(X[:800], y[:800])
+
+def test_flat_forest_matches_sklearn(greenhouse_data, forest):
+    """Test the flat evaluator reproduces sklearn predictions on the whole dataset"""
+    X, _ = greenhouse_data
+    flat = FlatForest.from_sklearn(forest)
+
+    assert flat.n_trees == 30
+    assert flat.n_nodes == sum(e.tree_.node_count for e in forest.estimators_)
+    np.testing.assert_allclose(flat.predict(X), forest.predict(X), rtol=1e-9)
+
+def test_flat_forest_predicts_single_row(greenhouse_data, forest):
+    """Test a single 1-D row is accepted and matches sklearn"""
+    X, _ = greenhouse_data
+    flat = FlatForest.from_sklearn(forest)
+
+    assert flat.predict(X[0]).shape == (1,)
+    np.testing.assert_allclose(flat.predict(X[0]), forest.predict(X[:1]), rtol=1e-9)
+
+def with_missing_values(X, fraction=0.2, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.array(X, dtype=float)
+    X[rng.random(X.shape) < fraction] = np.nan
+    return X
+
+def test_flat_forest_routes_missing_values_like_sklearn(greenhouse_data, forest):
+    """Test NaN follows each split's missing value direction, for forests fitted with and without NaN"""
+    X, y = greenhouse_data
+    X_missing = with_missing_values(X)
+    fitted_with_nan = RandomForestRegressor(n_estimators=10, random_state=0).fit(with_missing_values(X, seed=1), y)
+
+    for model in (forest, fitted_with_nan):
+        np.testing.assert_allclose(FlatForest.from_sklearn(model).predict(X_missing), model.predict(X_missing),
+                                   rtol=1e-9)
+        np.testing.assert_allclose(FlatForest.from_sklearn(model).predict(X_missing[0]), model.predict(X_missing[:1]),
+                                   rtol=1e-9)
+
+@pytest.mark.parametrize("value", [np.inf, -np.inf, 1e39])
+def test_flat_forest_rejects_values_sklearn_rejects(greenhouse_data, forest, value):
+    X, _ = greenhouse_data
+    row = np.array(X[:1], dtype=float)
+    row[0, 0] = value
+
+    with pytest.raises(ValueError, match="infinity"):
+        forest.predict(row)
+    with pytest.raises(ValueError, match="infinity"):
+        FlatForest.from_sklearn(forest).predict(row)
+
+def test_flat_forest_rejects_wrong_feature_count(forest):
+    flat = FlatForest.from_sklearn(forest)
+    with pytest.raises(ValueError):
+        flat.predict(np.zeros((1, 5)))
+
+def test_compile_forest_skips_unsupported_models(forest):
+    """Test non-forest models keep being served by their own predict"""
+    assert compile_forest(mock.MagicMock()) is None
+    assert compile_forest(forest, engine="sklearn") is None
+    assert isinstance(compile_forest(forest), FlatForest)
+
+@pytest.mark.performance
+def test_flat_forest_single_row_is_faster(greenhouse_data, forest):
+    """Test single-row prediction is faster than sklearn's predict"""
+    X, _ = greenhouse_data
+    flat = FlatForest.from_sklearn(forest)
+
+    def timed(fn, repeats=20):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            fn(X[:1])
+        return time.perf_counter() - start
+
+    assert timed(flat.predict) < timed(forest.predict)
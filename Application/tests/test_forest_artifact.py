@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+import json
+from unittest import mock
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from Application.services.flat_forest import FlatForest
+from Application.services.forest_artifact import (
+    artifact_path_for, save_forest_artifact, load_forest_artifact, HEADER_FILE
+)
+from Application.services.model_registry import ModelRegistry
+from Application.training.utils import file_manager
+
+@pytest.fixture(scope="module")
+def forest():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, size=(200, 16))
+    return RandomForestRegressor(n_estimators=10, random_state=0).fit(X, X[:, 1] * 0.5 + rng.normal(0, 1, 200))
+
+def test_artifact_round_trip_is_memory_mapped(tmp_path, forest):
+    """Test a saved artifact predicts identically and is backed by memory-mapped files"""
+    path = save_forest_artifact(FlatForest.from_sklearn(forest), str(tmp_path / "reg_model_x.forest"))
+    loaded = load_forest_artifact(path)
+
+    X = np.random.default_rng(1).uniform(0, 100, size=(20, 16))
+    X[np.arange(20), np.arange(20) % 16] = np.nan
+    np.testing.assert_allclose(loaded.predict(X), forest.predict(X), rtol=1e-9)
+    assert isinstance(loaded.threshold.base, np.memmap)
+    assert not loaded.threshold.flags.writeable
+
+def test_artifact_rejects_unknown_version(tmp_path, forest):
+    """Test artifacts from a newer format version are refused"""
+    path = save_forest_artifact(FlatForest.from_sklearn(forest), str(tmp_path / "reg_model_x.forest"))
+    header_path = os.path.join(path, HEADER_FILE)
+    with open(header_path) as f:
+        header = json.load(f)
+    header["format_version"] = 99
+    with open(header_path, 'w') as f:
+        json.dump(header, f)
+
+    with pytest.raises(ValueError):
+        load_forest_artifact(path)
+
+def test_save_model_writes_artifact_next_to_pickle(tmp_path, forest):
+    """Test file_manager.save_model exports the artifact alongside the .pkl"""
+    with mock.patch.object(file_manager, 'MODEL_DIR', str(tmp_path)):
+        model_path, _ = file_manager.save_model(forest, None, "2025-01-01_00-00-00", prefix="reg_")
+
+    assert os.path.exists(model_path)
+    assert os.path.isdir(artifact_path_for(model_path))
+
+def test_registry_serves_from_artifact_without_unpickling(tmp_path, forest):
+    """Test the registry opens the artifact instead of loading the pickle"""
+    with mock.patch.object(file_manager, 'MODEL_DIR', str(tmp_path)):
+        file_manager.save_model(forest, None, "2025-01-01_00-00-00", prefix="reg_")
+    registry = ModelRegistry(model_dir=str(tmp_path))
+
+    with mock.patch('joblib.load') as mock_load:
+        active = registry.load_latest()
+
+    mock_load.assert_not_called()
+    assert active.model_format == "forest"
+    X = np.zeros((1, 16))
+    np.testing.assert_allclose(active.predictor_for(1).predict(X), forest.predict(X), rtol=1e-9)
+
+def test_artifact_model_loads_pickle_once_for_large_batches(tmp_path, forest):
+    """Test batches above FLAT_FOREST_MAX_ROWS get sklearn, unpickled on first use, while small ones stay flat"""
+    with mock.patch.object(file_manager, 'MODEL_DIR', str(tmp_path)):
+        file_manager.save_model(forest, None, "2025-01-01_00-00-00", prefix="reg_")
+    active = ModelRegistry(model_dir=str(tmp_path)).load_latest()
+
+    with mock.patch('Application.services.model_registry.FLAT_FOREST_MAX_ROWS', 4):
+        assert active.predictor_for(4) is active.flat_forest
+        large = active.predictor_for(5)
+        assert isinstance(large, RandomForestRegressor) and active.predictor_for(50) is large
+    assert active.model_format == "forest"
+
+def test_artifact_model_without_loadable_pickle_stays_flat(tmp_path, forest):
+    with mock.patch.object(file_manager, 'MODEL_DIR', str(tmp_path)):
+        file_manager.save_model(forest, None, "2025-01-01_00-00-00", prefix="reg_")
+    active = ModelRegistry(model_dir=str(tmp_path)).load_latest()
+
+    with mock.patch('joblib.load', side_effect=EOFError("truncated pickle")) as mock_load:
+        assert active.predictor_for(10_000) is active.flat_forest
+        assert active.predictor_for(10_000) is active.flat_forest
+    assert mock_load.call_count == 1
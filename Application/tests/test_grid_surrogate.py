@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from unittest import mock
+import numpy as np
+
+from Application.services.grid_surrogate import GridSurrogate, surrogate_path_for
+from Application.services import model_registry as registry_module
+from Application.services.feature_pipeline import FEATURE_PIPELINE, TEMPORAL_FEATURE_PIPELINE
+
+REFERENCE = {
+    "Temperature": 25.0, "Soil Humidity": 20.0, "Air Humidity": 50.0, "Light": 200.0, "CO2": 400.0,
+    "PIR": 0.0, "Proximity": 0.0, "timeSinceLastWateringInHours": 10.0, "growth_stage": 1.0,
+}
+
+class LinearModel:
+    """Model linear in the grid inputs, which multilinear interpolation reproduces exactly"""
+    def predict(self, X):
+        X = np.asarray(X)
+        return 2.0 * X[:, 1] - 0.5 * X[:, 0] + 0.1 * X[:, 7] + 3.0 * X[:, 8]
+
+@pytest.fixture
+def surrogate():
+    axis_points = {
+        "Soil Humidity": np.linspace(10, 30, 5),
+        "Temperature": np.linspace(15, 45, 7),
+        "timeSinceLastWateringInHours": np.linspace(0, 100, 11),
+        "growth_stage": np.array([0.0, 1.0, 2.0]),
+    }
+    return GridSurrogate.build(LinearModel(), axis_points, REFERENCE)
+
+def rows(soil, temperature, hours, stage):
+    n = len(soil)
+    return FEATURE_PIPELINE.transform({
+        "Temperature": temperature, "Soil Humidity": soil, "Air Humidity": np.full(n, 50.0),
+        "Light": np.full(n, 200.0), "CO2": np.full(n, 400.0), "PIR": np.zeros(n), "Proximity": np.zeros(n),
+        "timeSinceLastWateringInHours": hours, "growth_stage": stage,
+    })
+
+def test_interpolation_inside_grid(surrogate):
+    """Test interpolated values between grid points match a multilinear model"""
+    rng = np.random.default_rng(0)
+    X = rows(rng.uniform(10, 30, 50), rng.uniform(15, 45, 50), rng.uniform(0, 100, 50), rng.integers(0, 3, 50))
+
+    np.testing.assert_allclose(surrogate.predict(X), LinearModel().predict(X), rtol=1e-9)
+
+def test_inputs_outside_grid_are_clamped(surrogate):
+    X = rows(np.array([5.0, 50.0]), np.array([25.0, 25.0]), np.array([10.0, 10.0]), np.array([1.0, 1.0]))
+    clamped = rows(np.array([10.0, 30.0]), np.array([25.0, 25.0]), np.array([10.0, 10.0]), np.array([1.0, 1.0]))
+
+    np.testing.assert_allclose(surrogate.predict(X), LinearModel().predict(clamped))
+
+def test_error_report_and_round_trip(tmp_path, surrogate):
+    """Test the saved surrogate reloads identically and reports its error"""
+    X = rows(np.array([12.0, 27.5]), np.array([20.0, 33.0]), np.array([4.0, 60.0]), np.array([0.0, 2.0]))
+    path = surrogate.save(str(tmp_path / "reg_surrogate_x.npz"))
+    loaded = GridSurrogate.load(path)
+
+    np.testing.assert_allclose(loaded.predict(X), surrogate.predict(X))
+    report = loaded.error_report(LinearModel(), X)
+    assert report["max_abs_error"] < 1e-9
+    assert report["n_samples"] == 2
+
+def test_registry_serves_surrogate_within_error_budget(tmp_path, surrogate):
+    """Test the surrogate engine is used only when its recorded error is acceptable"""
+    model_path = str(tmp_path / "reg_model_2025-01-01_00-00-00.pkl")
+    surrogate.metadata["mean_abs_error"] = 0.5
+    surrogate.save(surrogate_path_for(model_path))
+
+    assert surrogate_path_for(model_path).endswith("reg_surrogate_2025-01-01_00-00-00.npz")
+    assert isinstance(registry_module.load_surrogate(model_path, engine="surrogate"), GridSurrogate)
+    assert registry_module.load_surrogate(model_path, engine="flat") is None
+    assert registry_module.load_surrogate(model_path, TEMPORAL_FEATURE_PIPELINE, engine="surrogate") is None
+    with mock.patch.object(registry_module, 'SURROGATE_MAX_MEAN_ERROR', 0.1):
+        assert registry_module.load_surrogate(model_path, engine="surrogate") is None
@@ -0,0 +1,69 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import json
+import pytest
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from Application.training.utils.incremental import (
+    load_latest_training_log, data_watermark, rows_since, extend_forest
+)
+
+@pytest.fixture
+def history():
+    timestamps = pd.date_range("2025-05-20", periods=6, freq="h", tz="UTC")
+    return pd.DataFrame({"timestamp": timestamps, "value": range(6)})
+
+@pytest.fixture
+def forest():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 1, (200, 3))
+    model = RandomForestRegressor(n_estimators=10, random_state=42)
+    model.fit(X, X[:, 0] * 10)
+    return model
+
+def test_rows_since_watermark(history):
+    """Test only rows strictly after the recorded watermark are selected"""
+    watermark = data_watermark(history.iloc[:4])
+
+    assert list(rows_since(history, watermark)["value"]) == [4, 5]
+    assert rows_since(history, data_watermark(history)).empty
+    # Naive watermarks are read as UTC
+    assert list(rows_since(history, "2025-05-20T04:00:00")["value"]) == [5]
+
+def test_extend_forest_keeps_existing_trees(forest):
+    """Test warm-starting adds trees fitted on the new rows without refitting the old ones"""
+    old_trees = list(forest.estimators_)
+    X_new = np.random.default_rng(1).uniform(0, 1, (50, 3))
+
+    extend_forest(forest, X_new, X_new[:, 0] * 10, new_trees=5)
+
+    assert len(forest.estimators_) == forest.n_estimators == 15
+    assert forest.estimators_[:10] == old_trees
+    assert all(tree.tree_.n_node_samples[0] <= 50 for tree in forest.estimators_[10:])
+    assert forest.warm_start is False
+
+def test_extend_forest_retires_oldest_trees(forest):
+    old_trees = list(forest.estimators_)
+    X_new = np.random.default_rng(1).uniform(0, 1, (50, 3))
+
+    extend_forest(forest, X_new, X_new[:, 0] * 10, new_trees=4, max_trees=10)
+
+    assert len(forest.estimators_) == forest.n_estimators == 10
+    assert forest.estimators_[:6] == old_trees[4:]
+    assert forest.predict(X_new).shape == (50,)
+
+def test_extend_forest_rejects_unfitted_models():
+    with pytest.raises(TypeError, match="warm-start"):
+        extend_forest(RandomForestRegressor(), np.zeros((2, 3)), np.zeros(2), new_trees=1)
+
+def test_latest_training_log(tmp_path):
+    assert load_latest_training_log(str(tmp_path)) is None
+    for timestamp in ["2025-05-27_18-54-53", "2025-06-01_08-00-00"]:
+        with open(tmp_path / f"regression_only_log_{timestamp}.json", 'w') as f:
+            json.dump({"timestamp": timestamp}, f)
+
+    assert load_latest_training_log(str(tmp_path))["timestamp"] == "2025-06-01_08-00-00"
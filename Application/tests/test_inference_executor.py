@@ -0,0 +1,116 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+import asyncio
+import threading
+import pickle
+import joblib
+from unittest import mock
+import numpy as np
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestRegressor
+
+from Application.services.inference_executor import InferenceExecutor, InferenceOverloadedError
+from Application.services.model_registry import LoadedModel
+from Application.main import app
+
+def make_active(model, model_path="reg_model_test.pkl"):
+    return LoadedModel(model=model, model_path=model_path, version=os.path.basename(model_path),
+                       loaded_at=datetime.now(timezone.utc), load_seconds=0.0)
+
+@pytest.mark.asyncio
+async def test_predict_runs_off_event_loop_thread():
+    """Test inference runs on a pool thread, not on the event loop"""
+    threads = []
+    model = mock.MagicMock()
+    model.predict.side_effect = lambda X: threads.append(threading.get_ident()) or np.ones(len(X))
+    executor = InferenceExecutor(kind="thread", max_workers=2, max_queue=0)
+
+    result = await executor.predict(make_active(model), np.zeros((3, 16)))
+    executor.shutdown()
+
+    assert list(result) == [1.0, 1.0, 1.0]
+    assert threads and threads[0] != threading.get_ident()
+
+@pytest.mark.asyncio
+async def test_rejects_requests_beyond_queue_limit():
+    """Test backpressure rejects work instead of queueing without bound"""
+    release = threading.Event()
+    model = mock.MagicMock()
+    model.predict.side_effect = lambda X: release.wait(5) and np.ones(len(X))
+    executor = InferenceExecutor(kind="thread", max_workers=1, max_queue=1)
+    active = make_active(model)
+
+    running = [asyncio.create_task(executor.predict(active, np.zeros((1, 16)))) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    with pytest.raises(InferenceOverloadedError):
+        await executor.predict(active, np.zeros((1, 16)))
+
+    release.set()
+    await asyncio.gather(*running)
+    executor.shutdown()
+    assert executor.stats()["rejected"] == 1
+    assert executor.stats()["in_flight"] == 0
+
+def fit_forest(n_features=16, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.random((50, n_features))
+    return RandomForestRegressor(n_estimators=5, random_state=seed).fit(X, rng.random(50)), X
+
+@pytest.mark.asyncio
+async def test_process_pool_predicts_after_model_files_are_deleted(tmp_path):
+    """Test pool processes serve the snapshot they were started with, even once training cleaned up its files"""
+    model, X = fit_forest()
+    model_path = str(tmp_path / "reg_model_test.pkl")
+    joblib.dump(model, model_path)
+    active = make_active(model, model_path)
+    os.remove(model_path)
+    executor = InferenceExecutor(kind="process", max_workers=1, max_queue=4)
+
+    result = await executor.predict(active, X[:5])
+    executor.shutdown()
+
+    np.testing.assert_allclose(result, model.predict(X[:5]))
+
+@pytest.mark.asyncio
+async def test_process_pools_are_kept_for_the_active_and_previous_models():
+    """Test each snapshot gets its own pool and only the two most recent pools are kept"""
+    snapshots = [make_active(fit_forest(seed=seed)[0], f"reg_model_{seed}.pkl") for seed in range(3)]
+    X = fit_forest()[1]
+    executor = InferenceExecutor(kind="process", max_workers=1, max_queue=4)
+
+    for active in snapshots + [snapshots[1]]:
+        result = await executor.predict(active, X[:5])
+        np.testing.assert_allclose(result, active.model.predict(X[:5]))
+    pools = list(executor._process_pools)
+    executor.shutdown()
+
+    assert pools == [snapshots[2], snapshots[1]]
+
+def test_loaded_model_pickles_without_its_lock():
+    """Test a snapshot can be sent to worker processes that are spawned instead of forked"""
+    model, X = fit_forest()
+    copy = pickle.loads(pickle.dumps(make_active(model)))
+
+    np.testing.assert_allclose(copy.predictor_for(5).predict(X[:5]), model.predict(X[:5]))
+    assert copy._batch_model_lock is not None
+
+def test_predict_endpoint_returns_503_when_overloaded():
+    """Test the API surfaces backpressure as 503 with Retry-After"""
+    client = TestClient(app)
+    payload = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "plantGrowthStage": "Vegetative Stage",
+        "timeSinceLastWateringInHours": 5.0,
+        "mlSensorReadings": [{"SensorName": "Temperature", "Unit": "°C", "Value": 25.0}]
+    }
+
+    with mock.patch('Application.api.ml_controller.analyze_prediction',
+                    side_effect=InferenceOverloadedError("queue full")):
+        response = client.post("/api/ml/predict", json=payload)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,80 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from unittest import mock
+import numpy as np
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+
+from Application.main import app
+from Application.services.metrics import Counter, Histogram, reset_metrics, PREDICT_STAGES
+
+client = TestClient(app)
+
+PAYLOAD = {
+    "timestamp": datetime.now(timezone.utc).isoformat(),
+    "plantGrowthStage": "Vegetative Stage",
+    "timeSinceLastWateringInHours": 5.0,
+    "mlSensorReadings": [
+        {"SensorName": "Temperature", "Unit": "°C", "Value": 25.0},
+        {"SensorName": "Soil Humidity", "Unit": "%", "Value": 40.0}
+    ]
+}
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    reset_metrics()
+    yield
+    reset_metrics()
+
+def test_histogram_renders_cumulative_buckets():
+    """Test bucket counts are cumulative and end with +Inf, sum and count"""
+    histogram = Histogram("test_seconds", "Test histogram", label_names=("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe("predict", value=value)
+
+    lines = histogram.render()
+
+    assert 'test_seconds_bucket{stage="predict",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="predict",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{stage="predict",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{stage="predict"} 3' in lines
+
+def test_counter_escapes_label_values():
+    counter = Counter("test_total", "Test counter", label_names=("reason",))
+    counter.inc('bad "value"')
+    counter.inc('bad "value"')
+
+    assert 'test_total{reason="bad \\"value\\""} 2.0' in counter.render()
+
+def test_metrics_endpoint_reports_stages_and_model_version():
+    """Test a model prediction is timed in every stage and counted by model version"""
+    with mock.patch('joblib.load') as mock_load:
+        mock_model = mock.MagicMock()
+        mock_model.predict.return_value = np.array([9.0])
+        mock_load.return_value = mock_model
+
+        assert client.post("/api/ml/predict", json=PAYLOAD).status_code == 200
+
+    response = client.get("/metrics")
+    body = response.text
+
+    assert response.headers["content-type"].startswith("text/plain")
+    for stage in PREDICT_STAGES:
+        assert f'greenhouse_predict_stage_seconds_count{{stage="{stage}"}} 1' in body
+    assert 'greenhouse_predict_request_seconds_count{endpoint="/api/ml/predict"} 1' in body
+    assert 'greenhouse_predictions_total{model_version="reg_model_' in body
+    assert "greenhouse_prediction_fallbacks_total{" not in body
+
+def test_metrics_endpoint_counts_fallback_reasons():
+    """Test fallback answers are counted per reason"""
+    with mock.patch('Application.services.model_registry.find_latest_model_file', return_value=None):
+        client.post("/api/ml/predict", json=PAYLOAD)
+        client.post("/api/ml/predict/batch", json=[PAYLOAD, PAYLOAD])
+
+    body = client.get("/metrics").text
+
+    assert 'greenhouse_prediction_fallbacks_total{reason="no_model_found"} 3.0' in body
+    assert 'greenhouse_predictions_total{model_version="fallback_no_model_found"} 3.0' in body
@@ -0,0 +1,108 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import time
+import pytest
+import asyncio
+from unittest import mock
+import numpy as np
+from datetime import datetime, timezone
+
+from Application.services.inference_executor import InferenceExecutor, InferenceOverloadedError
+from Application.services.micro_batcher import MicroBatcher
+from Application.services.model_registry import LoadedModel
+
+def make_active(model):
+    return LoadedModel(model=model, model_path="reg_model_test.pkl", version="reg_model_test.pkl",
+                       loaded_at=datetime.now(timezone.utc), load_seconds=0.0)
+
+@pytest.fixture
+def executor():
+    executor = InferenceExecutor(kind="thread", max_workers=2, max_queue=16)
+    yield executor
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_predict_call(executor):
+    """Test rows arriving within the window are predicted together and resolved individually"""
+    model = mock.MagicMock()
+    model.predict.side_effect = lambda X: np.asarray(X)[:, 0] * 2
+    active = make_active(model)
+    batcher = MicroBatcher(executor, enabled=True, window_ms=20, max_batch_size=64)
+
+    rows = [np.full(16, float(i)) for i in range(20)]
+    results = await asyncio.gather(*(batcher.predict(active, row) for row in rows))
+    batcher.stop()
+
+    assert results == [i * 2.0 for i in range(20)]
+    assert model.predict.call_count == 1
+    stats = batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["items"] == 20
+    assert stats["batch_size_buckets"]["32"] == 1
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_at_max_size(executor):
+    """Test a burst larger than max_batch_size is split into several batches"""
+    model = mock.MagicMock()
+    model.predict.side_effect = lambda X: np.ones(len(X))
+    batcher = MicroBatcher(executor, enabled=True, window_ms=5, max_batch_size=4)
+
+    await asyncio.gather(*(batcher.predict(make_active(model), np.zeros(16)) for _ in range(10)))
+    batcher.stop()
+
+    assert all(len(call.args[0]) <= 4 for call in model.predict.call_args_list)
+    assert batcher.stats()["items"] == 10
+
+@pytest.mark.asyncio
+async def test_prediction_errors_reach_every_caller(executor):
+    """Test a failed batch rejects each waiting caller with the error"""
+    model = mock.MagicMock()
+    model.predict.side_effect = RuntimeError("boom")
+    batcher = MicroBatcher(executor, enabled=True, window_ms=5, max_batch_size=8)
+
+    results = await asyncio.gather(
+        *(batcher.predict(make_active(model), np.zeros(16)) for _ in range(3)),
+        return_exceptions=True
+    )
+    batcher.stop()
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_rows(executor):
+    """Test rows beyond max_queue are rejected instead of queueing without bound"""
+    model = mock.MagicMock()
+    model.predict.side_effect = lambda X: np.ones(len(X))
+    batcher = MicroBatcher(executor, enabled=True, window_ms=5, max_batch_size=8, max_queue=2)
+
+    results = await asyncio.gather(
+        *(batcher.predict(make_active(model), np.zeros(16)) for _ in range(5)),
+        return_exceptions=True
+    )
+    batcher.stop()
+
+    assert results[:2] == [1.0, 1.0]
+    assert all(isinstance(r, InferenceOverloadedError) for r in results[2:])
+    assert batcher.stats()["rejected"] == 3
+
+@pytest.mark.asyncio
+async def test_flushes_are_limited_to_executor_workers(executor):
+    """Test no more batches are sent to the executor than it has workers; the rest wait in the batcher"""
+    in_flight = []
+
+    def predict(X):
+        in_flight.append(executor.stats()["in_flight"])
+        time.sleep(0.02)
+        return np.ones(len(X))
+
+    model = mock.MagicMock()
+    model.predict.side_effect = predict
+    batcher = MicroBatcher(executor, enabled=True, window_ms=0, max_batch_size=1)
+
+    results = await asyncio.gather(*(batcher.predict(make_active(model), np.zeros(16)) for _ in range(8)))
+    batcher.stop()
+
+    assert results == [1.0] * 8
+    assert max(in_flight) <= executor.max_workers
@@ -49,6 +49,21 @@ async def test_model_fallback(standard_payload):
             assert result is not None
             assert result.HoursUntilNextWatering > 0
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("value", [float("nan"), float("inf")])
+async def test_non_finite_prediction_falls_back(standard_payload, value):
+    """Test a NaN or infinite model output is replaced by the rule-based fallback"""
+    with mock.patch('joblib.load') as mock_load:
+        mock_model = mock.MagicMock()
+        # Finite for the registry's validation probe, non-finite for the request (soil humidity 40)
+        mock_model.predict.side_effect = lambda X: np.where(np.asarray(X)[:, 1] == 40.0, value, 1.0)
+        mock_load.return_value = mock_model
+
+        result = await analyze_prediction(standard_payload)
+
+    assert result.fallbackReason == "prediction_error_NonFiniteValue"
+    assert result.HoursUntilNextWatering == 36.0
+
 @pytest.mark.asyncio
 async def test_extreme_values():
     """Test with extreme input values"""
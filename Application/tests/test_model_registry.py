@@ -0,0 +1,142 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from unittest import mock
+import numpy as np
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+
+from Application.Dtos.predict import PredictionRequestDto, SensorReadingDto
+from Application.services.ml_model_services import analyze_prediction
+from Application.services.model_registry import MODEL_REFUSED_REASON, ModelRegistry, model_registry
+from Application.main import app
+
+@pytest.fixture
+def model_dir(tmp_path):
+    """Directory containing a single (fake) model file"""
+    (tmp_path / "reg_model_2025-01-01_00-00-00.pkl").write_bytes(b"placeholder")
+    return tmp_path
+
+def make_model(value):
+    """Mock model that passes validation and always predicts value"""
+    model = mock.MagicMock()
+    model.predict.side_effect = lambda X: np.full(len(X), value)
+    return model
+
+@pytest.fixture
+def payload():
+    return PredictionRequestDto(
+        timestamp=datetime.now(timezone.utc),
+        plantGrowthStage="Vegetative Stage",
+        timeSinceLastWateringInHours=5.0,
+        mlSensorReadings=[
+            SensorReadingDto(SensorName="Temperature", Unit="°C", Value=25.0),
+            SensorReadingDto(SensorName="Soil Humidity", Unit="%", Value=40.0)
+        ]
+    )
+
+def test_registry_loads_latest_model(model_dir):
+    """Test the registry exposes the loaded version and load time"""
+    registry = ModelRegistry(model_dir=str(model_dir))
+    with mock.patch('joblib.load', return_value=make_model(1.0)):
+        active = registry.load_latest()
+
+    assert active is not None
+    assert active.version == "reg_model_2025-01-01_00-00-00.pkl"
+    assert active.loaded_at <= datetime.now(timezone.utc)
+    assert registry.get() is active
+
+def test_registry_without_models(tmp_path):
+    """Test the registry reports a fallback reason when no model exists"""
+    registry = ModelRegistry(model_dir=str(tmp_path))
+    assert registry.load_latest() is None
+    assert registry.failure.reason == "no_model_found"
+
+@pytest.mark.asyncio
+async def test_model_loaded_once_for_many_predictions(payload):
+    """Test repeated predictions reuse the resident model instead of reloading it"""
+    with mock.patch('joblib.load') as mock_load:
+        mock_model = mock.MagicMock()
+        mock_model.predict.return_value = np.array([7.0])
+        mock_load.return_value = mock_model
+
+        for _ in range(5):
+            result = await analyze_prediction(payload)
+            assert result.HoursUntilNextWatering == 7.0
+
+        assert mock_load.call_count <= 1
+
+def test_model_info_endpoint():
+    """Test the model info endpoint reflects the registry state"""
+    with mock.patch('joblib.load', return_value=make_model(1.0)):
+        model_registry.load_latest()
+
+    client = TestClient(app)
+    response = client.get("/api/ml/model")
+
+    assert response.status_code == 200
+    data = response.json()
+    if data["Loaded"]:
+        assert data["ModelVersion"].startswith("reg_model_")
+        assert data["LoadedAt"] is not None
+    else:
+        assert data["FallbackReason"] == "no_model_found"
+
+def test_reload_swaps_in_new_model_and_rollback(model_dir):
+    """Test a new model file is swapped in and the previous one can be restored"""
+    registry = ModelRegistry(model_dir=str(model_dir))
+    with mock.patch('joblib.load', return_value=make_model(1.0)):
+        old = registry.load_latest()
+
+    new_path = model_dir / "reg_model_2025-02-01_00-00-00.pkl"
+    new_path.write_bytes(b"placeholder")
+    with mock.patch('Application.services.model_registry.find_latest_model_file', return_value=str(new_path)):
+        with mock.patch('joblib.load', return_value=make_model(2.0)):
+            assert registry.reload() is None
+
+    assert registry.get().version == "reg_model_2025-02-01_00-00-00.pkl"
+    assert registry.previous is old
+
+    assert registry.rollback() is old
+    assert registry.get() is old
+
+def test_failed_reload_keeps_active_model(model_dir):
+    """Test a model that fails to load or validate never replaces a working one"""
+    registry = ModelRegistry(model_dir=str(model_dir))
+    with mock.patch('joblib.load', return_value=make_model(1.0)):
+        old = registry.load_latest()
+
+    with mock.patch('joblib.load', return_value=make_model(float("nan"))):
+        failure = registry.reload(force=True)
+
+    assert failure.reason.startswith("model_validation_error")
+    assert registry.get() is old
+
+def test_refused_model_never_replaces_the_active_one(model_dir):
+    """Test a model the serving setup refuses is reported like a failed load"""
+    registry = ModelRegistry(model_dir=str(model_dir))
+    with mock.patch('joblib.load', return_value=make_model(1.0)):
+        old = registry.load_latest()
+        registry.requirement = lambda model: "not servable here"
+        failure = registry.reload(force=True)
+
+    assert failure.reason == MODEL_REFUSED_REASON
+    assert registry.get() is old
+
+def test_reload_skips_unchanged_file(model_dir):
+    """Test polling does not reload a file that was already seen"""
+    registry = ModelRegistry(model_dir=str(model_dir))
+    with mock.patch('joblib.load', return_value=make_model(1.0)) as mock_load:
+        registry.load_latest()
+        registry.reload()
+        registry.reload()
+
+    assert mock_load.call_count == 1
+
+def test_admin_rollback_without_previous_model():
+    """Test rollback is rejected when there is nothing to roll back to"""
+    client = TestClient(app)
+    response = client.post("/api/ml/admin/rollback")
+    assert response.status_code == 409
@@ -0,0 +1,114 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from unittest import mock
+import numpy as np
+from datetime import datetime, timezone
+
+from Application.Dtos.predict import PredictionRequestDto, SensorReadingDto
+from Application.services.ml_model_services import analyze_prediction
+from Application.services.prediction_cache import PredictionCache, ENTRY_BYTES, prediction_cache
+
+def features(temperature=25.0, soil_humidity=40.0, light=200.0):
+    return [temperature, soil_humidity, 50.0, light, 400.0, 0.0, 0.0, 5.0, 1.0]
+
+def make_payload(temperature):
+    return PredictionRequestDto(
+        timestamp=datetime.now(timezone.utc),
+        plantGrowthStage="Vegetative Stage",
+        timeSinceLastWateringInHours=5.0,
+        mlSensorReadings=[
+            SensorReadingDto(SensorName="Temperature", Unit="°C", Value=temperature),
+            SensorReadingDto(SensorName="Soil Humidity", Unit="%", Value=40.0)
+        ]
+    )
+
+def test_keys_are_quantized_to_sensor_resolution():
+    """Test readings within one sensor step share a key"""
+    cache = PredictionCache(enabled=True)
+
+    assert cache.make_key(features(25.01, light=203.0)) == cache.make_key(features(25.04, light=198.0))
+    assert cache.make_key(features(25.01)) != cache.make_key(features(25.2))
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), -float("inf")])
+def test_non_finite_rows_bypass_the_cache(value):
+    """Test a NaN or infinite input gives no key, and a missing key is never stored or looked up"""
+    cache = PredictionCache(enabled=True)
+
+    assert cache.make_key(features(value)) is None
+    assert cache.make_key(features() + [0.0] * 7 + [value, 0.0, 0.0]) is None
+    cache.put("v1", None, 12.0)
+    assert cache.get("v1", None) is None
+    assert cache.stats()["entries"] == 0 and cache.misses == 0
+
+def test_hits_misses_and_expiry():
+    """Test counters and TTL expiry"""
+    now = [0.0]
+    cache = PredictionCache(enabled=True, ttl_seconds=10, clock=lambda: now[0])
+    key = cache.make_key(features())
+
+    assert cache.get("v1", key) is None
+    cache.put("v1", key, 12.0)
+    assert cache.get("v1", key) == 12.0
+
+    now[0] = 11.0
+    assert cache.get("v1", key) is None
+    assert (cache.hits, cache.misses, cache.expirations) == (1, 2, 1)
+
+def test_memory_budget_evicts_least_recently_used():
+    """Test the byte budget caps the number of entries"""
+    cache = PredictionCache(enabled=True, max_bytes=3 * ENTRY_BYTES)
+    keys = [cache.make_key(features(20.0 + i)) for i in range(4)]
+    for i, key in enumerate(keys[:3]):
+        cache.put("v1", key, float(i))
+    cache.get("v1", keys[0])
+    cache.put("v1", keys[3], 3.0)
+
+    assert cache.get("v1", keys[1]) is None
+    assert cache.get("v1", keys[0]) == 0.0
+    assert cache.stats()["entries"] == 3
+    assert cache.evictions == 1
+
+def test_model_change_invalidates_entries():
+    """Test entries from a previous model version are never served"""
+    cache = PredictionCache(enabled=True)
+    key = cache.make_key(features())
+    cache.put("v1", key, 12.0)
+
+    assert cache.get("v2", key) is None
+    assert cache.invalidations == 1
+    assert cache.get("v1", key) is None
+
+@pytest.mark.asyncio
+async def test_analyze_prediction_uses_cache():
+    """Test repeated near-identical payloads hit the cache instead of the model"""
+    hits_before = prediction_cache.hits
+    with mock.patch('joblib.load') as mock_load:
+        mock_model = mock.MagicMock()
+        mock_model.predict.return_value = np.array([9.0])
+        mock_load.return_value = mock_model
+
+        first = await analyze_prediction(make_payload(25.01))
+        second = await analyze_prediction(make_payload(25.03))
+
+    assert first.HoursUntilNextWatering == second.HoursUntilNextWatering == 9.0
+    # One call validates the model on load, one serves the first request
+    assert mock_model.predict.call_count == 2
+    assert prediction_cache.hits == hits_before + 1
+
+@pytest.mark.asyncio
+async def test_infinite_reading_falls_back_without_the_cache():
+    """Test a reading that cannot be quantized is answered by the fallback, not the model or the cache"""
+    with mock.patch('joblib.load') as mock_load:
+        mock_model = mock.MagicMock()
+        mock_model.predict.return_value = np.array([9.0])
+        mock_load.return_value = mock_model
+
+        result = await analyze_prediction(make_payload(float("inf")))
+
+    assert result.fallbackReason == "prediction_error_NonFiniteValue"
+    # Only the registry's validation probe reached the model
+    assert mock_model.predict.call_count == 1
+    assert prediction_cache.stats()["entries"] == 0
@@ -0,0 +1,108 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import json
+import pytest
+from unittest import mock
+import numpy as np
+from fastapi.testclient import TestClient
+
+from Application.main import app
+from Application.services import prediction_stream
+from Application.services.inference_executor import InferenceOverloadedError
+from Application.services.prediction_stream import PredictionStream, StreamMessageError, ndjson_lines
+
+client = TestClient(app)
+
+SCHEMA = {"sensors": ["Temperature", "Soil Humidity", "Light"]}
+
+def reading(message_id, soil_humidity, **fields):
+    return {"id": message_id, "timestamp": "2025-05-20T10:00:00Z", "plantGrowthStage": "Vegetative",
+            "timeSinceLastWateringInHours": 5.0, "values": [25.0, soil_humidity, 350.0], **fields}
+
+def mock_model():
+    """Mock model predicting the soil humidity column, so results reveal their order"""
+    model = mock.MagicMock()
+    model.predict.side_effect = lambda X: np.asarray(X)[:, 1]
+    return model
+
+async def messages_of(items):
+    for item in items:
+        yield json.dumps(item)
+
+def test_websocket_streams_predictions_in_order():
+    """Test compact and full readings are answered in order, with errors in place"""
+    full = {key: value for key, value in reading("full", 0.0).items() if key != "values"}
+    full["mlSensorReadings"] = [{"SensorName": "Soil Humidity", "Unit": "%", "Value": 33.0}]
+
+    with mock.patch('joblib.load', return_value=mock_model()):
+        with client.websocket_connect("/api/ml/predict/stream") as websocket:
+            websocket.send_text(json.dumps(reading("early", 10.0)))
+            websocket.send_text(json.dumps(SCHEMA))
+            for i in range(5):
+                websocket.send_text(json.dumps(reading(i, 40.0 + i)))
+            websocket.send_text("{not json")
+            websocket.send_text(json.dumps(full))
+            websocket.send_text(json.dumps(reading("short", 1.0, values=[1.0])))
+            responses = [json.loads(websocket.receive_text()) for _ in range(9)]
+
+    assert [response.get("Id") for response in responses] == ["early", 0, 1, 2, 3, 4, None, "full", "short"]
+    assert "sensors" in responses[0]["Error"]
+    assert [response["HoursUntilNextWatering"] for response in responses[1:6]] == [40.0, 41.0, 42.0, 43.0, 44.0]
+    assert responses[6]["Error"].startswith("Invalid JSON")
+    assert responses[7]["HoursUntilNextWatering"] == 33.0
+    assert responses[8]["Error"] == "Expected 3 values, got 1"
+    assert "FallbackReason" not in responses[1]
+
+def test_ndjson_body_split_across_chunks():
+    body = "\n".join(json.dumps(message) for message in [SCHEMA] + [reading(i, 20.0 + i) for i in range(3)])
+
+    def chunks():
+        # Chunk boundaries fall in the middle of lines
+        for start in range(0, len(body), 50):
+            yield body[start:start + 50].encode()
+
+    with mock.patch('joblib.load', return_value=mock_model()):
+        response = client.post("/api/ml/predict/stream", content=chunks())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [(line["Id"], line["HoursUntilNextWatering"]) for line in lines] == [(0, 20.0), (1, 21.0), (2, 22.0)]
+
+@pytest.mark.asyncio
+async def test_queued_readings_are_predicted_together():
+    """Test readings waiting in the queue share one batch call, up to max_batch"""
+    calls = []
+
+    async def fake_batch(payloads):
+        calls.append(len(payloads))
+        return [mock.MagicMock(PredictionTime=p.timestamp, HoursUntilNextWatering=1.0, modelVersion="v",
+                               fallbackReason=None) for p in payloads]
+
+    stream = PredictionStream(max_batch=8)
+    with mock.patch.object(prediction_stream, "analyze_batch_prediction", fake_batch):
+        responses = [json.loads(response) async for response in
+                     stream.predictions(messages_of([SCHEMA] + [reading(i, 1.0) for i in range(20)]))]
+
+    assert [response["Id"] for response in responses] == list(range(20))
+    assert sum(calls) == 20 and max(calls) == 8 and len(calls) < 20
+
+@pytest.mark.asyncio
+async def test_overload_is_reported_per_reading():
+    stream = PredictionStream()
+    with mock.patch.object(prediction_stream, "analyze_batch_prediction",
+                           mock.AsyncMock(side_effect=InferenceOverloadedError("full"))):
+        responses = [json.loads(response) async for response in
+                     stream.predictions(messages_of([SCHEMA, reading("a", 1.0)]))]
+
+    assert responses == [{"Id": "a", "Error": "Prediction service is overloaded, please retry shortly"}]
+
+@pytest.mark.asyncio
+async def test_ndjson_line_limit():
+    async def chunks():
+        yield b'{"id": 1' + b" " * 100
+
+    with pytest.raises(StreamMessageError):
+        [line async for line in ndjson_lines(chunks(), max_bytes=64)]
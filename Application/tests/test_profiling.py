@@ -0,0 +1,55 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import time
+import joblib
+import pytest
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+from Application.training.utils.profiling import TrainingProfiler, inference_latency, model_size_bytes
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 1, (100, 16))
+    return X, X[:, 0] * 10
+
+def test_phases_accumulate():
+    profiler = TrainingProfiler()
+    for _ in range(2):
+        with profiler.phase("fit"):
+            time.sleep(0.01)
+
+    assert profiler.phases["fit"] >= 0.02
+
+def test_report_covers_time_memory_size_and_latency(tmp_path, data):
+    """Test the profile saved in training logs has every section, with both serving engines timed"""
+    X, y = data
+    profiler = TrainingProfiler()
+    with profiler.phase("fit"):
+        model = RandomForestRegressor(n_estimators=5, random_state=42).fit(X, y)
+    model_path = str(tmp_path / "reg_model_2025-01-01_00-00-00.pkl")
+    joblib.dump(model, model_path)
+
+    report = profiler.report(model, model_path, X[:10])
+
+    assert set(report) == {"phase_seconds", "total_seconds", "peak_rss_mb", "model_size_bytes", "inference_latency"}
+    assert report["total_seconds"] >= report["phase_seconds"]["fit"]
+    assert report["peak_rss_mb"]["process"] > 0
+    assert report["model_size_bytes"]["total"] == report["model_size_bytes"]["pickle"] == os.path.getsize(model_path)
+    assert set(report["inference_latency"]) == {"sklearn", "flat"}
+    assert set(report["inference_latency"]["flat"]) == {"rows_1_ms", "rows_1000_ms"}
+
+def test_non_forest_models_are_timed_with_sklearn_only(data):
+    X, y = data
+    latency = inference_latency(LinearRegression().fit(X, y), X[:3], batch_sizes=(1, 5))
+
+    assert list(latency) == ["sklearn"]
+    assert all(ms > 0 for ms in latency["sklearn"].values())
+
+def test_missing_artifacts_count_as_zero(tmp_path):
+    sizes = model_size_bytes(str(tmp_path / "reg_model_missing.pkl"))
+    assert sizes == {"pickle": 0, "forest_artifact": 0, "feature_spec": 0, "total": 0}
@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error
+
+from Application.services.flat_forest import FlatForest
+from Application.training.utils.pruning import truncate_forest, prune_forest
+
+@pytest.fixture(scope="module")
+def split():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 1, (600, 4))
+    y = 10 * X[:, 0] + 5 * (X[:, 1] > 0.5) + rng.normal(0, 0.5, 600)
+    return X[:400], y[:400], X[400:], y[400:]
+
+@pytest.fixture(scope="module")
+def model(split):
+    X_train, y_train, _, _ = split
+    return RandomForestRegressor(n_estimators=40, max_depth=30, random_state=42).fit(X_train, y_train)
+
+def test_truncate_forest_keeps_first_trees(model, split):
+    _, _, X_test, _ = split
+    truncated = truncate_forest(model, 10)
+
+    expected = np.mean([tree.predict(X_test.astype(np.float32)) for tree in model.estimators_[:10]], axis=0)
+    np.testing.assert_allclose(truncated.predict(X_test), expected)
+    assert truncated.n_estimators == 10
+    assert len(model.estimators_) == 40
+    np.testing.assert_allclose(FlatForest.from_sklearn(truncated).predict(X_test), truncated.predict(X_test))
+
+def test_prune_selects_smallest_forest_within_tolerance(model, split):
+    """Test the selected forest is the smallest candidate whose validation MAE fits the budget"""
+    X_train, y_train, X_test, y_test = split
+
+    pruned, report = prune_forest(model, X_train, y_train, X_test, y_test, tolerance=0.05,
+                                  tree_counts=(5, 10, 20), depths=(8, 4))
+
+    full, selected = report["full"], report["selected"]
+    budget = full["validation_mae"] * 1.05
+    assert (full["trees"], full["max_depth"]) == (40, 30)
+    assert selected["validation_mae"] <= budget
+    assert selected["n_nodes"] < full["n_nodes"]
+    chosen = next(c for c in report["candidates"]
+                  if (c["trees"], c["max_depth"]) == (selected["trees"], selected["max_depth"]))
+    assert chosen["n_nodes"] == min(c["n_nodes"] for c in report["candidates"] if c["validation_mae"] <= budget)
+    assert len(report["candidates"]) == 3 * 4
+    assert all(c["rows_1_ms"] > 0 for c in report["candidates"])
+
+    assert len(pruned.estimators_) == selected["trees"]
+    assert pruned.max_depth == selected["max_depth"]
+    assert mean_absolute_error(y_test, pruned.predict(X_test)) == pytest.approx(selected["test_mae"], abs=1e-4)
+    assert mean_absolute_error(y_test, model.predict(X_test)) == pytest.approx(full["test_mae"], abs=1e-4)
+
+def test_candidates_are_chosen_without_the_test_split(model, split):
+    """Test the choice does not depend on the test split, which is only used for reporting"""
+    X_train, y_train, X_test, y_test = split
+    kwargs = dict(tolerance=0.05, tree_counts=(5, 10, 20), depths=(8, 4))
+
+    _, report = prune_forest(model, X_train, y_train, X_test, y_test, **kwargs)
+    _, shuffled = prune_forest(model, X_train, y_train, X_test, np.random.default_rng(1).permutation(y_test), **kwargs)
+
+    assert [c["validation_mae"] for c in report["candidates"]] == [c["validation_mae"] for c in shuffled["candidates"]]
+    assert (report["selected"]["trees"], report["selected"]["max_depth"]) == \
+        (shuffled["selected"]["trees"], shuffled["selected"]["max_depth"])
+    assert report["selected"]["test_mae"] != shuffled["selected"]["test_mae"]
+
+def test_zero_tolerance_keeps_at_least_full_accuracy(model, split):
+    X_train, y_train, X_test, y_test = split
+
+    pruned, report = prune_forest(model, X_train, y_train, X_test, y_test, tolerance=0.0, depths=())
+
+    assert report["selected"]["validation_mae"] <= report["full"]["validation_mae"]
+    assert len(pruned.estimators_) <= 40
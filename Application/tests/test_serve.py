@@ -0,0 +1,146 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import time
+import signal
+import importlib
+import subprocess
+import pytest
+import httpx
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from unittest import mock
+from fastapi.testclient import TestClient
+
+from Application import serve
+from Application.main import app, load_model_at_startup
+from Application.benchmarks.run_benchmarks import child_pids, free_port, process_memory_mb
+from Application.services.serving_mode import RELOAD_SIGNAL, ROLLBACK_SIGNAL, serving_mode
+from Application.services.feature_pipeline import TEMPORAL_FEATURE_PIPELINE, feature_spec_path_for
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+def test_cgroup_quota_v2_and_v1(tmp_path):
+    write(str(tmp_path / "v2" / "cpu.max"), "250000 100000\n")
+    write(str(tmp_path / "unlimited" / "cpu.max"), "max 100000\n")
+    write(str(tmp_path / "v1" / "cpu" / "cpu.cfs_quota_us"), "150000\n")
+    write(str(tmp_path / "v1" / "cpu" / "cpu.cfs_period_us"), "100000\n")
+
+    assert serve.cgroup_cpu_quota(str(tmp_path / "v2")) == 2.5
+    assert serve.cgroup_cpu_quota(str(tmp_path / "unlimited")) is None
+    assert serve.cgroup_cpu_quota(str(tmp_path / "v1")) == 1.5
+    assert serve.cgroup_cpu_quota(str(tmp_path / "missing")) is None
+
+def test_auto_worker_count_follows_the_cpu_limit(monkeypatch):
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(8)), raising=False)
+    monkeypatch.setattr(serve, "cgroup_cpu_quota", lambda: 2.5)
+
+    assert serve.resolve_worker_count("auto") == 3
+    assert serve.resolve_worker_count("2") == 2
+    with pytest.raises(ValueError):
+        serve.resolve_worker_count("0")
+
+def test_one_worker_by_default(monkeypatch):
+    monkeypatch.delenv("SERVE_WORKERS", raising=False)
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    importlib.reload(serve)
+
+    assert serve.resolve_worker_count(serve.parse_args([]).workers) == 1
+
+def test_startup_keeps_a_model_loaded_before_forking():
+    with mock.patch("Application.main.model_registry") as registry:
+        registry.attempted = True
+        load_model_at_startup()
+    registry.load_latest.assert_not_called()
+
+def wait_for(condition, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = condition()
+        if result:
+            return result
+        time.sleep(0.1)
+    raise TimeoutError("Condition not met")
+
+def healthy(base_url):
+    try:
+        return httpx.get(f"{base_url}/health").status_code == 200
+    except httpx.TransportError:
+        return False
+
+@pytest.mark.integration
+def test_prefork_workers_are_replaced_and_stopped(tmp_path):
+    """Test the launcher serves from its workers, replaces a killed one and exits cleanly on SIGTERM"""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, MODEL_DIR=str(tmp_path), PYTHONPATH=ROOT, LOG_LEVEL="WARNING")
+    process = subprocess.Popen([sys.executable, "-m", "Application.serve", "--host", "127.0.0.1",
+                                "--port", str(port), "--workers", "2"], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL)
+    try:
+        wait_for(lambda: healthy(base_url))
+        workers = wait_for(lambda: len(child_pids(process.pid)) == 2 and child_pids(process.pid))
+        stats = httpx.get(f"{base_url}/api/ml/admin/stats").json()["worker"]
+        assert stats["parent_pid"] == process.pid and stats["pid"] in workers
+
+        os.kill(workers[0], signal.SIGKILL)
+        replaced = wait_for(lambda: len(child_pids(process.pid)) == 2 and workers[0] not in child_pids(process.pid)
+                            and child_pids(process.pid))
+        assert workers[1] in replaced
+        assert httpx.get(f"{base_url}/health").status_code == 200
+
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=30) == 0
+    finally:
+        if process.poll() is None:
+            process.kill()
+
+@pytest.fixture
+def several_workers():
+    """This process acting as one of several workers of a launcher"""
+    with mock.patch.object(serving_mode, "launcher_pid", 4242), mock.patch.object(serving_mode, "workers", 2):
+        with mock.patch("Application.services.serving_mode.os.kill") as kill:
+            yield kill
+
+def test_workers_forward_model_changes_to_the_launcher(several_workers):
+    client = TestClient(app)
+
+    assert client.post("/api/ml/admin/reload").status_code == 202
+    several_workers.assert_called_once_with(4242, RELOAD_SIGNAL)
+    assert client.post("/api/ml/admin/rollback").status_code == 202
+    several_workers.assert_called_with(4242, ROLLBACK_SIGNAL)
+
+def test_training_needs_a_single_worker(several_workers):
+    client = TestClient(app)
+
+    for response in (client.post("/api/ml/train", json={}), client.get("/api/ml/train"),
+                     client.get("/api/ml/train/some-job")):
+        assert response.status_code == 409
+        assert "SERVE_WORKERS=1" in response.json()["detail"]
+
+@pytest.mark.integration
+def test_several_workers_refuse_a_temporal_model(tmp_path):
+    X = np.random.default_rng(0).uniform(0, 50, (60, TEMPORAL_FEATURE_PIPELINE.n_features))
+    path = str(tmp_path / "reg_model_2025-06-01_00-00-00.pkl")
+    joblib.dump(RandomForestRegressor(n_estimators=3, random_state=0).fit(X, X[:, -1]), path)
+    TEMPORAL_FEATURE_PIPELINE.save_spec(feature_spec_path_for(path))
+    env = dict(os.environ, MODEL_DIR=str(tmp_path), PYTHONPATH=ROOT, LOG_LEVEL="WARNING")
+    process = subprocess.run([sys.executable, "-m", "Application.serve", "--host", "127.0.0.1",
+                              "--port", str(free_port()), "--workers", "2"], cwd=ROOT, env=env,
+                             stdout=subprocess.DEVNULL, timeout=60)
+
+    assert process.returncode == serve.MODEL_REFUSED_EXIT
+
+def test_process_memory_reports_shared_and_private_pages():
+    memory = process_memory_mb(os.getpid())
+
+    assert memory["rss"] > 0
+    if os.path.exists(f"/proc/{os.getpid()}/smaps_rollup"):
+        assert 0 < memory["uss"] <= memory["pss"] <= memory["rss"] + 1
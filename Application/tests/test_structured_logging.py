@@ -0,0 +1,102 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import io
+import json
+import time
+import queue
+import logging
+import pytest
+from fastapi.testclient import TestClient
+
+from Application.main import app
+from Application.services import structured_logging
+from Application.services.structured_logging import (
+    JsonFormatter, NonBlockingQueueHandler, SuccessSampler, configure_logging, shutdown_logging
+)
+
+class CountingArg:
+    """Log argument that records when it is rendered"""
+    def __init__(self):
+        self.rendered = 0
+
+    def __str__(self):
+        self.rendered += 1
+        return "arg"
+
+def make_record(msg="Prediction %s", args=("ok",), exc_info=None, **extra):
+    record = logging.LogRecord("Application.test", logging.INFO, __file__, 1, msg, args, exc_info)
+    record.__dict__.update(extra)
+    return record
+
+def test_json_formatter_includes_extra_fields_and_exception():
+    """Test each record is one JSON object carrying extra= fields and the traceback"""
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record(exc_info=sys.exc_info(), event="prediction", hours=12.5)
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "Prediction ok"
+    assert entry["level"] == "INFO"
+    assert (entry["event"], entry["hours"]) == ("prediction", 12.5)
+    assert "ValueError: boom" in entry["exception"]
+
+def test_queue_handler_defers_formatting_and_drops_when_full():
+    """Test the calling thread neither renders arguments nor blocks on a full queue"""
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    arg = CountingArg()
+
+    handler.handle(make_record(args=(arg,)))
+    handler.handle(make_record(args=(arg,)))
+
+    assert arg.rendered == 0
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+def test_success_sampler_rates():
+    always, never = SuccessSampler(1.0), SuccessSampler(0.0)
+
+    assert all(always() for _ in range(10))
+    assert not any(never() for _ in range(10))
+    assert (always.logged, never.skipped) == (10, 10)
+
+def test_configured_logging_writes_json_lines():
+    """Test records reach the output stream through the background writer"""
+    shutdown_logging()
+    stream = io.StringIO()
+    configure_logging(level="INFO", log_format="json", stream=stream)
+    try:
+        logging.getLogger("Application.test").info("Loaded model %s", "reg_model_x.pkl", extra={"event": "model_loaded"})
+        logging.getLogger("Application.test").debug("not written")
+    finally:
+        shutdown_logging()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["message"] == "Loaded model reg_model_x.pkl"
+
+def test_logging_is_configured_by_the_app_lifespan():
+    """Test importing the app leaves logging alone; starting it configures the writer"""
+    shutdown_logging()
+    with TestClient(app):
+        assert structured_logging._listener is not None
+    assert structured_logging._listener is None
+
+@pytest.mark.performance
+def test_sampled_out_success_log_overhead():
+    """Test a success log that is sampled out costs only a few microseconds"""
+    logger = logging.getLogger("Application.test")
+    sampler = SuccessSampler(0.0)
+    iterations = 100000
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if sampler() and logger.isEnabledFor(logging.INFO):
+            logger.info("Successful prediction: %.2f hours using model %s", 1.0, "v1")
+    per_call = (time.perf_counter() - start) / iterations
+
+    print(f"Sampled-out success log: {per_call * 1e6:.3f} µs per prediction")
+    assert per_call < 5e-6
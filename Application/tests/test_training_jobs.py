@@ -0,0 +1,145 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import time
+import threading
+import joblib
+import pytest
+import numpy as np
+from unittest import mock
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestRegressor
+
+from Application import main
+from Application.main import app
+from Application.api import ml_controller
+from Application.services import training_jobs as training_jobs_module
+from Application.services.model_registry import ModelRegistry
+from Application.services.training_jobs import TrainingJobManager, TrainingQueueFullError
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(model_dir=str(tmp_path))
+
+def fake_training(model_dir):
+    """Job function saving a small 16-feature forest the way train_randomForest.py would"""
+    def run(job_id, argv):
+        rng = np.random.default_rng(0)
+        X = rng.uniform(0, 1, (50, 16))
+        model = RandomForestRegressor(n_estimators=3, random_state=42).fit(X, X[:, 0])
+        path = os.path.join(model_dir, "reg_model_2025-06-01_00-00-00.pkl")
+        joblib.dump(model, path)
+        return {"regressor_path": path, "regression_mae": 1.5, "regression_r2": 0.9}
+    return run
+
+def make_manager(registry, job_function, **kwargs):
+    return TrainingJobManager(registry=registry, kind="thread", job_function=job_function, **kwargs)
+
+def test_finished_job_registers_new_model(tmp_path, registry):
+    """Test a successful job's model is swapped in without a restart"""
+    manager = make_manager(registry, fake_training(str(tmp_path)))
+    job = manager.submit()
+    wait_for(lambda: job.status == "succeeded")
+
+    assert job.registered
+    assert job.model_version == "reg_model_2025-06-01_00-00-00.pkl"
+    assert job.metrics == {"mae": 1.5, "r2": 0.9}
+    assert registry.get().version == job.model_version
+    manager.shutdown()
+
+def test_failed_job_keeps_serving_model(registry):
+    def broken(job_id, argv):
+        raise RuntimeError("dataset missing")
+
+    manager = make_manager(registry, broken)
+    job = manager.submit()
+    wait_for(lambda: job.status == "failed")
+
+    assert job.error == "RuntimeError: dataset missing"
+    assert not job.registered
+    assert registry.get() is None
+    manager.shutdown()
+
+def test_progress_and_pending_limit(registry):
+    """Test phases reported by the worker update progress, and excess jobs are refused"""
+    release = threading.Event()
+    seen_argv = []
+
+    def slow(job_id, argv):
+        seen_argv.append(argv)
+        training_jobs_module._progress_queue.put((job_id, "running"))
+        training_jobs_module._progress_queue.put((job_id, "fit"))
+        release.wait(5)
+        return None
+
+    manager = make_manager(registry, slow, max_pending=1)
+    job = manager.submit(incremental=True, prune_tolerance=0.05)
+    wait_for(lambda: job.phase == "fit")
+
+    assert job.status == "running" and job.progress == 0.33
+    assert seen_argv == [["--incremental", "--prune-tolerance", "0.05"]]
+    with pytest.raises(TrainingQueueFullError):
+        manager.submit()
+
+    release.set()
+    wait_for(lambda: job.status == "succeeded")
+    # An incremental run without new rows saves nothing
+    assert job.model_version is None and not job.registered
+    assert manager.stats()["jobs"]["succeeded"] == 1
+    manager.shutdown()
+
+def test_training_endpoints(tmp_path, registry):
+    manager = make_manager(registry, fake_training(str(tmp_path)))
+    with mock.patch.object(ml_controller, "training_jobs", manager):
+        client = TestClient(app)
+        response = client.post("/api/ml/train", json={"Incremental": False})
+        assert response.status_code == 202
+        job_id = response.json()["JobId"]
+
+        wait_for(lambda: client.get(f"/api/ml/train/{job_id}").json()["Status"] == "succeeded")
+        status = client.get(f"/api/ml/train/{job_id}").json()
+        assert status["Registered"] is True
+        assert status["ModelVersion"] == "reg_model_2025-06-01_00-00-00.pkl"
+        assert [job["JobId"] for job in client.get("/api/ml/train").json()] == [job_id]
+        assert client.get("/api/ml/train/unknown").status_code == 404
+        assert client.post("/api/ml/train", json={"PruneTolerance": -1}).status_code == 422
+    manager.shutdown()
+
+def test_first_model_is_trained_at_startup(tmp_path, registry):
+    """Test startup queues a training job only when there is no model to serve"""
+    manager = make_manager(registry, fake_training(str(tmp_path)))
+    with mock.patch.object(main, "model_registry", registry), mock.patch.object(main, "training_jobs", manager):
+        registry.load_latest()
+        main.train_missing_model()
+        wait_for(lambda: registry.get() is not None)
+
+        main.train_missing_model()
+    assert len(manager.jobs()) == 1
+    manager.shutdown()
+
+def test_incremental_job_without_previous_run_fails(registry):
+    """Test an incremental run with no training log fails the job and frees its pending slot"""
+    from Application.training.training_models import train_randomForest
+
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 1, (20, 16))
+    manager = TrainingJobManager(registry=registry, kind="thread", max_pending=1)
+    with mock.patch.object(train_randomForest, "load_processed_dataset", return_value=(X, X[:, 0], None, None)), \
+            mock.patch.object(train_randomForest, "load_latest_training_log", return_value=None):
+        job = manager.submit(incremental=True)
+        wait_for(lambda: job.status == "failed")
+        assert job.error.startswith("RuntimeError: No training log")
+
+        # SystemExit (e.g. from argparse) also fails the job instead of leaving it queued
+        with mock.patch.object(train_randomForest, "main", side_effect=SystemExit(2)):
+            job = manager.submit()
+            wait_for(lambda: job.status == "failed")
+    assert job.error == "SystemExit: 2"
+    manager.shutdown()
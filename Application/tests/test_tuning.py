@@ -0,0 +1,65 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+import numpy as np
+
+from Application.training.utils.tuning import TrialStore, halving_schedule, successive_halving_search
+
+PARAM_GRID = {
+    'n_estimators': [5, 10],
+    'max_depth': [2, 4, None],
+    'min_samples_leaf': [1, 4],
+}
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 1, (300, 4))
+    return X, 10 * X[:, 0] + rng.normal(0, 0.1, 300)
+
+def search(data, store, **kwargs):
+    X, y = data
+    options = dict(n_candidates=9, cv=3, eta=3, min_rows=60, n_jobs=1)
+    options.update(kwargs)
+    return successive_halving_search(X, y, PARAM_GRID, store=store, **options)
+
+def test_halving_schedule():
+    """Test rungs grow the data and folds up to the full set and drop duplicate rungs"""
+    assert halving_schedule(27, 2700, cv=5, eta=3, min_rows=50) == [(100, 2), (300, 2), (900, 2), (2700, 5)]
+    assert halving_schedule(27, 800, cv=5, eta=3, min_rows=200) == [(200, 2), (266, 2), (800, 5)]
+    assert halving_schedule(1, 500) == [(500, 5)]
+
+def test_search_cuts_candidates_and_finds_deep_trees(tmp_path, data):
+    result = search(data, TrialStore(str(tmp_path / "trials.jsonl")))
+
+    assert [rung["candidates"] for rung in result["rungs"]] == [9, 3, 1]
+    assert result["rungs"][-1]["rows"] == 300 and result["rungs"][-1]["folds"] == 3
+    assert result["fits"] == 9 * 2 + 3 * 2 + 1 * 3
+    assert result["best_params"]["max_depth"] != 2
+
+def test_search_resumes_from_store(tmp_path, data):
+    """Test a rerun reuses every stored fold score, including after a crash mid-write"""
+    path = str(tmp_path / "trials.jsonl")
+    first = search(data, TrialStore(path))
+
+    # Simulate an interrupted run: the last two records are lost, one of them half-written
+    with open(path) as f:
+        lines = f.readlines()
+    with open(path, 'w') as f:
+        f.writelines(lines[:-2])
+        f.write(lines[-2][:20])
+
+    resumed = search(data, TrialStore(path))
+    assert resumed["fits"] == 2
+    assert resumed["reused_fits"] == first["fits"] - 2
+    assert resumed["best_params"] == first["best_params"]
+    assert search(data, TrialStore(path))["fits"] == 0
+
+def test_changed_data_is_not_reused(tmp_path, data):
+    path = str(tmp_path / "trials.jsonl")
+    search(data, TrialStore(path))
+    X, y = data
+
+    assert search((X, y + 1.0), TrialStore(path))["reused_fits"] == 0
@@ -3,33 +3,24 @@ import numpy as np
 import matplotlib.pyplot as plt
 from sklearn.metrics import mean_absolute_error, r2_score, mean_squared_error
 
-# === Load latest model and encoder ===
+# === Load latest model ===
 try:
     # Get latest model files
     model_files = sorted(glob.glob(os.path.join(MODEL_DIR, "reg_model_*.pkl")), 
                         key=os.path.getmtime, reverse=True)
-    encoder_files = sorted(glob.glob(os.path.join(MODEL_DIR, "reg_encoder_*.pkl")), 
-                          key=os.path.getmtime, reverse=True)
     
-    if not model_files or not encoder_files:
-        raise FileNotFoundError("Model or encoder files not found")
+    if not model_files:
+        raise FileNotFoundError("Model files not found")
         
-    # Load the model and encoder
-    print(f"Loaded encoder: {os.path.basename(encoder_files[0])}")
+    # Load the model
     print(f"Loaded regressor: {os.path.basename(model_files[0])}")
     
     model = joblib.load(model_files[0])
-    encoder = joblib.load(encoder_files[0])
     
-    # === Load data for evaluation ===
-    X, y, df, base_features = load_processed_dataset(encoder)
-    print(f"Dataset loaded with {len(X)} samples and {len(base_features)} base features")
-    
-    # === Add engineered features (fix SettingWithCopyWarning) ===
-    X = X.copy()  # Create explicit copy to avoid warnings
-    X.loc[:, "soil_dryness_index"] = 100 - X["Soil Humidity"]
-    X.loc[:, "temp_soil_product"] = X["Temperature"] * X["Soil Humidity"]
-    X.loc[:, "light_humidity_ratio"] = X["Light"] / (X["Air Humidity"] + 1)
+    # === Load data for evaluation with the shared feature pipeline ===
+    _, y, df, _ = load_processed_dataset()
+    X = pd.DataFrame(FEATURE_PIPELINE.transform_frame(df), columns=FEATURE_PIPELINE.feature_names, index=df.index)
+    print(f"Dataset loaded with {len(X)} samples and {X.shape[1]} features")
     
     # === Train/test split (same as training) ===
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
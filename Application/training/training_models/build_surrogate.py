@@ -0,0 +1,90 @@
+# === Imports ===
+import argparse
+from Application.training.utils.imports import *
+from Application.services.model_registry import find_latest_model_file, load_model_file
+from Application.services.feature_pipeline import FEATURE_PIPELINE, RAW_INPUT_NAMES, GROWTH_STAGE_MAP, load_feature_spec
+from Application.services.grid_surrogate import GridSurrogate, DEFAULT_GRID_AXES, surrogate_path_for
+
+# Grid points per axis unless overridden on the command line
+DEFAULT_POINTS = {
+    "Soil Humidity": 32,
+    "Temperature": 32,
+    "timeSinceLastWateringInHours": 48,
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Build a lookup-grid surrogate of the latest reg_model_*.pkl and report its error"
+    )
+    parser.add_argument("--points", nargs="*", default=[], metavar="AXIS=N",
+                        help='Grid points per axis, e.g. "Soil Humidity=40" Temperature=24')
+    parser.add_argument("--model", default=None, help="Model file to approximate (default: latest reg_model_*.pkl)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    points = dict(DEFAULT_POINTS)
+    for item in args.points:
+        name, count = item.rsplit("=", 1)
+        points[name] = int(count)
+
+    # === Load model ===
+    model_path = args.model or find_latest_model_file(MODEL_DIR)
+    if model_path is None:
+        raise FileNotFoundError(f"No reg_model_*.pkl found in {MODEL_DIR}")
+    # The grid only spans single-reading inputs, and the service never serves a surrogate for temporal models
+    spec = load_feature_spec(model_path)
+    if spec and spec.get("temporal"):
+        raise ValueError(f"{os.path.basename(model_path)} uses per-bed rolling features; "
+                         "grid surrogates are only built for models without them")
+    FEATURE_PIPELINE.check_spec(spec)
+    model, _ = load_model_file(model_path)
+    print(f"Loaded model: {model_path}")
+
+    # === Features of the training data, as in train_randomForest.py ===
+    _, _, df, _ = load_processed_dataset()
+    features = FEATURE_PIPELINE.transform_frame(df)
+    raw = {name: features[:, i] for i, name in enumerate(RAW_INPUT_NAMES)}
+
+    # === Grid over the observed range of each dominant input ===
+    axis_points = {}
+    for name in DEFAULT_GRID_AXES:
+        if name == "growth_stage":
+            axis_points[name] = np.array(sorted(set(GROWTH_STAGE_MAP.values())), dtype=float)
+        else:
+            axis_points[name] = np.linspace(raw[name].min(), raw[name].max(), points[name])
+    reference = {name: float(np.median(values)) for name, values in raw.items()}
+
+    start = datetime.now()
+    surrogate = GridSurrogate.build(model, axis_points, reference, metadata={"model_file": os.path.basename(model_path)})
+    build_seconds = (datetime.now() - start).total_seconds()
+
+    # === Accuracy against the real model on the dataset ===
+    report = surrogate.error_report(model, features)
+    surrogate.metadata.update(report)
+    print(f"Grid: {' x '.join(str(len(p)) for p in surrogate.axis_points)} = {surrogate.values.size} points "
+          f"built in {build_seconds:.1f}s")
+    print(f"Surrogate error vs model: max = {report['max_abs_error']:.3f} h | "
+          f"mean = {report['mean_abs_error']:.3f} h | p95 = {report['p95_abs_error']:.3f} h")
+
+    # === Save surrogate and report ===
+    surrogate_path = surrogate.save(surrogate_path_for(model_path))
+    print(f"Surrogate saved to: {surrogate_path}")
+    save_log({
+        "timestamp": get_timestamp(),
+        "model_path": model_path,
+        "surrogate_path": surrogate_path,
+        "axes": {name: [float(p[0]), float(p[-1]), len(p)] for name, p in zip(surrogate.axis_names, surrogate.axis_points)},
+        "reference": reference,
+        "build_seconds": round(build_seconds, 3),
+        **report
+    }, prefix="surrogate_")
+
+    cleanup_old_files(MODEL_DIR, "reg_surrogate_*.npz", keep_last=1)
+    cleanup_old_files(LOG_DIR, "surrogate_log_*.json", keep_last=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# === Imports ===
+import os
+import sys
+import time
+import argparse
+import warnings
+from collections import deque
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Application.training.utils.file_manager import MODEL_DIR
+from Application.training.utils.data_loader import parse_timestamps
+from Application.services.bed_state import FeatureReplay
+from Application.services.model_registry import find_latest_model_file, load_model_file
+from Application.services.feature_pipeline import FEATURE_PIPELINE, FeaturePipeline, load_feature_spec, pipeline_for_spec
+
+# Columns of cleaned_data_greenhouse.csv needed to build the 16 model features
+REQUIRED_COLUMNS = ["Temperature", "Soil Humidity", "Air Humidity", "Light",
+                    "plantGrowthStage", "timeSinceLastWateringInHours"]
+# Also needed by models with per-bed rolling features (bedId is optional: one bed without it)
+TEMPORAL_REQUIRED_COLUMNS = REQUIRED_COLUMNS + ["timestamp"]
+PREDICTION_COLUMN = "predictedHoursUntilNextWatering"
+
+# Model and feature pipeline loaded once per worker process by _init_worker
+_worker_model = None
+_worker_pipeline = FEATURE_PIPELINE
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Score a sensor archive CSV (cleaned_data_greenhouse.csv schema) in streaming chunks"
+    )
+    parser.add_argument("input", help="CSV file to score")
+    parser.add_argument("output", help="CSV file to write: the input columns plus " + PREDICTION_COLUMN)
+    parser.add_argument("--model", default=None, help="Model file (default: latest reg_model_*.pkl in MODEL_DIR)")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows per chunk")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (1 scores in this process)")
+    return parser.parse_args(argv)
+
+
+def chunk_features(chunk: pd.DataFrame, feature_pipeline: FeaturePipeline = FEATURE_PIPELINE) -> np.ndarray:
+    """The features of train_randomForest.py for one chunk of archive rows."""
+    return feature_pipeline.transform_frame(chunk)
+
+
+def _init_worker(model_path: str):
+    global _worker_model, _worker_pipeline
+    # Models trained on DataFrames warn on every chunk of the plain feature matrix
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    _worker_model, _ = load_model_file(model_path)
+    _worker_pipeline = pipeline_for_spec(load_feature_spec(model_path))
+
+
+def _score_chunk(chunk: pd.DataFrame, header: bool, features: Optional[np.ndarray] = None) -> str:
+    """
+    Predict one chunk and render it as CSV text, so formatting is spread across workers too.
+
+    features are passed in for temporal models, whose rolling features depend on earlier chunks.
+    """
+    chunk = chunk.loc[:, ~chunk.columns.str.contains("^Unnamed")].copy()
+    if features is None:
+        features = chunk_features(chunk, _worker_pipeline)
+    chunk[PREDICTION_COLUMN] = np.round(_worker_model.predict(features), 4)
+    return chunk.to_csv(header=header, index=False)
+
+
+def score_file(input_path: str, output_path: str, model_path: str, chunk_size: int = 50000, workers: int = 1) -> int:
+    """
+    Stream input_path through the model, appending each scored chunk to output_path in order.
+
+    At most 2 x workers chunks are held in memory at once, so memory use does not grow
+    with the size of the archive.
+
+    For models with per-bed rolling features, the rows are replayed per bed in this
+    process, chunk after chunk, so each row sees the history of the rows before it;
+    only prediction and formatting are spread across workers.
+
+    Returns:
+        int: Number of rows scored
+
+    Raises:
+        ValueError: If required columns are missing, the model was trained with another
+        feature pipeline, or a temporal model is scored on rows that are not in timestamp
+        order per bed
+    """
+    spec = load_feature_spec(model_path)
+    feature_pipeline = pipeline_for_spec(spec)
+    feature_pipeline.check_spec(spec)
+    required = TEMPORAL_REQUIRED_COLUMNS if feature_pipeline.temporal else REQUIRED_COLUMNS
+    replay = FeatureReplay(**feature_pipeline.temporal) if feature_pipeline.temporal else None
+
+    def chunks():
+        for index, chunk in enumerate(pd.read_csv(input_path, chunksize=chunk_size)):
+            chunk.columns = chunk.columns.str.strip()
+            missing = [column for column in required if column not in chunk.columns]
+            if missing:
+                raise ValueError(f"{input_path} is missing columns: {', '.join(missing)}")
+            features = None
+            if replay is not None:
+                features = feature_pipeline.transform_frame(
+                    chunk.assign(timestamp=parse_timestamps(chunk["timestamp"])), replay)
+            yield chunk, index == 0, features
+
+    rows = 0
+    with open(output_path, "w", newline="") as output:
+        if workers <= 1:
+            _init_worker(model_path)
+            for chunk, header, features in chunks():
+                output.write(_score_chunk(chunk, header, features))
+                rows += len(chunk)
+            return rows
+
+        # Keep the pool busy while bounding the chunks in flight; results are written in input order
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+            for chunk, header, features in chunks():
+                pending.append((len(chunk), pool.submit(_score_chunk, chunk, header, features)))
+                if len(pending) >= 2 * workers:
+                    count, future = pending.popleft()
+                    output.write(future.result())
+                    rows += count
+            while pending:
+                count, future = pending.popleft()
+                output.write(future.result())
+                rows += count
+    return rows
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # === Resolve model ===
+    model_path = args.model or find_latest_model_file(MODEL_DIR)
+    if model_path is None:
+        raise FileNotFoundError(f"No reg_model_*.pkl found in {MODEL_DIR}")
+    print(f"Scoring {args.input} with {os.path.basename(model_path)} "
+          f"({args.workers} worker(s), {args.chunk_size} rows per chunk)")
+
+    # === Score ===
+    start = time.perf_counter()
+    rows = score_file(args.input, args.output, model_path, args.chunk_size, args.workers)
+    seconds = time.perf_counter() - start
+    print(f"Scored {rows} rows in {seconds:.1f}s ({rows / max(seconds, 1e-9):.0f} rows/s)")
+    print(f"Predictions saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
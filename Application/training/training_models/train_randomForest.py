@@ -1,87 +1,178 @@
 # === Imports ===
 from Application.training.utils.imports import *
+from Application.training.utils.incremental import (
+    load_latest_training_log, data_watermark, rows_since, extend_forest
+)
+from Application.training.utils.profiling import TrainingProfiler
+from Application.training.utils.pruning import prune_forest, PRUNE_MAE_TOLERANCE
+from Application.services.feature_pipeline import TEMPORAL_FEATURE_PIPELINE, load_feature_spec, pipeline_for_spec
+import argparse
 import numpy as np
 
 # === Constants are already in imports.py through file_manager ===
 os.makedirs(MODEL_DIR, exist_ok=True)
 os.makedirs(LOG_DIR, exist_ok=True)
 
-# === Load processed dataset ===
-X, y, df, _ = load_processed_dataset()  # Don't use encoder here
-
-# === Use only the 16 features expected by the prediction service ===
-X = X.copy()
-X["co2"] = 400.0         # Fill with constant default (if not in dataset)
-X["pir"] = 0.0
-X["proximity"] = 0.0
-
-# Manually map plantGrowthStage to numbers
-stage_map = {
-    "Seedling": 0, "Seedling Stage": 0,
-    "Vegetative": 1, "Vegetative Stage": 1,
-    "Flowering": 2, "Flowering Stage": 2
-}
-X["growth_stage"] = df["plantGrowthStage"].map(stage_map).fillna(1)
-
-# Engineered features
-X["temp_soil"] = X["Temperature"] * X["Soil Humidity"] / 100.0
-X["temp_air"] = X["Temperature"] * X["Air Humidity"] / 100.0
-X["light_temp"] = X["Light"] * X["Temperature"] / 1000.0
-X["soil_air"] = X["Soil Humidity"] * X["Air Humidity"] / 100.0
-X["time_soil"] = X["timeSinceLastWateringInHours"] * X["Soil Humidity"] / 100.0
-X["temp_squared"] = X["Temperature"] ** 2 / 100.0
-X["soil_squared"] = X["Soil Humidity"] ** 2 / 100.0
-
-# === Final 16 feature columns ===
-features = [
-    "Temperature", "Soil Humidity", "Air Humidity", "Light", "co2", "pir", "proximity",
-    "timeSinceLastWateringInHours", "growth_stage",
-    "temp_soil", "temp_air", "light_temp", "soil_air", "time_soil",
-    "temp_squared", "soil_squared"
-]
-
-X = X[features]
-
-# === Split and train ===
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-model = RandomForestRegressor(
-    n_estimators=150,
-    max_depth=30,
-    min_samples_split=2,
-    min_samples_leaf=1,
-    random_state=42
-)
-model.fit(X_train, y_train)
-
-# === Evaluate ===
-y_pred = model.predict(X_test)
-mae = mean_absolute_error(y_test, y_pred)
-r2 = r2_score(y_test, y_pred)
-print(f"MAE = {mae:.3f} | R² = {r2:.3f}")
-
-# === Feature importance analysis ===
-feature_importance = model.feature_importances_
-sorted_idx = np.argsort(feature_importance)
-print("\n=== Feature Importance ===")
-for i in sorted_idx[-5:]:  # Print top 5 features
-    print(f"{features[i]}: {feature_importance[i]:.4f}")
-
-# === Save model ===
-timestamp = get_timestamp()
-model_path, _ = save_model(model, None, timestamp, prefix="reg_")
-
-# === Save log ===
-log_data = {
-    "timestamp": timestamp,
-    "regressor_path": model_path,
-    "regression_mae": round(mae, 3),
-    "regression_r2": round(r2, 3),
-    "features_used": features,
-    "top_features": [features[i] for i in sorted_idx[-5:]]  # Store top 5 features
-}
-save_log(log_data, timestamp, prefix="regression_only_")
-
-# === Cleanup old models/logs ===
-cleanup_old_files(MODEL_DIR, "reg_model_*.pkl", keep_last=1)
-cleanup_old_files(LOG_DIR, "regression_only_log_*.json", keep_last=1)
\ No newline at end of file
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the watering regressor")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Add trees fitted only on rows newer than the last training log's watermark")
+    parser.add_argument("--new-trees", type=int, default=25, help="Trees to add in incremental mode")
+    parser.add_argument("--max-trees", type=int, default=150,
+                        help="Retire the oldest trees beyond this count in incremental mode")
+    parser.add_argument("--min-new-rows", type=int, default=50,
+                        help="Skip incremental training when fewer new rows have arrived")
+    parser.add_argument("--prune-tolerance", type=float, default=PRUNE_MAE_TOLERANCE,
+                        help="Serve the smallest forest whose validation MAE is within this fraction of the full model's")
+    parser.add_argument("--no-prune", action="store_true", help="Serve the full forest")
+    parser.add_argument("--temporal", action="store_true",
+                        help="Add the rolling per-bed features (soil humidity slope, mean temperature, drying rate); "
+                             "predictions need a bedId to use them")
+    return parser.parse_args(argv)
+
+def feature_frame(df, feature_pipeline=FEATURE_PIPELINE):
+    """The features expected by the prediction service, from the shared pipeline."""
+    return pd.DataFrame(feature_pipeline.transform_frame(df), columns=feature_pipeline.feature_names, index=df.index)
+
+def train_full(df, y, args, profiler):
+    feature_pipeline = TEMPORAL_FEATURE_PIPELINE if args.temporal else FEATURE_PIPELINE
+    with profiler.phase("features"):
+        X = feature_frame(df, feature_pipeline)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    model = RandomForestRegressor(
+        n_estimators=150,
+        max_depth=30,
+        min_samples_split=2,
+        min_samples_leaf=1,
+        random_state=42
+    )
+    with profiler.phase("fit"):
+        model.fit(X_train, y_train)
+    training_info = {"training_mode": "full", "rows_trained": len(X_train)}
+
+    # === Keep the cheapest forest that is about as accurate ===
+    if not args.no_prune:
+        with profiler.phase("prune"):
+            model, training_info["pruning"] = prune_forest(model, X_train, y_train, X_test, y_test,
+                                                           args.prune_tolerance)
+    return model, X_test, y_test, feature_pipeline, training_info
+
+def train_incremental(df, y, args, profiler):
+    """
+    Warm-start the last model with the rows added since its data watermark.
+
+    Raises:
+        RuntimeError: If there is no previous training log with a watermark, or its model is missing
+    """
+    last_log = load_latest_training_log()
+    if last_log is None or "data_watermark" not in last_log:
+        raise RuntimeError("No training log with a data watermark found; run a full training first")
+    base_path = last_log["regressor_path"]
+    if not os.path.exists(base_path):
+        raise RuntimeError(f"Model {base_path} from the last training log is missing; run a full training first")
+
+    new_rows = rows_since(df, last_log["data_watermark"])
+    print(f"{len(new_rows)} rows since {last_log['data_watermark']}")
+    if len(new_rows) < args.min_new_rows:
+        print(f"Fewer than {args.min_new_rows} new rows; keeping {os.path.basename(base_path)}")
+        return None
+
+    # Trees built with another feature pipeline cannot be mixed with new ones
+    spec = load_feature_spec(base_path)
+    feature_pipeline = pipeline_for_spec(spec)
+    feature_pipeline.check_spec(spec)
+    model = joblib.load(base_path)
+
+    with profiler.phase("features"):
+        # Built over all rows so the rolling bed features of new rows include the history before them
+        X = feature_frame(df, feature_pipeline).loc[new_rows.index]
+    X_train, X_test, y_train, y_test = train_test_split(X, y.loc[new_rows.index], test_size=0.2, random_state=42)
+    trees_before = len(model.estimators_)
+    with profiler.phase("fit"):
+        extend_forest(model, X_train, y_train, args.new_trees, args.max_trees)
+    print(f"Added {args.new_trees} trees to {trees_before}, keeping the newest {len(model.estimators_)}")
+    return model, X_test, y_test, feature_pipeline, {
+        "training_mode": "incremental",
+        "rows_trained": len(X_train),
+        "base_model_path": base_path,
+        "previous_data_watermark": last_log["data_watermark"],
+    }
+
+def main(argv=None, on_phase=None):
+    """
+    Train, evaluate and save a model.
+
+    Args:
+        argv: Command-line arguments (default: sys.argv)
+        on_phase: Called with each training phase name as it starts (default: None)
+
+    Returns:
+        dict: The saved training log, or None if an incremental run found too few new rows
+
+    Raises:
+        RuntimeError: If an incremental run has no previous model to start from
+    """
+    args = parse_args(argv)
+    profiler = TrainingProfiler(on_phase)
+
+    # === Load processed dataset ===
+    with profiler.phase("load"):
+        X, y, df, _ = load_processed_dataset()  # Don't use encoder here
+
+    # === Train ===
+    result = train_incremental(df, y, args, profiler) if args.incremental else train_full(df, y, args, profiler)
+    if result is None:
+        return
+    model, X_test, y_test, feature_pipeline, training_info = result
+    features = feature_pipeline.feature_names
+
+    # === Evaluate ===
+    with profiler.phase("evaluate"):
+        y_pred = model.predict(X_test)
+        mae = mean_absolute_error(y_test, y_pred)
+        r2 = r2_score(y_test, y_pred)
+    print(f"MAE = {mae:.3f} | R² = {r2:.3f}")
+
+    # === Feature importance analysis ===
+    feature_importance = model.feature_importances_
+    sorted_idx = np.argsort(feature_importance)
+    print("\n=== Feature Importance ===")
+    for i in sorted_idx[-5:]:  # Print top 5 features
+        print(f"{features[i]}: {feature_importance[i]:.4f}")
+
+    # === Save model ===
+    timestamp = get_timestamp()
+    with profiler.phase("save"):
+        model_path, _ = save_model(model, None, timestamp, prefix="reg_", feature_pipeline=feature_pipeline)
+
+    # === Save log ===
+    log_data = {
+        "timestamp": timestamp,
+        "regressor_path": model_path,
+        "regression_mae": round(mae, 3),
+        "regression_r2": round(r2, 3),
+        "features_used": features,
+        "feature_pipeline_version": feature_pipeline.version,
+        "top_features": [features[i] for i in sorted_idx[-5:]],  # Store top 5 features
+        "n_estimators": len(model.estimators_),
+        # Newest row the model has seen; the next incremental run starts after it
+        "data_watermark": data_watermark(df),
+        **training_info,
+        # Phase timings, peak memory, model size and inference latency of this model
+        "profile": profiler.report(model, model_path, X_test),
+    }
+    save_log(log_data, timestamp, prefix="regression_only_")
+
+    # === Cleanup old models/logs ===
+    cleanup_old_files(MODEL_DIR, "reg_model_*.pkl", keep_last=1)
+    cleanup_old_files(MODEL_DIR, "reg_model_*.forest", keep_last=1)
+    cleanup_old_files(MODEL_DIR, "reg_features_*.json", keep_last=1)
+    cleanup_old_files(LOG_DIR, "regression_only_log_*.json", keep_last=1)
+    return log_data
+
+if __name__ == "__main__":
+    try:
+        main()
+    except RuntimeError as e:
+        raise SystemExit(str(e))
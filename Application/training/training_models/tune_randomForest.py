@@ -1,19 +1,17 @@
 from Application.training.utils.imports import *
 import numpy as np
+from Application.training.utils.tuning import successive_halving_search, TUNING_STORE_PATH
+from Application.training.utils.profiling import TrainingProfiler
+from Application.training.utils.pruning import prune_forest
 
-# === Load and process data using data_loader ===
-encoder = OneHotEncoder(sparse_output=False, handle_unknown='ignore')
-X, y, df, base_features = load_processed_dataset(encoder)
+profiler = TrainingProfiler()
 
-# === Add engineered features (avoid SettingWithCopyWarning) ===
-X = X.copy()  # Create an explicit copy to avoid warnings
-X.loc[:, "soil_dryness_index"] = 100 - X["Soil Humidity"]
-X.loc[:, "temp_soil_product"] = X["Temperature"] * X["Soil Humidity"]
-X.loc[:, "light_humidity_ratio"] = X["Light"] / (X["Air Humidity"] + 1)
-
-# === Define complete features list ===
-stage_cols = encoder.get_feature_names_out(["plantGrowthStage"])
-features = base_features + ["soil_dryness_index", "temp_soil_product", "light_humidity_ratio"] + list(stage_cols)
+# === Load data and build the 16 serving features with the shared pipeline ===
+with profiler.phase("load"):
+    X, y, df, _ = load_processed_dataset()
+with profiler.phase("features"):
+    features = FEATURE_PIPELINE.feature_names
+    X = pd.DataFrame(FEATURE_PIPELINE.transform_frame(df), columns=features, index=df.index)
 
 # === Train/test split ===
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -27,31 +25,37 @@ param_grid = {
     'max_features': [0.5, 0.7, 0.8, 'sqrt', 'log2'],
 }
 
-# === Run RandomizedSearchCV ===
-base_model = RandomForestRegressor(random_state=42)
-rs_cv = RandomizedSearchCV(
-    estimator=base_model,
-    param_distributions=param_grid,
-    n_iter=20,
-    cv=5,
-    scoring='neg_mean_absolute_error',  # Optimize for MAE
-    verbose=1,
-    random_state=42,
-    n_jobs=-1
-)
-
-print("Fitting 5 folds for each of 20 candidates, totalling 100 fits")
-rs_cv.fit(X_train, y_train)
+# === Run a resumable successive-halving search ===
+# Fold scores are cached in TUNING_STORE_PATH; rerunning after an interruption or on
+# unchanged data only fits what is missing
+with profiler.phase("search"):
+    search = successive_halving_search(
+        X_train, y_train,
+        param_grid,
+        n_candidates=27,
+        cv=5,
+        eta=3,
+        n_jobs=-1,  # All cores
+        random_state=42,
+    )
+print(f"{search['fits']} fits run, {search['reused_fits']} reused from {TUNING_STORE_PATH}")
 
-# === Get best model ===
-best_params = rs_cv.best_params_
+# === Refit best configuration on the whole training split ===
+best_params = search["best_params"]
 print(f"Best Params: {best_params}")
+best_model = RandomForestRegressor(random_state=42, **best_params)
+with profiler.phase("fit"):
+    best_model.fit(X_train, y_train)
+
+# === Keep the cheapest forest within 2% of the tuned model's validation MAE ===
+with profiler.phase("prune"):
+    best_model, pruning = prune_forest(best_model, X_train, y_train, X_test, y_test)
 
 # === Evaluate ===
-best_model = rs_cv.best_estimator_
-y_pred = best_model.predict(X_test)
-mae = mean_absolute_error(y_test, y_pred)
-r2 = r2_score(y_test, y_pred)
+with profiler.phase("evaluate"):
+    y_pred = best_model.predict(X_test)
+    mae = mean_absolute_error(y_test, y_pred)
+    r2 = r2_score(y_test, y_pred)
 print(f"Regression MAE: {mae:.3f} | R²: {r2:.3f}")
 
 # === Feature importance analysis ===
@@ -62,29 +66,35 @@ for i in sorted_idx[-5:]:
     if i < len(features):  # Ensure index is valid
         print(f"{features[i]}: {feature_importance[i]:.4f}")
 
-# === Save model and encoder ===
+# === Save model ===
 timestamp = get_timestamp()
-reg_path, encoder_path = save_model(best_model, encoder, timestamp, prefix="reg_")
+with profiler.phase("save"):
+    reg_path, _ = save_model(best_model, None, timestamp, prefix="reg_", feature_pipeline=FEATURE_PIPELINE)
 
 # === Save logs ===
 log_data = {
     "timestamp": timestamp,
     "regressor_path": reg_path,
-    "encoder_path": encoder_path,
     "best_params": {str(k): (str(v) if isinstance(v, (list, dict)) else v) for k, v in best_params.items()},
+    "cv_mae": round(search["best_mae"], 3),
+    "search_rungs": search["rungs"],
+    "pruning": pruning,
     "regression_mae": round(mae, 3),
     "regression_r2": round(r2, 3),
     "features_used": features,
-    "top_features": [features[i] for i in sorted_idx[-5:] if i < len(features)]  # Top 5 features
+    "feature_pipeline_version": FEATURE_PIPELINE.version,
+    "top_features": [features[i] for i in sorted_idx[-5:] if i < len(features)],  # Top 5 features
+    # Phase timings, peak memory, model size and inference latency of this model
+    "profile": profiler.report(best_model, reg_path, X_test),
 }
 log_path = save_log(log_data, timestamp, prefix="regression_tuned_")
 
 # === Cleanup old files ===
 cleanup_old_files(MODEL_DIR, "reg_model_*.pkl", keep_last=1)
-cleanup_old_files(MODEL_DIR, "reg_encoder_*.pkl", keep_last=1)
+cleanup_old_files(MODEL_DIR, "reg_model_*.forest", keep_last=1)
+cleanup_old_files(MODEL_DIR, "reg_features_*.json", keep_last=1)
 cleanup_old_files(LOG_DIR, "regression_only_log_*.json", keep_last=1)
 cleanup_old_files(LOG_DIR, "regression_tuned_log_*.json", keep_last=1)
 
 print(f"Model saved to: {reg_path}")
-print(f"Encoder saved to: {encoder_path}")
 print(f"Log saved to: {log_path}")
\ No newline at end of file
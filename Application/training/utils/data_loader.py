@@ -1,43 +1,188 @@
 import pandas as pd
 import os
+import json
+import shutil
+import hashlib
+import tempfile
 import numpy as np
 
 DATA_PATH = os.path.join("Application", "training", "data", "cleaned_data_greenhouse.csv")
+# Parsed copies of CSV files, one directory of .npy columns per CSV
+CACHE_DIR = os.environ.get("DATASET_CACHE_DIR", os.path.join("Application", "training", "data", ".cache"))
+CACHE_FORMAT_VERSION = 1
 
-def load_dataset():
-    """Load the raw dataset without any processing."""
-    df = pd.read_csv(DATA_PATH) 
+# Explicit dtypes so pandas skips type inference; text columns become categoricals
+CSV_DTYPES = {
+    "Temperature": "float64",
+    "Soil Humidity": "float64",
+    "Air Humidity": "float64",
+    "Light": "float64",
+    "plantGrowthStage": "category",
+    "timeSinceLastWateringInHours": "float64",
+    "hourOfDay": "int8",
+    "PartOfDay": "category",
+    "timeUntilNextWateringInHours": "float64",
+}
+DATE_COLUMNS = ["timestamp"]
+
+def file_hash(path, block_size=1 << 20):
+    """SHA-256 of a file, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def parse_timestamps(values):
+    """
+    Parse ISO 8601 strings into UTC timestamps.
+
+    pandas parses strings with a UTC offset roughly 10x slower than naive ones, so when
+    every value carries the same offset (e.g. "+00:00") it is stripped, the naive part
+    parsed, and the offset applied once to the whole column.
+    """
+    values = values.astype(str)
+    suffix = values.str.slice(-6)
+    first = suffix.iloc[0] if len(values) else ""
+    if len(first) == 6 and first[0] in "+-" and first[3] == ":" and (suffix == first).all():
+        naive = pd.to_datetime(values.str.slice(0, -6), format="ISO8601")
+        offset = pd.Timedelta(hours=int(first[1:3]), minutes=int(first[4:6]))
+        return (naive - offset if first[0] == "+" else naive + offset).dt.tz_localize("UTC")
+    return pd.to_datetime(values, utc=True, format="ISO8601")
+
+def read_csv_typed(path=DATA_PATH):
+    """Parse a CSV with the explicit dtypes above, dropping unnamed index columns."""
+    columns = pd.read_csv(path, nrows=0).columns
+    stripped = {column: column.strip() for column in columns}
+    dtypes = {column: CSV_DTYPES[name] for column, name in stripped.items() if name in CSV_DTYPES}
+
+    df = pd.read_csv(path, dtype=dtypes)
     df = df.loc[:, ~df.columns.str.contains("^Unnamed")]
     df.columns = df.columns.str.strip()
+    for column in DATE_COLUMNS:
+        if column in df.columns:
+            df[column] = parse_timestamps(df[column])
+    for column in df.columns[df.dtypes == object]:
+        df[column] = df[column].astype("category")
     return df
 
-def load_processed_dataset(encoder=None):
+def _cache_path_for(path):
+    return os.path.join(CACHE_DIR, os.path.splitext(os.path.basename(path))[0])
+
+def _write_cache(df, cache_path, source):
+    """Save each column as .npy (categoricals as codes) plus a header, replacing any old cache."""
+    parent = os.path.dirname(cache_path) or "."
+    os.makedirs(parent, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(prefix=".tmp_", dir=parent)
+    header = {"format_version": CACHE_FORMAT_VERSION, "source": source, "columns": []}
+    for i, column in enumerate(df.columns):
+        series = df[column]
+        entry = {"name": column, "file": f"{i}.npy", "dtype": str(series.dtype)}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            entry["categories"] = [str(category) for category in series.cat.categories]
+            values = series.cat.codes.to_numpy()
+        elif isinstance(series.dtype, pd.DatetimeTZDtype):
+            entry["tz"] = str(series.dt.tz)
+            values = series.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy()
+        else:
+            values = series.to_numpy()
+        np.save(os.path.join(tmp_path, entry["file"]), values, allow_pickle=False)
+        header["columns"].append(entry)
+    with open(os.path.join(tmp_path, "header.json"), 'w') as f:
+        json.dump(header, f, indent=2)
+    if os.path.isdir(cache_path):
+        shutil.rmtree(cache_path)
+    os.replace(tmp_path, cache_path)
+
+def _read_cache(cache_path, header):
+    data = {}
+    for entry in header["columns"]:
+        values = np.load(os.path.join(cache_path, entry["file"]), allow_pickle=False)
+        if "categories" in entry:
+            data[entry["name"]] = pd.Categorical.from_codes(values, categories=entry["categories"])
+        elif "tz" in entry:
+            data[entry["name"]] = pd.DatetimeIndex(values).tz_localize("UTC").tz_convert(entry["tz"])
+        else:
+            data[entry["name"]] = values
+    return pd.DataFrame(data)
+
+def _read_header(cache_path):
+    try:
+        with open(os.path.join(cache_path, "header.json")) as f:
+            header = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return header if header.get("format_version") == CACHE_FORMAT_VERSION else None
+
+def load_dataset(path=DATA_PATH, use_cache=True):
+    """
+    Load the raw dataset without any processing.
+
+    The parsed columns are cached as .npy files under CACHE_DIR. The cache is reused until
+    the CSV's SHA-256 changes; the hash is only recomputed when the file's size or
+    modification time differ from the cached ones.
+
+    Args:
+        path: CSV file to load (default: cleaned_data_greenhouse.csv)
+        use_cache: Read and refresh the columnar cache (default: True)
+
+    Returns:
+        DataFrame: Typed columns of the CSV
+    """
+    if not use_cache:
+        return read_csv_typed(path)
+
+    stat = os.stat(path)
+    cache_path = _cache_path_for(path)
+    header = _read_header(cache_path)
+    source = header["source"] if header else None
+
+    if source is not None and (source["size"], source["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+        return _read_cache(cache_path, header)
+
+    digest = file_hash(path)
+    source_info = {"path": os.path.abspath(path), "sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if source is not None and source["sha256"] == digest:
+        # Touched but unchanged: remember the new stat so the next load skips hashing
+        header["source"] = source_info
+        with open(os.path.join(cache_path, "header.json"), 'w') as f:
+            json.dump(header, f, indent=2)
+        return _read_cache(cache_path, header)
+
+    df = read_csv_typed(path)
+    try:
+        _write_cache(df, cache_path, source_info)
+    except OSError as e:
+        print(f"Could not write dataset cache {cache_path}: {e}")
+    return df
+
+def load_processed_dataset(encoder=None, path=DATA_PATH, use_cache=True):
     """
     Load and process the dataset for model training.
-    
+
     Args:
         encoder: Optional one-hot encoder for categorical variables
-        
+        path: CSV file to load (default: cleaned_data_greenhouse.csv)
+        use_cache: Use the columnar cache of the parsed CSV (default: True)
+
     Returns:
         X: Features DataFrame
         y: Target Series
         df: Complete DataFrame with engineered features
         features: List of feature names
     """
-    # Load and clean data
-    df = pd.read_csv(DATA_PATH)
-    df = df.loc[:, ~df.columns.str.contains("^Unnamed")]
-    df.columns = df.columns.str.strip()
+    # Load typed data (from the columnar cache when the CSV is unchanged)
+    df = load_dataset(path, use_cache)
 
     # Create engineered features
-    df["is_daytime"] = df["hourOfDay"].apply(lambda h: 1 if 6 <= h <= 18 else 0)
-    
+    df["is_daytime"] = df["hourOfDay"].between(6, 18).astype("int8")
+
     # Set target variable
     y = df["timeUntilNextWateringInHours"]
 
     # Process categorical features if encoder is provided
     if encoder is not None:
-        encoded = encoder.fit_transform(df[["plantGrowthStage"]])
+        encoded = encoder.fit_transform(df[["plantGrowthStage"]].astype(str))
         stage_cols = encoder.get_feature_names_out(["plantGrowthStage"])
         df_encoded = pd.DataFrame(encoded, columns=stage_cols, index=df.index)
         df = pd.concat([df, df_encoded], axis=1)
@@ -58,4 +203,4 @@ def load_processed_dataset(encoder=None):
 
     # Extract features
     X = df[features]
-    return X, y, df, features
\ No newline at end of file
+    return X, y, df, features
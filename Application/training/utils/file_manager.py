@@ -2,10 +2,14 @@ import os
 import json
 import joblib
 import glob
+import shutil
 from datetime import datetime
+from Application.services.flat_forest import FlatForest
+from Application.services.forest_artifact import artifact_path_for, save_forest_artifact
+from Application.services.feature_pipeline import feature_spec_path_for
 
-# Directory setup for models and logs
-MODEL_DIR = os.path.join("Application", "trained_models")
+# Directory setup for models and logs (MODEL_DIR is shared with the prediction service)
+MODEL_DIR = os.environ.get("MODEL_DIR", os.path.join("Application", "trained_models"))
 LOG_DIR = os.path.join(MODEL_DIR, "logs")
 
 os.makedirs(MODEL_DIR, exist_ok=True)
@@ -15,15 +19,22 @@ def get_timestamp():
     """Get current timestamp formatted as string for filenames."""
     return datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
-def save_model(model, encoder, timestamp=None, prefix="pipeline_"):
+def save_model(model, encoder, timestamp=None, prefix="pipeline_", export_forest=True, feature_pipeline=None):
     """
     Save machine learning model and encoder with timestamp.
 
+    Forest models are also exported as a memory-mappable .forest artifact next to the
+    .pkl. When a feature pipeline is given its spec is saved as reg_features_<timestamp>.json
+    so the service can refuse models built with different features. Both are written
+    first so the .pkl appearing marks a complete model.
+
     Args:
         model: Trained ML model
         encoder: One-hot encoder for categorical variables (can be None)
         timestamp: Timestamp string for file naming (if None, generates new timestamp)
         prefix: Filename prefix (default: 'pipeline_')
+        export_forest: Also write the .forest artifact for supported forests (default: True)
+        feature_pipeline: FeaturePipeline the model was trained with (default: None)
 
     Returns:
         tuple: (model_path, encoder_path)
@@ -32,6 +43,21 @@ def save_model(model, encoder, timestamp=None, prefix="pipeline_"):
         timestamp = get_timestamp()
 
     model_path = os.path.join(MODEL_DIR, f"{prefix}model_{timestamp}.pkl")
+    metadata = {"model_file": os.path.basename(model_path), "timestamp": timestamp}
+    if feature_pipeline is not None:
+        spec_path = feature_pipeline.save_spec(feature_spec_path_for(model_path))
+        metadata["feature_pipeline"] = feature_pipeline.spec()
+        print(f"Feature pipeline spec saved to: {spec_path}")
+    if export_forest:
+        try:
+            artifact_path = save_forest_artifact(
+                FlatForest.from_sklearn(model),
+                artifact_path_for(model_path),
+                metadata=metadata
+            )
+            print(f"Forest artifact saved to: {artifact_path}")
+        except TypeError as e:
+            print(f"Skipping forest artifact: {e}")
     joblib.dump(model, model_path)
     print(f"Model saved to: {model_path}")
     
@@ -76,7 +102,10 @@ def cleanup_old_files(folder, pattern, keep_last=3):
     files = sorted(glob.glob(os.path.join(folder, pattern)), key=os.path.getmtime, reverse=True)
     for file in files[keep_last:]:
         try:
-            os.remove(file)
+            if os.path.isdir(file):
+                shutil.rmtree(file)
+            else:
+                os.remove(file)
             print(f"Deleted: {file}")
         except OSError as e:
             print(f"Error deleting {file}: {e}")
@@ -20,4 +20,5 @@ from sklearn.metrics import mean_absolute_error, r2_score
 
 # === Project Utilities ===
 from Application.training.utils.file_manager import get_timestamp, save_model, save_log, cleanup_old_files, MODEL_DIR, LOG_DIR
-from Application.training.utils.data_loader import load_processed_dataset
\ No newline at end of file
+from Application.training.utils.data_loader import load_processed_dataset
+from Application.services.feature_pipeline import FEATURE_PIPELINE
\ No newline at end of file
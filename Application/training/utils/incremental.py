@@ -0,0 +1,79 @@
+import os
+import glob
+import json
+
+import pandas as pd
+
+from Application.training.utils.file_manager import LOG_DIR
+
+# Training logs written by train_randomForest.py; the newest one holds the data watermark
+TRAINING_LOG_PATTERN = "regression_only_log_*.json"
+WATERMARK_COLUMN = "timestamp"
+
+def load_latest_training_log(log_dir=LOG_DIR, pattern=TRAINING_LOG_PATTERN):
+    """
+    Load the most recent training log.
+
+    Args:
+        log_dir: Directory containing the logs (default: LOG_DIR)
+        pattern: Glob pattern of the log files (default: regression_only_log_*.json)
+
+    Returns:
+        dict: The log contents, or None if no log exists
+    """
+    # Timestamps in the file names sort chronologically
+    log_files = sorted(glob.glob(os.path.join(log_dir, pattern)))
+    if not log_files:
+        return None
+    with open(log_files[-1]) as f:
+        return json.load(f)
+
+def data_watermark(df):
+    """ISO 8601 timestamp of the newest row in df, recorded in the training log."""
+    return df[WATERMARK_COLUMN].max().isoformat()
+
+def rows_since(df, watermark):
+    """
+    Rows of df newer than a watermark.
+
+    Args:
+        df: Dataset with a timezone-aware timestamp column
+        watermark: ISO 8601 timestamp from a training log
+
+    Returns:
+        DataFrame: Rows whose timestamp is strictly after the watermark
+    """
+    cutoff = pd.Timestamp(watermark)
+    if cutoff.tzinfo is None:
+        cutoff = cutoff.tz_localize("UTC")
+    return df[df[WATERMARK_COLUMN] > cutoff]
+
+def extend_forest(model, X_new, y_new, new_trees, max_trees=None):
+    """
+    Add trees fitted on new rows only to a trained random forest.
+
+    The existing trees are kept as they are (warm_start), so the cost depends on the
+    number of new rows, not on the whole history. When max_trees is set, the oldest
+    trees are then retired so the forest covers a sliding window of the data.
+
+    Args:
+        model: Trained RandomForestRegressor, modified in place
+        X_new: Features of the new rows
+        y_new: Target of the new rows
+        new_trees: Number of trees to add
+        max_trees: Maximum number of trees to keep (default: None, keep all)
+
+    Returns:
+        RandomForestRegressor: The extended model
+    """
+    if not hasattr(model, "estimators_"):
+        raise TypeError(f"Cannot warm-start {type(model).__name__}; expected a fitted random forest")
+
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + new_trees)
+    model.fit(X_new, y_new)
+    model.set_params(warm_start=False)
+
+    if max_trees is not None and len(model.estimators_) > max_trees:
+        model.estimators_ = model.estimators_[-max_trees:]
+        model.set_params(n_estimators=max_trees)
+    return model
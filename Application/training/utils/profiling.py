@@ -0,0 +1,153 @@
+import os
+import time
+import warnings
+from contextlib import contextmanager
+
+import numpy as np
+
+from Application.services.flat_forest import FlatForest
+from Application.services.forest_artifact import artifact_path_for
+from Application.services.feature_pipeline import feature_spec_path_for
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Batch sizes timed for every trained model: one API request, and a batch/bulk-scoring chunk
+LATENCY_BATCH_SIZES = (1, 1000)
+LATENCY_REPEATS = {1: 200, 1000: 10}
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process and of its finished child processes.
+
+    Returns:
+        dict: {"process": MB, "children": MB}, or None where getrusage is unavailable
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    unit = 1 if os.uname().sysname == "Darwin" else 1024
+    return {
+        "process": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit / 2**20, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit / 2**20, 1),
+    }
+
+def path_size_bytes(path):
+    """Size of a file, or of every file under a directory; 0 if it does not exist."""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(folder, name))
+                   for folder, _, names in os.walk(path) for name in names)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+def model_size_bytes(model_path):
+    """On-disk size of a saved model: the .pkl, its .forest artifact and its feature spec."""
+    sizes = {
+        "pickle": path_size_bytes(model_path),
+        "forest_artifact": path_size_bytes(artifact_path_for(model_path)),
+        "feature_spec": path_size_bytes(feature_spec_path_for(model_path)),
+    }
+    sizes["total"] = sum(sizes.values())
+    return sizes
+
+def median_latency_ms(predict, X, repeats):
+    """Median wall time of predict(X) in milliseconds over repeats calls, after one warm-up call."""
+    predict(X)  # Warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(X)
+        timings.append(time.perf_counter() - start)
+    return round(float(np.median(timings)) * 1000, 4)
+
+def inference_latency(model, X_sample, batch_sizes=LATENCY_BATCH_SIZES):
+    """
+    Median predict latency of a model for each batch size, with each serving engine.
+
+    The sklearn engine is timed on the model itself and the flat engine on its
+    FlatForest, as served by default up to FLAT_FOREST_MAX_ROWS rows.
+
+    Args:
+        model: Trained model
+        X_sample: Feature rows to time with, repeated as needed to fill a batch
+        batch_sizes: Rows per predict call (default: 1 and 1000)
+
+    Returns:
+        dict: {engine: {"rows_<n>_ms": median milliseconds}}
+    """
+    X_sample = np.asarray(X_sample, dtype=np.float64)
+    engines = {"sklearn": model.predict}
+    try:
+        engines["flat"] = FlatForest.from_sklearn(model).predict
+    except TypeError:
+        pass
+
+    latency = {}
+    with warnings.catch_warnings():
+        # Models fitted on DataFrames warn about the plain arrays used here
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        for engine, predict in engines.items():
+            latency[engine] = {}
+            for rows in batch_sizes:
+                X = np.resize(X_sample, (rows, X_sample.shape[1]))
+                latency[engine][f"rows_{rows}_ms"] = median_latency_ms(predict, X, LATENCY_REPEATS.get(rows, 20))
+    return latency
+
+class TrainingProfiler:
+    """
+    Wall time per training phase, plus a resource report for the trained model.
+
+    on_phase, if given, is called with each phase name as the phase starts (used to
+    report progress of training jobs run by the API).
+
+    Usage:
+        profiler = TrainingProfiler()
+        with profiler.phase("fit"):
+            model.fit(X, y)
+        log_data["profile"] = profiler.report(model, model_path, X_test)
+    """
+
+    def __init__(self, on_phase=None):
+        self.phases = {}
+        self.on_phase = on_phase
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        if self.on_phase is not None:
+            self.on_phase(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def report(self, model, model_path, X_sample):
+        """
+        Build the profile saved in the training log.
+
+        Returns:
+            dict: phase_seconds, total_seconds, peak_rss_mb, model_size_bytes and inference_latency
+        """
+        profile = {
+            "phase_seconds": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+            "total_seconds": round(time.perf_counter() - self._started, 3),
+            "peak_rss_mb": peak_rss_mb(),
+            "model_size_bytes": model_size_bytes(model_path),
+            "inference_latency": inference_latency(model, X_sample),
+        }
+        print_profile(profile)
+        return profile
+
+def print_profile(profile):
+    print("\n=== Training Profile ===")
+    for name, seconds in profile["phase_seconds"].items():
+        print(f"{name}: {seconds:.2f}s")
+    print(f"total: {profile['total_seconds']:.2f}s")
+    if profile["peak_rss_mb"] is not None:
+        print(f"peak RSS: {profile['peak_rss_mb']['process']} MB")
+    print(f"model size: {profile['model_size_bytes']['total'] / 2**20:.1f} MB")
+    for engine, timings in profile["inference_latency"].items():
+        print(f"{engine} predict: " + ", ".join(f"{key[:-3].replace('_', ' ')} {ms:.3f} ms"
+                                                for key, ms in timings.items()))
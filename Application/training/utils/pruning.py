@@ -0,0 +1,104 @@
+import copy
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import train_test_split
+
+from Application.services.flat_forest import FlatForest
+from Application.training.utils.profiling import median_latency_ms
+
+# Candidate serving forests: the first n trees of the trained forest, or of a refit capped at each depth
+PRUNE_TREE_COUNTS = (5, 10, 25, 50, 75, 100)
+PRUNE_DEPTHS = (20, 15, 12, 10, 8, 6)
+# Accept a candidate whose validation MAE is at most this fraction above the full model's
+PRUNE_MAE_TOLERANCE = 0.02
+# Fraction of the training split held out to compare candidates; the test split only reports
+PRUNE_VALIDATION_SIZE = 0.2
+
+def truncate_forest(model, n_trees):
+    """A copy of a fitted forest keeping only its first n_trees trees."""
+    truncated = copy.copy(model)
+    truncated.estimators_ = model.estimators_[:n_trees]
+    truncated.n_estimators = len(truncated.estimators_)
+    return truncated
+
+def _prefix_maes(model, X, y, tree_counts):
+    """MAE of every truncation on (X, y), from one pass of per-tree predictions."""
+    X = np.asarray(X, dtype=np.float32)
+    per_tree = np.stack([tree.predict(X) for tree in model.estimators_])
+    prefix_means = np.cumsum(per_tree, axis=0) / np.arange(1, len(per_tree) + 1)[:, np.newaxis]
+    return {n: mean_absolute_error(y, prefix_means[n - 1]) for n in tree_counts}
+
+def prune_forest(model, X_train, y_train, X_test, y_test, tolerance=PRUNE_MAE_TOLERANCE,
+                 tree_counts=PRUNE_TREE_COUNTS, depths=PRUNE_DEPTHS, validation_size=PRUNE_VALIDATION_SIZE):
+    """
+    Pick the smallest forest whose validation MAE is within tolerance of the trained one.
+
+    Candidates are truncations of the trained configuration and of refits with a depth
+    cap (only caps below the depth the trees actually reached), sized by total node
+    count, which drives both memory and per-row latency. They are fitted on part of the
+    training split and scored on the rest, so the test split stays untouched for the
+    MAEs reported for the full and the selected forest.
+
+    Args:
+        model: Fitted RandomForestRegressor
+        X_train, y_train: Training split; candidates are fitted and validated on parts of it,
+            and the selected depth cap is refitted on all of it
+        X_test, y_test: Held-out split the full and the selected forest are reported on
+        tolerance: Allowed relative MAE increase over the trained model (default: 0.02)
+        tree_counts: Tree counts to try (default: PRUNE_TREE_COUNTS)
+        depths: Depth caps to try (default: PRUNE_DEPTHS)
+        validation_size: Fraction of the training split held out to choose the candidate (default: 0.2)
+
+    Returns:
+        tuple: (selected model, report with every candidate's trees, depth, nodes, validation
+        MAE and single-row latency, and the test MAE of the full and the selected forest)
+    """
+    X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=validation_size, random_state=42)
+    n_trees = len(model.estimators_)
+    counts = sorted({n for n in tree_counts if n < n_trees} | {n_trees})
+
+    reference = clone(model).fit(X_fit, y_fit)
+    full_depth = max(tree.get_depth() for tree in reference.estimators_)
+    variants = [(model.max_depth, reference)]
+    for depth in sorted(depths, reverse=True):
+        if depth < full_depth:
+            variants.append((depth, clone(model).set_params(max_depth=depth).fit(X_fit, y_fit)))
+
+    candidates = []
+    for depth, forest in variants:
+        node_counts = np.cumsum([tree.tree_.node_count for tree in forest.estimators_])
+        for n, mae in _prefix_maes(forest, X_val, y_val, counts).items():
+            candidates.append({"trees": n, "max_depth": depth, "n_nodes": int(node_counts[n - 1]),
+                               "validation_mae": round(float(mae), 4), "forest": forest})
+
+    full = next(c for c in candidates if c["forest"] is reference and c["trees"] == n_trees)
+    budget = full["validation_mae"] * (1 + tolerance)
+    selected = min((c for c in candidates if c["validation_mae"] <= budget), key=lambda c: c["n_nodes"])
+
+    # The selected shape, fitted on the whole training split
+    source = model
+    if selected["forest"] is not reference:
+        source = clone(model).set_params(max_depth=selected["max_depth"]).fit(X_train, y_train)
+    pruned = truncate_forest(source, selected["trees"])
+
+    # Single-row latency on the flat engine, which serves requests up to FLAT_FOREST_MAX_ROWS rows
+    row = np.asarray(X_val, dtype=np.float64)[:1]
+    for candidate in candidates:
+        flat = FlatForest.from_sklearn(truncate_forest(candidate.pop("forest"), candidate["trees"]))
+        candidate["rows_1_ms"] = median_latency_ms(flat.predict, row, 50)
+
+    report = {"tolerance": tolerance, "validation_size": validation_size,
+              "full": _final_summary(model, full, X_test, y_test),
+              "selected": _final_summary(pruned, selected, X_test, y_test),
+              "candidates": candidates}
+    print(f"Pruned forest: {report['selected']['trees']} trees, max_depth {report['selected']['max_depth']}, "
+          f"{report['selected']['n_nodes']} of {report['full']['n_nodes']} nodes, "
+          f"test MAE {report['selected']['test_mae']:.3f} vs {report['full']['test_mae']:.3f}")
+    return pruned, report
+
+def _final_summary(forest, candidate, X_test, y_test):
+    """A candidate's report entry, with the node count and test MAE of the forest actually kept."""
+    return {**candidate, "n_nodes": int(sum(tree.tree_.node_count for tree in forest.estimators_)),
+            "test_mae": round(float(mean_absolute_error(y_test, forest.predict(X_test))), 4)}
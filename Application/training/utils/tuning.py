@@ -0,0 +1,174 @@
+import os
+import json
+import math
+import time
+import hashlib
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import KFold, ParameterSampler
+
+from Application.training.utils.file_manager import MODEL_DIR
+
+# Every fold score is appended here as one JSON line, so an interrupted search loses at most
+# the fits that were running
+TUNING_STORE_PATH = os.environ.get("TUNING_STORE_PATH", os.path.join(MODEL_DIR, "tuning", "trials.jsonl"))
+
+def dataset_hash(X, y):
+    """SHA-256 of the feature matrix and target, so scores are only reused on identical data."""
+    digest = hashlib.sha256()
+    for values in (np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64)):
+        digest.update(str(values.shape).encode())
+        digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()
+
+def config_key(params):
+    """Canonical JSON of a parameter set."""
+    return json.dumps(params, sort_keys=True, default=str)
+
+class TrialStore:
+    """
+    Append-only JSON Lines store of evaluated (configuration, rung, fold) scores.
+
+    Records are keyed by dataset hash, configuration, subset size, number of CV splits
+    and fold index; a truncated last line from a crash is ignored on load.
+    """
+
+    def __init__(self, path=TUNING_STORE_PATH):
+        self.path = path
+        self._scores = {}
+        # Set when a crash cut the last line short, so the next record starts on a new line
+        self._partial_line = False
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    self._partial_line = not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._scores[self._key(record)] = record["mae"]
+
+    @staticmethod
+    def _key(record):
+        return (record["dataset"], record["config"], record["n_rows"], record["n_splits"], record["fold"])
+
+    def __len__(self):
+        return len(self._scores)
+
+    def get(self, dataset, config, n_rows, n_splits, fold):
+        return self._scores.get((dataset, config, n_rows, n_splits, fold))
+
+    def add(self, record):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(("\n" if self._partial_line else "") + json.dumps(record) + "\n")
+        self._partial_line = False
+        self._scores[self._key(record)] = record["mae"]
+
+def halving_schedule(n_candidates, n_rows, cv=5, eta=3, min_rows=200, min_folds=2):
+    """
+    Rungs of a successive-halving search.
+
+    Each rung keeps the best 1/eta of the configurations and gives them eta times more
+    rows; early rungs also score fewer folds. The last rung uses every row and all cv folds.
+
+    Returns:
+        list: (rows, folds) per rung
+    """
+    n_rungs = 1 + int(math.floor(math.log(max(n_candidates, 1), eta) + 1e-9))
+    schedule = []
+    for rung in range(n_rungs):
+        fraction = float(eta) ** (rung - n_rungs + 1)
+        rows = min(n_rows, max(int(n_rows * fraction), min_rows))
+        folds = cv if rung == n_rungs - 1 else min(cv, max(min_folds, math.ceil(cv * fraction)))
+        if schedule and rows == schedule[-1][0] and folds == schedule[-1][1]:
+            continue
+        schedule.append((rows, folds))
+    return schedule
+
+def _fit_fold(params, X, y, train_idx, test_idx, random_state):
+    start = time.perf_counter()
+    model = RandomForestRegressor(random_state=random_state, n_jobs=1, **params)
+    model.fit(X[train_idx], y[train_idx])
+    mae = mean_absolute_error(y[test_idx], model.predict(X[test_idx]))
+    return mae, time.perf_counter() - start
+
+def successive_halving_search(X, y, param_grid, n_candidates=27, cv=5, eta=3, min_rows=200,
+                              store=None, n_jobs=-1, random_state=42):
+    """
+    Resumable successive-halving search over random forest parameters, minimising MAE.
+
+    Candidates are drawn with a fixed seed and the rows are visited in a fixed random
+    order, so a rerun on the same data asks for exactly the same fits; those already in
+    the store are read back instead of refitted. The remaining fits of each rung run in
+    parallel and are stored as they finish.
+
+    Args:
+        X: Feature matrix (DataFrame or array)
+        y: Target
+        param_grid: Parameter lists for RandomForestRegressor, as for RandomizedSearchCV
+        n_candidates: Configurations sampled from param_grid (default: 27)
+        cv: Folds of the last rung (default: 5)
+        eta: Fraction of configurations kept per rung is 1/eta (default: 3)
+        min_rows: Smallest data subset used by the first rung (default: 200)
+        store: TrialStore for fold scores (default: TrialStore at TUNING_STORE_PATH)
+        n_jobs: Parallel fits, -1 for all cores (default: -1)
+        random_state: Seed for candidates, row order, folds and forests (default: 42)
+
+    Returns:
+        dict: best_params, best_mae, the per-rung results and the number of fits run and reused
+    """
+    store = store if store is not None else TrialStore()
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    dataset = dataset_hash(X, y)
+
+    candidates = list(ParameterSampler(param_grid, n_iter=n_candidates, random_state=random_state))
+    order = np.random.default_rng(random_state).permutation(len(X))
+    fitted = reused = 0
+    rungs = []
+
+    for rows, folds in halving_schedule(len(candidates), len(X), cv, eta, min_rows):
+        # Nested subsets: every rung's rows include those of the rung before
+        subset = order[:rows]
+        splits = list(KFold(n_splits=cv, shuffle=True, random_state=random_state).split(subset))[:folds]
+        X_rung, y_rung = X[subset], y[subset]
+
+        scores = {config_key(params): [] for params in candidates}
+        todo = []
+        for params in candidates:
+            key = config_key(params)
+            for fold, (train_idx, test_idx) in enumerate(splits):
+                mae = store.get(dataset, key, rows, cv, fold)
+                if mae is None:
+                    todo.append((params, key, fold, train_idx, test_idx))
+                else:
+                    scores[key].append(mae)
+                    reused += 1
+
+        results = Parallel(n_jobs=n_jobs, return_as="generator")(
+            delayed(_fit_fold)(params, X_rung, y_rung, train_idx, test_idx, random_state)
+            for params, _, _, train_idx, test_idx in todo
+        )
+        for (params, key, fold, _, _), (mae, seconds) in zip(todo, results):
+            store.add({"dataset": dataset, "config": key, "params": params, "n_rows": rows, "n_splits": cv,
+                       "fold": fold, "mae": mae, "fit_seconds": round(seconds, 4)})
+            scores[key].append(mae)
+            fitted += 1
+
+        ranked = sorted(candidates, key=lambda params: np.mean(scores[config_key(params)]))
+        rungs.append({
+            "rows": rows,
+            "folds": folds,
+            "candidates": len(candidates),
+            "best_mae": float(np.mean(scores[config_key(ranked[0])])),
+        })
+        print(f"Rung {len(rungs)}: {len(candidates)} candidates on {rows} rows x {folds} folds, "
+              f"best MAE {rungs[-1]['best_mae']:.3f}")
+        best_params, best_mae = ranked[0], rungs[-1]["best_mae"]
+        candidates = ranked[:max(1, len(candidates) // eta)]
+
+    return {"best_params": best_params, "best_mae": best_mae, "rungs": rungs, "fits": fitted, "reused_fits": reused}